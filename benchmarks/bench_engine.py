@@ -0,0 +1,306 @@
+#!/usr/bin/env python
+"""
+프롬프트 엔진 엔드투엔드 벤치마크 (오프라인)
+
+로컬 가짜 OpenAI 서버(`fake_openai_server.py`)를 대상으로 단일 호출, 다중 호출, 자동 선택, 스트리밍,
+비동기, JSONL 일괄 변환, Batch API 모드를 실행하고 처리량, 지연 시간 분위수, 요청당 API 호출 수,
+메모리 사용량, 입력 토큰 중 프롬프트 캐시로 처리된 비율을 보고합니다. 네트워크 없이 실행되므로 엔진의 성능 회귀를 확인할 때 사용합니다.
+
+    python benchmarks/bench_engine.py --requests 50 --concurrency 8 --latency 0.1 --jitter 0.05
+    python benchmarks/bench_engine.py --modes single multi --error-rate 0.05 --json results.json
+    python benchmarks/bench_engine.py --modes multi --fail-above-p95 0.5
+    python benchmarks/bench_engine.py --modes single --slow-rate 0.05 --slow-latency 1.0 --hedge-percentile 0.9
+
+서버를 같은 프로세스에서 실행하면 GIL을 공유하므로, 더 정확한 측정이 필요하면
+`fake_openai_server.py`를 따로 실행하고 `--base-url`로 지정합니다.
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# 프로젝트 루트 디렉토리 설정
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from openai import AsyncOpenAI, OpenAI
+
+from benchmarks.fake_openai_server import FakeOpenAIServer
+from src.core.async_prompt_engine import AsyncPromptEngine
+from src.core.batch_runner import run_batch, run_batch_api
+from src.core.hedging import HedgePolicy
+from src.core.metrics import MetricsAggregator, percentile
+from src.core.openai_batch import OpenAIBatchBackend
+from src.core.prompt_engine import PromptEngine
+from src.core.scheduler import RequestScheduler
+
+MODES = ("single", "multi", "auto", "stream", "async", "async-multi", "batch", "openai-batch")
+
+SAMPLE_INPUT = "2023년 이후 온라인 소매업체의 마케팅 전략에 대해 단계별로 설명해줘. ROI와 고객 유지율에 중점을 두고 실제 사례를 포함해서 알려줘."
+
+# auto 모드에서 복잡한 입력과 번갈아 사용할 단순한 입력
+SIMPLE_INPUT = "신제품 이름 아이디어 알려줘"
+
+
+def make_inputs(count: int, mixed: bool = False) -> List[str]:
+    """캐시 적중을 피하도록 서로 다른 입력을 만듭니다. (mixed이면 단순한 입력과 복잡한 입력을 번갈아 사용)"""
+    if mixed:
+        return [f"[{i}] {SIMPLE_INPUT if i % 2 else SAMPLE_INPUT}" for i in range(count)]
+    return [f"[{i}] {SAMPLE_INPUT}" for i in range(count)]
+
+
+def peak_rss_mb() -> float:
+    """프로세스의 최대 상주 메모리(MB)"""
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS는 바이트, Linux는 KB 단위
+    return usage / (1024 * 1024) if sys.platform == "darwin" else usage / 1024
+
+
+def summarize(mode: str, latencies: List[float], errors: int, elapsed: float,
+              ttfts: Optional[List[float]] = None) -> Dict:
+    """요청별 지연 시간으로 처리량과 분위수를 계산합니다."""
+    latencies = sorted(latencies)
+    completed = len(latencies)
+    result = {
+        "mode": mode,
+        "requests": completed + errors,
+        "errors": errors,
+        "elapsed": elapsed,
+        "throughput": completed / elapsed if elapsed > 0 else 0.0,
+        "p50": percentile(latencies, 0.5),
+        "p95": percentile(latencies, 0.95),
+        "p99": percentile(latencies, 0.99),
+    }
+    if ttfts:
+        result["ttft_p50"] = percentile(sorted(ttfts), 0.5)
+        result["ttft_p95"] = percentile(sorted(ttfts), 0.95)
+    return result
+
+
+def run_threaded(mode: str, inputs: List[str], concurrency: int, transform: Callable[[str], Optional[float]]) -> Dict:
+    """동기 변환 함수를 스레드 풀에서 실행하고 결과를 요약합니다.
+
+    `transform`이 값을 반환하면 첫 토큰까지의 시간(초)으로 기록합니다.
+    """
+    latencies: List[float] = []
+    ttfts: List[float] = []
+    errors = 0
+
+    def timed(text: str):
+        started = time.perf_counter()
+        ttft = transform(text)
+        return time.perf_counter() - started, ttft
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(timed, text) for text in inputs]
+        for future in futures:
+            try:
+                latency, ttft = future.result()
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(latency)
+            if ttft is not None:
+                ttfts.append(ttft)
+    return summarize(mode, latencies, errors, time.perf_counter() - started, ttfts)
+
+
+def run_async(mode: str, inputs: List[str], concurrency: int, engine: AsyncPromptEngine,
+              use_multi_call: bool) -> Dict:
+    """비동기 엔진으로 변환을 동시에 실행하고 결과를 요약합니다."""
+
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def timed(text: str) -> float:
+            async with semaphore:
+                started = time.perf_counter()
+                await engine.transform_prompt(text, use_multi_call=use_multi_call)
+                return time.perf_counter() - started
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(timed(text) for text in inputs), return_exceptions=True)
+        elapsed = time.perf_counter() - started
+        await engine.client.close()
+        latencies = [r for r in results if not isinstance(r, BaseException)]
+        return summarize(mode, latencies, len(results) - len(latencies), elapsed)
+
+    return asyncio.run(main())
+
+
+def run_jsonl(mode: str, inputs: List[str], run: Callable[[str, str], Dict]) -> Dict:
+    """입력을 JSONL 파일로 저장하고 일괄 변환을 실행한 뒤 결과를 요약합니다."""
+    with tempfile.TemporaryDirectory(prefix="prompt-bench-") as work_dir:
+        input_path = os.path.join(work_dir, "input.jsonl")
+        output_path = os.path.join(work_dir, "output.jsonl")
+        with open(input_path, "w", encoding="utf-8") as f:
+            for i, text in enumerate(inputs):
+                f.write(json.dumps({"id": str(i), "input": text}, ensure_ascii=False) + "\n")
+
+        started = time.perf_counter()
+        stats = run(input_path, output_path)
+        elapsed = time.perf_counter() - started
+
+        latencies = []
+        with open(output_path, encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                if "prompt" in record:
+                    # Batch API 결과에는 요청별 시간이 없으므로 전체 시간을 사용
+                    latencies.append(record.get("elapsed", elapsed))
+    return summarize(mode, latencies, stats["failed"], elapsed)
+
+
+def run_mode(mode: str, args, base_url: str) -> Dict:
+    """벤치마크 모드 하나를 실행하고, 엔진 계측 기록의 API 호출 수와 입력/캐시 토큰 합계를 결과에 더합니다."""
+    metrics = MetricsAggregator()
+    result = _run_mode(mode, args, base_url, metrics)
+    rows = metrics.summary()
+    api_calls = sum(row["calls"] - row["cache_hits"] - row["coalesced"] for row in rows)
+    result["calls_per_request"] = api_calls / result["requests"] if result["requests"] else 0.0
+    result["hedges"] = sum(row["hedges"] for row in rows)
+    result["hedge_wins"] = sum(row["hedge_wins"] for row in rows)
+    result["prompt_tokens"] = sum(row["prompt_tokens"] for row in rows)
+    result["cached_tokens"] = sum(row["cached_tokens"] for row in rows)
+    return result
+
+
+def _run_mode(mode: str, args, base_url: str, metrics: MetricsAggregator) -> Dict:
+    inputs = make_inputs(args.requests, mixed=mode == "auto")
+    scheduler = RequestScheduler(max_retries=args.max_retries, base_delay=0.05, max_delay=1.0)
+    engine_options = dict(model=args.model, max_concurrency=args.max_concurrency, scheduler=scheduler,
+                          merge_analysis_calls=args.merge_analysis, structured_output=args.structured_output,
+                          prefix_cache_layout=args.prefix_cache_layout, instrumentation=metrics,
+                          hedging=HedgePolicy(
+                              percentile=args.hedge_percentile,
+                              model=args.hedge_model,
+                              max_hedge_rate=args.max_hedge_rate,
+                          ) if args.hedge_percentile is not None else None)
+
+    if mode in ("async", "async-multi"):
+        client = AsyncOpenAI(api_key="bench", base_url=base_url, max_retries=0)
+        engine = AsyncPromptEngine(client=client, **engine_options)
+        return run_async(mode, inputs, args.concurrency, engine, use_multi_call=mode == "async-multi")
+
+    client = OpenAI(api_key="bench", base_url=base_url, max_retries=0)
+    engine = PromptEngine(client=client, **engine_options)
+    try:
+        if mode == "single":
+            return run_threaded(mode, inputs, args.concurrency, lambda text: engine.transform_prompt(text) and None)
+        if mode == "multi":
+            return run_threaded(mode, inputs, args.concurrency,
+                                lambda text: engine.transform_prompt(text, use_multi_call=True) and None)
+        if mode == "auto":
+            return run_threaded(mode, inputs, args.concurrency,
+                                lambda text: engine.transform_prompt(text, use_multi_call="auto") and None)
+        if mode == "stream":
+            def stream(text: str) -> Optional[float]:
+                started = time.perf_counter()
+                ttft = None
+                for _ in engine.transform_prompt_single_call_stream(text):
+                    if ttft is None:
+                        ttft = time.perf_counter() - started
+                return ttft
+            return run_threaded(mode, inputs, args.concurrency, stream)
+        if mode == "batch":
+            return run_jsonl(mode, inputs, lambda input_path, output_path: run_batch(
+                engine, input_path, output_path, concurrency=args.concurrency, use_multi_call=args.multi_call))
+        if mode == "openai-batch":
+            backend = OpenAIBatchBackend(engine, poll_interval=0.01)
+            return run_jsonl(mode, inputs, lambda input_path, output_path: run_batch_api(
+                backend, input_path, output_path, use_multi_call=args.multi_call))
+        raise ValueError(f"알 수 없는 모드: {mode}")
+    finally:
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="프롬프트 엔진 오프라인 벤치마크")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES), help="실행할 벤치마크 모드")
+    parser.add_argument("--requests", type=int, default=50, help="모드별 변환 요청 수")
+    parser.add_argument("--concurrency", type=int, default=8, help="동시에 처리할 변환 요청 수")
+    parser.add_argument("--max-concurrency", type=int, default=6, help="다중 호출 방식의 단계 동시 실행 수")
+    parser.add_argument("--multi-call", action="store_true", help="batch/openai-batch 모드에서 다중 호출 방식 사용")
+    parser.add_argument("--merge-analysis", action="store_true", help="입력 분석과 형식 요구사항 추출을 한 번에 호출")
+    parser.add_argument("--structured-output", action="store_true", help="구조화 출력(JSON 스키마) 모드 사용")
+    parser.add_argument("--prefix-cache-layout", action="store_true",
+                        help="프롬프트 캐시가 적용되도록 고정 지시문을 앞쪽에 모은 메시지 구성 사용")
+    parser.add_argument("--model", default="gpt-4.1-nano", help="요청에 기록할 모델 이름")
+    parser.add_argument("--max-retries", type=int, default=4, help="요청 하나당 최대 재시도 횟수")
+    parser.add_argument("--latency", type=float, default=0.05, help="가짜 서버의 응답 지연 시간(초)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="가짜 서버의 지연 시간 편차(초)")
+    parser.add_argument("--token-interval", type=float, default=0.0, help="가짜 서버의 스트리밍 청크 간격(초)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="가짜 서버의 429/500 오류 확률 (0~1)")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="가짜 서버가 느리게 응답할 확률 (0~1)")
+    parser.add_argument("--slow-latency", type=float, default=1.0, help="가짜 서버의 느린 응답 지연 시간(초)")
+    parser.add_argument("--hedge-percentile", type=float,
+                        help="첫 토큰 시간이 이 분위수(예: 0.9)를 넘으면 중복 요청을 보냄 (지정하지 않으면 사용 안 함)")
+    parser.add_argument("--hedge-model", help="중복 요청에 사용할 모델 (없으면 같은 모델)")
+    parser.add_argument("--max-hedge-rate", type=float, default=0.1, help="전체 호출 중 중복 요청의 최대 비율")
+    parser.add_argument("--section-chars", type=int, default=400, help="가짜 서버의 섹션별 응답 길이(문자 수)")
+    parser.add_argument("--seed", type=int, default=0, help="가짜 서버의 난수 시드")
+    parser.add_argument("--base-url", help="별도로 실행한 서버 주소 (지정하면 내장 서버를 실행하지 않음)")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="tracemalloc으로 모드별 최대 할당량 측정 (측정 비용으로 처리량이 낮아짐)")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    parser.add_argument("--fail-above-p95", type=float,
+                        help="어느 모드든 p95 지연 시간(초)이 이 값을 넘거나 오류가 있으면 종료 코드 1")
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        server = FakeOpenAIServer(latency=args.latency, jitter=args.jitter, token_interval=args.token_interval,
+                                  error_rate=args.error_rate, section_chars=args.section_chars, seed=args.seed,
+                                  slow_rate=args.slow_rate, slow_latency=args.slow_latency).start()
+        base_url = server.base_url
+
+    results = []
+    try:
+        print(f"{'mode':>13} {'req':>5} {'err':>4} {'req/s':>8} {'p50(s)':>8} {'p95(s)':>8} {'p99(s)':>8} "
+              f"{'ttft50':>8} {'calls':>6} {'mem(MB)':>8} {'cached%':>8}")
+        for mode in args.modes:
+            if args.trace_memory:
+                tracemalloc.start()
+            result = run_mode(mode, args, base_url)
+            if args.trace_memory:
+                result["traced_peak_mb"] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+                tracemalloc.stop()
+            result["peak_rss_mb"] = peak_rss_mb()
+            results.append(result)
+            memory = result.get("traced_peak_mb", result["peak_rss_mb"])
+            ttft = f"{result['ttft_p50']:8.3f}" if "ttft_p50" in result else f"{'-':>8}"
+            cached = 100 * result["cached_tokens"] / result["prompt_tokens"] if result["prompt_tokens"] else 0.0
+            print(f"{mode:>13} {result['requests']:>5} {result['errors']:>4} {result['throughput']:>8.2f} "
+                  f"{result['p50']:>8.3f} {result['p95']:>8.3f} {result['p99']:>8.3f} {ttft} "
+                  f"{result['calls_per_request']:>6.2f} {memory:>8.1f} "
+                  f"{cached:>8.1f}")
+    finally:
+        if server is not None:
+            print(f"서버 요청 수: {server.request_count} (오류 응답 {server.error_count})")
+            if args.hedge_percentile is not None:
+                print(f"중복 요청: {sum(r['hedges'] for r in results)}회 "
+                      f"(먼저 끝난 경우 {sum(r['hedge_wins'] for r in results)}회)")
+            server.stop()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"settings": vars(args), "results": results}, f, ensure_ascii=False, indent=2)
+
+    if args.fail_above_p95 is not None:
+        failed = [r["mode"] for r in results if r["p95"] > args.fail_above_p95 or r["errors"]]
+        if failed:
+            print(f"기준 초과: {', '.join(failed)} (p95 > {args.fail_above_p95}s 또는 오류 발생)")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
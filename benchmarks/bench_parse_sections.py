@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+"""
+단일 호출 응답 섹션 파서 마이크로 벤치마크
+
+기존 방식(섹션마다 DOTALL 지연 정규식으로 전체 응답을 다시 훑는 6회 `re.search`)과
+`parse_sections()`의 단일 패스 방식을 큰 응답에 대해 비교합니다.
+측정 전에 헤더 경계 사례(`CHECK_CASES`)에서 일괄 파서와 스트리밍 파서의 결과를 확인합니다.
+
+    python benchmarks/bench_parse_sections.py --sizes 4 64 512 --repeat 20
+"""
+import argparse
+import re
+import sys
+import timeit
+from pathlib import Path
+
+# 프로젝트 루트 디렉토리 설정
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.core.sections import SectionStreamParser, parse_sections
+
+# 기존 transform_prompt_single_call의 섹션 패턴
+LEGACY_PATTERNS = {
+    "analysis": r"### 분석:(.*?)(?=### |$)",
+    "expert_role": r"### 전문가 역할:(.*?)(?=### |$)",
+    "instructions": r"### 지시사항:(.*?)(?=### |$)",
+    "response_style": r"### 응답 스타일:(.*?)(?=### |$)",
+    "reminders": r"### 주요 고려사항:(.*?)(?=### |$)",
+    "output_format": r"### 출력 형식:(.*?)(?=### |$)"
+}
+
+HEADERS = ["분석", "전문가 역할", "지시사항", "응답 스타일", "주요 고려사항", "출력 형식"]
+
+# 헤더 경계 사례: (응답, 기대하는 섹션 내용 중 None이 아닌 것)
+CHECK_CASES = [
+    # 섹션 안의 다른 수준 제목과 일반 단어 제목("Style")은 섹션을 나누지 않음
+    ("### 지시사항:\n1. 조사\n## Style\n- 간결하게\n2. 정리\n### 응답 스타일:\n친절하게",
+     {"instructions": "1. 조사\n## Style\n- 간결하게\n2. 정리", "response_style": "친절하게"}),
+    # 요청한 수준이 아닌 제목과 굵은 글씨, 영어 이름은 헤더로 보지 않음
+    ("# 지시사항\n1. 조사\n**Role:** 없음\n### Analysis:\n무시\n### 분석:\n분석 내용",
+     {"analysis": "분석 내용"}),
+    # 같은 헤더가 다시 나오면 처음 섹션을 유지하고 뒤의 내용을 이어 붙임
+    ("### 지시사항:\n1. 조사\n### 응답 스타일:\n친절하게\n### 지시사항:\n2. 정리",
+     {"instructions": "1. 조사\n\n2. 정리", "response_style": "친절하게"}),
+    # 번호, 괄호 설명, 굵은 글씨, 빠진 콜론과 알 수 없는 `###` 제목, 하위 제목
+    ("### 1. 분석\nA\n### **전문가 역할:**\nB\n#### 세부\nC\n### 참고:\nD\n### 출력 형식(선택적):\nE",
+     {"analysis": "A", "expert_role": "B\n#### 세부\nC", "output_format": "E"}),
+]
+
+
+def legacy_parse(content):
+    """기존 방식: 섹션마다 전체 응답을 다시 검색"""
+    sections = {}
+    for key, pattern in LEGACY_PATTERNS.items():
+        match = re.search(pattern, content, re.DOTALL)
+        sections[key] = match.group(1).strip() if match else None
+    return sections
+
+
+def stream_parse(content, chunk_size=8):
+    """스트리밍 파서로 작은 조각씩 나누어 파싱"""
+    parser = SectionStreamParser()
+    for i in range(0, len(content), chunk_size):
+        parser.feed(content[i:i + chunk_size])
+    parser.close()
+    return parser.sections()
+
+
+def check_cases():
+    """헤더 경계 사례에서 일괄 파서와 스트리밍 파서가 기대한 결과를 내는지 확인합니다."""
+    for content, expected in CHECK_CASES:
+        parsed = parse_sections(content)
+        assert {key: value for key, value in parsed.items() if value is not None} == expected, (content, parsed)
+        for chunk_size in (1, 3, 8):
+            assert stream_parse(content, chunk_size) == parsed, (content, chunk_size)
+
+
+def make_response(size_kb):
+    """약 size_kb KB 크기의 단일 호출 응답을 만듭니다."""
+    line = "- 고려해야 할 요소와 세부 지침을 구체적으로 설명합니다. Include concrete examples.\n"
+    per_section = max(1, (size_kb * 1024) // (len(line.encode("utf-8")) * len(HEADERS)))
+    return "".join(f"### {header}:\n" + line * per_section + "\n" for header in HEADERS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="섹션 파서 마이크로 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[4, 64, 512], help="응답 크기(KB) 목록")
+    parser.add_argument("--repeat", type=int, default=20, help="크기별 반복 횟수")
+    args = parser.parse_args()
+
+    check_cases()
+    print(f"{'size':>8} {'legacy(ms)':>12} {'parse_sections(ms)':>20} {'stream(ms)':>12} {'speedup':>8}")
+    for size in args.sizes:
+        content = make_response(size)
+        assert legacy_parse(content) == parse_sections(content) == stream_parse(content)
+        legacy = min(timeit.repeat(lambda: legacy_parse(content), number=1, repeat=args.repeat)) * 1000
+        single = min(timeit.repeat(lambda: parse_sections(content), number=1, repeat=args.repeat)) * 1000
+        stream = min(timeit.repeat(lambda: stream_parse(content), number=1, repeat=max(1, args.repeat // 4))) * 1000
+        print(f"{size:>6}KB {legacy:>12.3f} {single:>20.3f} {stream:>12.3f} {legacy / single:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
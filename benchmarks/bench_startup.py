@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+"""
+진입점 모듈의 시작(콜드 스타트) 시간 벤치마크
+
+각 진입점 모듈을 새 파이썬 프로세스에서 `-X importtime`으로 불러와 누적 임포트 시간과
+가장 오래 걸린 하위 모듈을 보고하고, 무거운 의존성(streamlit, openai, httpx, numpy)을
+시작할 때 불러오지 않는지 확인합니다. 임포트 시간이 예산을 넘거나 지연 로딩해야 할 모듈을
+시작할 때 불러오면 종료 코드 1을 반환하므로 시작 시간 회귀를 확인할 때 사용합니다.
+
+    python benchmarks/bench_startup.py --repeat 5 --budget-ms 150
+    python benchmarks/bench_startup.py --targets src.main --top 15
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+# 측정할 진입점 모듈
+TARGETS = (
+    "src.main",
+    "src.core.prompt_engine",
+    "src.core.async_prompt_engine",
+    "src.core.batch_runner",
+    "src.api.http_server",
+)
+
+# 필요할 때만 불러와야 하는 무거운 의존성
+LAZY_MODULES = ("streamlit", "openai", "httpx", "numpy")
+
+
+def measure(target: str) -> Tuple[float, float, List[Tuple[float, str]], List[str]]:
+    """새 프로세스에서 모듈을 한 번 불러옵니다.
+
+    Returns:
+        Tuple: (누적 임포트 시간(ms), 프로세스 실행 시간(ms), (자체 임포트 시간(ms), 모듈) 목록,
+                시작할 때 불러온 지연 로딩 대상 모듈 목록)
+    """
+    code = (
+        f"import sys, {target}; "
+        f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    )
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT_DIR, capture_output=True, text=True,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if completed.returncode != 0:
+        raise RuntimeError(f"{target} 임포트 실패:\n{completed.stderr.strip().splitlines()[-1]}")
+
+    cumulative_ms = 0.0
+    modules = []
+    for line in completed.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        modules.append((int(self_us) / 1000, name.strip()))
+        if name.strip() == target:
+            cumulative_ms = int(cumulative_us) / 1000
+    loaded = [m for m in completed.stdout.strip().split(",") if m]
+    return cumulative_ms, wall_ms, modules, loaded
+
+
+def interpreter_startup_ms() -> float:
+    """아무 모듈도 불러오지 않는 파이썬 프로세스의 실행 시간(ms)"""
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], cwd=ROOT_DIR, check=True)
+    return (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="진입점 모듈 시작 시간 벤치마크")
+    parser.add_argument("--targets", nargs="+", default=list(TARGETS), help="측정할 모듈")
+    parser.add_argument("--repeat", type=int, default=5, help="모듈별 측정 횟수 (중앙값 사용)")
+    parser.add_argument("--budget-ms", type=float, default=150.0, help="모듈별 누적 임포트 시간 예산(ms)")
+    parser.add_argument("--top", type=int, default=5, help="모듈별로 출력할 가장 느린 하위 모듈 수")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    baseline = statistics.median(interpreter_startup_ms() for _ in range(args.repeat))
+    print(f"python -c pass: {baseline:.1f} ms\n")
+    print(f"{'target':>28} {'import ms':>10} {'wall ms':>9}  {'budget':>6}  lazy modules loaded")
+
+    results: List[Dict] = []
+    for target in args.targets:
+        # 첫 실행은 바이트코드 컴파일이 포함되므로 측정에서 제외
+        measure(target)
+        runs = [measure(target) for _ in range(args.repeat)]
+        import_ms = statistics.median(run[0] for run in runs)
+        wall_ms = statistics.median(run[1] for run in runs)
+        loaded = runs[-1][3]
+        ok = import_ms <= args.budget_ms and not loaded
+        results.append({
+            "target": target,
+            "import_ms": import_ms,
+            "wall_ms": wall_ms,
+            "lazy_modules_loaded": loaded,
+            "within_budget": ok,
+            "slowest": [{"module": name, "self_ms": ms} for ms, name in sorted(runs[-1][2], reverse=True)[:args.top]],
+        })
+        print(f"{target:>28} {import_ms:>10.1f} {wall_ms:>9.1f}  {'ok' if ok else 'OVER':>6}  {', '.join(loaded) or '-'}")
+        for row in results[-1]["slowest"]:
+            print(f"{'':>30}{row['self_ms']:>8.1f} ms  {row['module']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"settings": vars(args), "python_startup_ms": baseline, "results": results},
+                      f, ensure_ascii=False, indent=2)
+
+    failed = [r["target"] for r in results if not r["within_budget"]]
+    if failed:
+        print(f"\n기준 초과: {', '.join(failed)} (임포트 시간 > {args.budget_ms}ms 또는 지연 로딩 대상 모듈 임포트)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
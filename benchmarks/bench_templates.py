@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""
+프롬프트 템플릿 토큰 수 보고서와 메시지 구성 마이크로 벤치마크
+
+`src/core/templates.py`의 템플릿별 추정 토큰 수(들여쓰기 제거 전후)와 접두어 캐시 레이아웃의
+단계별 고정 접두어 길이를 출력하고,
+다중 호출 방식의 단계별 요청 메시지를 구성하는 데 걸리는 시간을 측정합니다.
+
+    python benchmarks/bench_templates.py --repeat 10000
+"""
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+# 프로젝트 루트 디렉토리 설정
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.core.prompt_engine import PromptEngine
+from src.core.templates import PREFIX_CACHE_MIN_TOKENS, prefix_cache_report, template_token_report
+from src.core.tokens import estimate_message_tokens
+
+SAMPLE_ANALYSIS = {
+    "topic": "온라인 소매업체의 마케팅 전략",
+    "domain": "디지털 마케팅",
+    "purpose": "단계별 전략 수립",
+    "keywords": ["ROI", "고객 유지율", "온라인 소매", "마케팅", "사례"],
+    "expertise_level": "고급",
+    "scope": "2023년 이후",
+    "search_terms": ["ROI", "고객 유지율"],
+    "output_format": "단계별 가이드",
+    "special_requirements": "실제 사례 포함",
+}
+
+SAMPLE_INPUT = "2023년 이후 온라인 소매업체의 마케팅 전략에 대해 단계별로 설명해줘."
+
+
+def main():
+    parser = argparse.ArgumentParser(description="프롬프트 템플릿 토큰 수 보고서")
+    parser.add_argument("--repeat", type=int, default=10000, help="메시지 구성 반복 횟수")
+    args = parser.parse_args()
+
+    print(f"{'template':>28} {'source':>7} {'tokens':>7} {'saved':>6}  placeholders")
+    for row in template_token_report():
+        print(f"{row['name']:>28} {row['source_tokens']:>7} {row['tokens']:>7} {row['saved_tokens']:>6}  "
+              f"{', '.join(row['placeholders'])}")
+
+    print(f"\n{'prefix cache stage':>28} {'prefix':>7} {'shared':>7}  cacheable (>= {PREFIX_CACHE_MIN_TOKENS})")
+    for row in prefix_cache_report():
+        print(f"{row['stage']:>28} {row['prefix_tokens']:>7} {row['shared_tokens']:>7}  {'yes' if row['cacheable'] else 'no'}")
+
+    # API 클라이언트 없이 메시지 구성 메서드만 사용
+    engine = PromptEngine.__new__(PromptEngine)
+    engine.prefix_cache_layout = False
+    engine.token_budget = None
+    builders = {
+        "analysis": lambda: engine._build_analysis_messages(SAMPLE_INPUT),
+        "format_requirements": lambda: engine._build_format_requirements_messages(SAMPLE_INPUT),
+        "expert_role": lambda: engine._build_expert_role_messages(SAMPLE_ANALYSIS),
+        "instructions": lambda: engine._build_instructions_messages(SAMPLE_ANALYSIS),
+        "response_style": lambda: engine._build_response_style_messages(SAMPLE_ANALYSIS),
+        "reminders": lambda: engine._build_reminders_messages(SAMPLE_ANALYSIS),
+        "output_format": lambda: engine._build_output_format_messages(SAMPLE_ANALYSIS),
+        "single_call": lambda: engine._build_single_call_messages(SAMPLE_INPUT),
+    }
+
+    print(f"\n{'stage':>20} {'input tokens':>13} {'build (us)':>11}")
+    total = 0
+    for stage, build in builders.items():
+        tokens = estimate_message_tokens(build())
+        total += tokens
+        seconds = timeit.timeit(build, number=args.repeat) / args.repeat
+        print(f"{stage:>20} {tokens:>13} {seconds * 1e6:>11.2f}")
+    print(f"{'total':>20} {total:>13}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,409 @@
+#!/usr/bin/env python
+"""
+벤치마크용 로컬 OpenAI 호환 HTTP 서버
+
+네트워크 없이 엔진의 성능을 측정할 수 있도록 표준 라이브러리만으로
+다음 엔드포인트를 흉내 냅니다.
+
+- POST /v1/chat/completions (일반 응답과 SSE 스트리밍, `response_format`, `stream_options`)
+- POST /v1/files, GET /v1/files/{id}/content
+- POST /v1/batches, GET /v1/batches/{id}
+
+응답 지연(`latency`), 지연 편차(`jitter`), 가끔 매우 느린 응답(`slow_rate`, `slow_latency`),
+스트리밍 토큰 간격(`token_interval`), 오류율(`error_rate`, 429/500 응답)을 조절할 수 있습니다. 앞서 받은 요청과 같은 접두어가
+1024토큰 이상이면 OpenAI 자동 프롬프트 캐시처럼 `usage.prompt_tokens_details.cached_tokens`를 보고합니다.
+
+    python benchmarks/fake_openai_server.py --port 8089 --latency 0.2 --jitter 0.05
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from email.parser import BytesParser
+from email.policy import default as default_policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+# 단일 호출 요청에 대한 섹션 응답에 사용할 헤더
+SINGLE_CALL_HEADERS = ["분석", "전문가 역할", "지시사항", "응답 스타일", "주요 고려사항", "출력 형식"]
+
+FORMAT_REQUIREMENTS = {
+    "format_type": "단계별 가이드",
+    "sections": ["개요", "전략", "사례"],
+    "style": "설명적",
+    "special_requirements": "",
+}
+
+ANALYSIS = {
+    "topic": "온라인 소매업 마케팅 전략",
+    "domain": "마케팅",
+    "purpose": "전략 수립 가이드",
+    "keywords": ["마케팅", "ROI", "고객 유지율"],
+    "expertise_level": "고급",
+    "scope": "2023년 이후",
+    "search_terms": ["ROI", "고객 유지율"],
+    "output_format": "단계별 가이드",
+    "special_requirements": "실제 사례 포함",
+}
+
+SENTENCE = "고려해야 할 요소와 세부 지침을 구체적으로 설명합니다. "
+
+# 프롬프트 캐시가 적용되는 최소 접두어 길이와 캐시 단위(토큰)
+PROMPT_CACHE_MIN_TOKENS = 1024
+PROMPT_CACHE_BLOCK_TOKENS = 128
+
+
+def estimate_tokens(text: str) -> int:
+    """응답의 usage에 기록할 대략적인 토큰 수 (ASCII 4자당 1토큰, 그 밖의 문자 1자당 1토큰)"""
+    ascii_chars = sum(1 for ch in text if ch.isascii())
+    return max(1, (ascii_chars + 3) // 4 + len(text) - ascii_chars)
+
+
+def build_completion_text(body: Dict, section_chars: int) -> str:
+    """요청 내용에 맞는 응답 텍스트를 만듭니다."""
+    messages = body.get("messages") or []
+    system = messages[0].get("content", "") if messages else ""
+    if body.get("response_format") or "JSON" in system:
+        if "format_requirements" in system and "topic" in system:
+            return json.dumps({**ANALYSIS, "format_requirements": FORMAT_REQUIREMENTS}, ensure_ascii=False)
+        if "형식 요구사항" in system:
+            return json.dumps(FORMAT_REQUIREMENTS, ensure_ascii=False)
+        return json.dumps(ANALYSIS, ensure_ascii=False)
+    body_text = (SENTENCE * (section_chars // len(SENTENCE) + 1))[:section_chars]
+    if "### 분석:" in system:
+        return "".join(f"### {header}:\n{body_text}\n\n" for header in SINGLE_CALL_HEADERS)
+    return body_text
+
+
+class _Server(ThreadingHTTPServer):
+    # 동시 연결이 몰릴 때 기본 대기열(5)이 넘쳐 SYN 재전송으로 1초씩 지연되지 않도록 늘림
+    request_queue_size = 256
+    daemon_threads = True
+
+    def handle_error(self, request, client_address) -> None:
+        # 클라이언트가 연결을 먼저 끊는 경우(취소된 요청)는 오류로 출력하지 않음
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class FakeOpenAIServer:
+    """OpenAI 호환 API를 흉내 내는 로컬 서버
+
+    `with FakeOpenAIServer(...) as server:` 블록 안에서 `server.base_url`을
+    OpenAI 클라이언트의 `base_url`로 사용합니다.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.05, jitter: float = 0.0,
+                 token_interval: float = 0.0, error_rate: float = 0.0, retry_after: float = 0.05,
+                 section_chars: int = 400, seed: Optional[int] = None, slow_rate: float = 0.0,
+                 slow_latency: float = 1.0):
+        """초기화 함수
+
+        Args:
+            host: 바인딩할 주소
+            port: 바인딩할 포트 (0이면 빈 포트 자동 선택)
+            latency: 응답(스트리밍은 첫 토큰)까지의 기본 지연 시간(초)
+            jitter: 지연 시간에 더할 무작위 편차의 최대값(초)
+            token_interval: 스트리밍 응답의 청크 사이 간격(초)
+            error_rate: 429 또는 500 오류로 응답할 확률 (0~1)
+            retry_after: 429 응답의 `retry-after-ms` 헤더 값(초)
+            section_chars: 섹션별 응답 길이(문자 수)
+            seed: 지연/오류 난수 시드
+            slow_rate: `latency` 대신 `slow_latency`만큼 지연할 확률 (0~1, 꼬리 지연 시간 재현용)
+            slow_latency: 느린 응답의 지연 시간(초)
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.token_interval = token_interval
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.section_chars = section_chars
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.files: Dict[str, bytes] = {}
+        self.batches: Dict[str, Dict] = {}
+        self.request_count = 0
+        self.error_count = 0
+        self._prefix_hashes: set = set()
+        self._server = _Server((host, port), self._handler_class())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeOpenAIServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-openai", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeOpenAIServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _count(self, name: str) -> None:
+        with self._rng_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _random(self) -> float:
+        with self._rng_lock:
+            return self._rng.random()
+
+    def _delay(self) -> float:
+        if self.slow_rate and self._random() < self.slow_rate:
+            return self.slow_latency
+        return self.latency + self.jitter * self._random()
+
+    def _complete(self, body: Dict) -> Dict:
+        """채팅 완성 응답 객체를 만듭니다."""
+        content = build_completion_text(body, self.section_chars)
+        prompt = "\n".join(m.get("content") or "" for m in body.get("messages") or [])
+        prompt_tokens = estimate_tokens(prompt)
+        completion_tokens = estimate_tokens(content)
+        cached_tokens = self._cached_prefix_tokens(prompt)
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "prompt_tokens_details": {"cached_tokens": cached_tokens},
+            },
+        }
+
+    def _cached_prefix_tokens(self, prompt: str) -> int:
+        """앞서 받은 요청과 겹치는 접두어 중 캐시로 처리되었을 토큰 수를 계산합니다.
+
+        접두어를 일정한 길이의 블록 경계마다 해시로 기록해 두고,
+        이미 기록된 가장 긴 접두어가 최소 길이 이상이면 블록 단위로 내림하여 반환합니다.
+        """
+        boundaries = []
+        tokens = 0
+        for i, ch in enumerate(prompt):
+            tokens += 1 if not ch.isascii() else 0.25
+            if tokens >= (len(boundaries) + 1) * PROMPT_CACHE_BLOCK_TOKENS:
+                boundaries.append(i + 1)
+        hashes = [hashlib.sha1(prompt[:end].encode("utf-8")).hexdigest() for end in boundaries]
+        with self._rng_lock:
+            matched = 0
+            for count, digest in enumerate(hashes, 1):
+                if digest not in self._prefix_hashes:
+                    break
+                matched = count
+            self._prefix_hashes.update(hashes)
+        cached = matched * PROMPT_CACHE_BLOCK_TOKENS
+        return cached if cached >= PROMPT_CACHE_MIN_TOKENS else 0
+
+    def _run_batch(self, batch: Dict) -> None:
+        """Batch 작업의 입력 파일을 즉시 처리하여 결과 파일을 만듭니다."""
+        lines: List[str] = []
+        for line in self.files[batch["input_file_id"]].decode("utf-8").splitlines():
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            lines.append(json.dumps({
+                "id": f"batch_req_{uuid.uuid4().hex[:12]}",
+                "custom_id": request["custom_id"],
+                "response": {"status_code": 200, "request_id": uuid.uuid4().hex, "body": self._complete(request["body"])},
+                "error": None,
+            }, ensure_ascii=False))
+        output_id = f"file-{uuid.uuid4().hex[:12]}"
+        self.files[output_id] = ("\n".join(lines) + "\n").encode("utf-8")
+        batch.update({
+            "status": "completed",
+            "output_file_id": output_id,
+            "completed_at": int(time.time()),
+            "request_counts": {"total": len(lines), "completed": len(lines), "failed": 0},
+        })
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status: int, payload: Dict, headers: Optional[Dict[str, str]] = None) -> None:
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _read_body(self) -> bytes:
+                return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+            def _maybe_fail(self) -> bool:
+                """설정된 확률로 429 또는 500 오류를 응답합니다."""
+                if server.error_rate <= 0 or server._random() >= server.error_rate:
+                    return False
+                server._count("error_count")
+                if server._random() < 0.5:
+                    self._send_json(429, {"error": {"message": "Rate limit reached", "type": "requests",
+                                                    "code": "rate_limit_exceeded"}},
+                                    {"retry-after-ms": str(int(server.retry_after * 1000))})
+                else:
+                    self._send_json(500, {"error": {"message": "Internal server error", "type": "server_error",
+                                                    "code": None}})
+                return True
+
+            def do_POST(self):
+                server._count("request_count")
+                body = self._read_body()
+                if self.path.endswith("/chat/completions"):
+                    self._chat_completions(json.loads(body))
+                elif self.path.endswith("/files"):
+                    self._create_file(body)
+                elif self.path.endswith("/batches"):
+                    self._create_batch(json.loads(body))
+                else:
+                    self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+            def do_GET(self):
+                server._count("request_count")
+                match = re.search(r"/files/([^/]+)/content$", self.path)
+                if match and match.group(1) in server.files:
+                    data = server.files[match.group(1)]
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/octet-stream")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                    return
+                match = re.search(r"/batches/([^/]+)$", self.path)
+                if match and match.group(1) in server.batches:
+                    self._send_json(200, server.batches[match.group(1)])
+                    return
+                self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+            def _chat_completions(self, body: Dict) -> None:
+                time.sleep(server._delay())
+                if self._maybe_fail():
+                    return
+                response = server._complete(body)
+                if not body.get("stream"):
+                    self._send_json(200, response)
+                    return
+
+                # SSE 스트리밍: 응답을 작은 청크로 나누어 전송
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                content = response["choices"][0]["message"]["content"]
+                base = {"id": response["id"], "object": "chat.completion.chunk",
+                        "created": response["created"], "model": response["model"]}
+                for i in range(0, len(content), 8):
+                    self._write_event({**base, "choices": [{"index": 0, "delta": {"content": content[i:i + 8]},
+                                                            "finish_reason": None}]})
+                    if server.token_interval:
+                        time.sleep(server.token_interval)
+                self._write_event({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+                if (body.get("stream_options") or {}).get("include_usage"):
+                    self._write_event({**base, "choices": [], "usage": response["usage"]})
+                self._write_chunk(b"data: [DONE]\n\n")
+                self._write_chunk(b"")
+
+            def _write_event(self, payload: Dict) -> None:
+                self._write_chunk(f"data: {json.dumps(payload, ensure_ascii=False)}\n\n".encode("utf-8"))
+
+            def _write_chunk(self, data: bytes) -> None:
+                self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+            def _create_file(self, body: bytes) -> None:
+                message = BytesParser(policy=default_policy).parsebytes(
+                    b"Content-Type: " + self.headers["Content-Type"].encode("latin-1") + b"\r\n\r\n" + body
+                )
+                file_id = f"file-{uuid.uuid4().hex[:12]}"
+                filename, purpose = "input.jsonl", "batch"
+                for part in message.iter_parts():
+                    name = part.get_param("name", header="content-disposition")
+                    if name == "file":
+                        server.files[file_id] = part.get_payload(decode=True)
+                        filename = part.get_filename() or filename
+                    elif name == "purpose":
+                        purpose = part.get_content().strip()
+                self._send_json(200, {
+                    "id": file_id, "object": "file", "bytes": len(server.files.get(file_id, b"")),
+                    "created_at": int(time.time()), "filename": filename, "purpose": purpose, "status": "processed",
+                })
+
+            def _create_batch(self, body: Dict) -> None:
+                batch_id = f"batch_{uuid.uuid4().hex[:12]}"
+                batch = {
+                    "id": batch_id, "object": "batch", "endpoint": body["endpoint"],
+                    "input_file_id": body["input_file_id"], "completion_window": body["completion_window"],
+                    "status": "in_progress", "created_at": int(time.time()),
+                    "output_file_id": None, "error_file_id": None,
+                    "request_counts": {"total": 0, "completed": 0, "failed": 0},
+                }
+                server.batches[batch_id] = batch
+                self._send_json(200, dict(batch))
+                server._run_batch(batch)
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="벤치마크용 로컬 OpenAI 호환 서버")
+    parser.add_argument("--host", default="127.0.0.1", help="바인딩할 주소")
+    parser.add_argument("--port", type=int, default=8089, help="바인딩할 포트")
+    parser.add_argument("--latency", type=float, default=0.05, help="응답까지의 기본 지연 시간(초)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="지연 시간 편차의 최대값(초)")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="느린 응답(--slow-latency) 확률 (0~1)")
+    parser.add_argument("--slow-latency", type=float, default=1.0, help="느린 응답의 지연 시간(초)")
+    parser.add_argument("--token-interval", type=float, default=0.0, help="스트리밍 청크 사이 간격(초)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="429/500 오류 응답 확률 (0~1)")
+    parser.add_argument("--section-chars", type=int, default=400, help="섹션별 응답 길이(문자 수)")
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        slow_rate=args.slow_rate,
+        slow_latency=args.slow_latency,
+        token_interval=args.token_interval,
+        error_rate=args.error_rate,
+        section_chars=args.section_chars,
+    )
+    print(f"가짜 OpenAI 서버 실행 중: {server.base_url} (종료: Ctrl+C)")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
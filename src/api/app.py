@@ -2,13 +2,25 @@ import streamlit as st
 import os
 import sys
 from pathlib import Path
+from typing import Optional
 import streamlit.components.v1 as components
 
 # 상위 디렉토리 경로를 추가하여 core 모듈 임포트 가능하게 설정
 current_dir = Path(__file__).parent
 sys.path.append(str(current_dir.parent.parent))
 
-from src.core.prompt_engine import PromptEngine
+from src.core.engine_registry import EngineRegistry
+from src.core.hedging import HedgePolicy
+from src.core.incremental import apply_options
+from src.core.long_input import DEFAULT_CHUNK_TOKENS, LongInputPolicy
+from src.core.metrics import request_trace
+from src.core.prompt_engine import PROMPT_EVENT
+from src.core.sections import SECTION_KEYS
+from src.core.response_cache import ResponseCache
+from src.core.router import missing_sections, route_input
+from src.core.scheduler import RateLimit, RequestScheduler
+from src.core.semantic_cache import SemanticCache
+from src.core.token_budget import DEFAULT_MAX_INPUT_TOKENS, TRUNCATE, TokenBudget
 
 # 페이지 설정
 st.set_page_config(
@@ -18,6 +30,82 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+@st.cache_resource
+def get_response_cache() -> ResponseCache:
+    """모든 세션이 공유하는 API 응답 캐시를 반환합니다."""
+    return ResponseCache(disk_path=os.getenv("PROMPT_CACHE_PATH") or None)
+
+@st.cache_resource
+def get_request_scheduler() -> RequestScheduler:
+    """모든 세션이 공유하는 요청 스케줄러를 반환합니다. (속도 제한과 재시도)"""
+    rpm = os.getenv("PROMPT_RATE_LIMIT_RPM")
+    tpm = os.getenv("PROMPT_RATE_LIMIT_TPM")
+    return RequestScheduler(default_limit=RateLimit(
+        rpm=int(rpm) if rpm else None,
+        tpm=int(tpm) if tpm else None,
+    ))
+
+@st.cache_resource
+def get_semantic_cache() -> Optional[SemanticCache]:
+    """모든 세션이 공유하는 의미 캐시를 반환합니다. (PROMPT_SEMANTIC_CACHE_THRESHOLD 미설정 시 None)"""
+    threshold = os.getenv("PROMPT_SEMANTIC_CACHE_THRESHOLD")
+    if not threshold:
+        return None
+    return SemanticCache(threshold=float(threshold), path=os.getenv("PROMPT_SEMANTIC_CACHE_PATH") or None)
+
+@st.cache_resource
+def get_hedge_policy() -> Optional[HedgePolicy]:
+    """모든 세션이 공유하는 중복 요청(헤징) 정책을 반환합니다. (PROMPT_HEDGE_PERCENTILE 미설정 시 None)"""
+    hedge_percentile = os.getenv("PROMPT_HEDGE_PERCENTILE")
+    if not hedge_percentile:
+        return None
+    return HedgePolicy(percentile=float(hedge_percentile), model=os.getenv("PROMPT_HEDGE_MODEL") or None)
+
+@st.cache_resource
+def get_token_budget() -> Optional[TokenBudget]:
+    """단계별 출력 토큰 예산과 입력 크기 제한을 반환합니다. (PROMPT_TOKEN_BUDGETS 미설정 시 None)"""
+    token_budgets = os.getenv("PROMPT_TOKEN_BUDGETS")
+    if not token_budgets:
+        return None
+    return TokenBudget.from_overrides(
+        [item for item in token_budgets.split(",") if "=" in item],
+        max_input_tokens=int(os.getenv("PROMPT_MAX_INPUT_TOKENS", DEFAULT_MAX_INPUT_TOKENS)),
+        input_policy=os.getenv("PROMPT_INPUT_OVERFLOW", TRUNCATE),
+    )
+
+@st.cache_resource
+def get_long_input_policy() -> Optional[LongInputPolicy]:
+    """긴 입력을 요약 브리프로 줄이는 정책을 반환합니다. (PROMPT_LONG_INPUT_THRESHOLD 미설정 시 None)"""
+    threshold = os.getenv("PROMPT_LONG_INPUT_THRESHOLD")
+    if not threshold:
+        return None
+    return LongInputPolicy(
+        threshold_tokens=int(threshold),
+        chunk_tokens=int(os.getenv("PROMPT_LONG_INPUT_CHUNK_TOKENS", DEFAULT_CHUNK_TOKENS)),
+    )
+
+@st.cache_resource
+def get_engine_registry() -> EngineRegistry:
+    """모든 세션이 공유하는 엔진 레지스트리를 반환합니다.
+
+    API 키별 OpenAI 클라이언트의 keep-alive 연결을 재사용하므로 버튼을 누를 때마다
+    새 연결을 맺지 않습니다.
+    """
+    return EngineRegistry(
+        max_connections=int(os.getenv("PROMPT_ENGINE_MAX_CONNECTIONS", "100")),
+        max_keepalive_connections=int(os.getenv("PROMPT_ENGINE_MAX_KEEPALIVE", "20")),
+        max_engines=int(os.getenv("PROMPT_ENGINE_MAX_ENGINES", "32")),
+        cache=get_response_cache(),
+        scheduler=get_request_scheduler(),
+        prefix_cache_layout=os.getenv("PROMPT_PREFIX_CACHE_LAYOUT", "").lower() in ("1", "true", "yes"),
+        semantic_cache=get_semantic_cache(),
+        hedging=get_hedge_policy(),
+        token_budget=get_token_budget(),
+        long_input=get_long_input_policy(),
+        # 여러 세션이 같은 입력을 동시에 변환하면 API 호출을 한 번만 보냄
+        coalesce_requests=True,
+    )
+
 # 스타일 정의
 st.markdown("""
 <style>
@@ -100,7 +188,7 @@ with st.sidebar:
     # API 호출 방식 선택
     api_call_method = st.radio(
         "API 호출 방식:",
-        ["단일 호출 (보통 품질, 낮은 비용)", "다중 호출 (높은 품질, 높은 비용)"],
+        ["단일 호출 (보통 품질, 낮은 비용)", "다중 호출 (높은 품질, 높은 비용)", "자동 선택 (입력 복잡도에 따라)"],
         index=0
     )
     
@@ -179,33 +267,84 @@ if transform_button and user_input:
             if not openai_api_key:
                 st.error("⚠️ OpenAI API 키가 필요합니다. 사이드바에서 입력해주세요.")
             else:
-                # 프롬프트 엔진 초기화 및 변환
-                engine = PromptEngine(openai_api_key=openai_api_key)
-                
-                # 선택한 모델이 모든 API 호출에 적용되도록 설정
-                engine.model = st.session_state.model
-                engine.temperature = st.session_state.temperature
+                # 선택한 모델과 temperature에 해당하는 공유 엔진 사용
+                engine = get_engine_registry().get_engine(
+                    openai_api_key,
+                    model=st.session_state.model,
+                    temperature=st.session_state.temperature,
+                )
                 
                 # 변환 전 커스텀 옵션이 있으면 입력에 추가
-                enhanced_input = user_input
-                if scope:
-                    enhanced_input += f"\n\n범위: {scope}"
-                if output_format != "자동 감지":
-                    enhanced_input += f"\n\n출력 형식: {output_format}"
-                if special_requirements:
-                    enhanced_input += f"\n\n특별 요구사항: {special_requirements}"
+                options = {
+                    "scope": scope,
+                    "output_format": output_format if output_format != "자동 감지" else None,
+                    "special_requirements": special_requirements,
+                }
+                enhanced_input = apply_options(user_input, options)
                 
-                # API 호출 방식 선택을 적용
-                use_multi_call = api_call_method.startswith("다중 호출")
-                transformed_prompt = engine.transform_prompt(enhanced_input, use_multi_call=use_multi_call)
+                # API 호출 방식 선택을 적용 (자동 선택이면 API 호출 없이 입력 복잡도로 판단)
+                auto_route = api_call_method.startswith("자동 선택")
+                if auto_route:
+                    use_multi_call = route_input(enhanced_input).use_multi_call
+                else:
+                    use_multi_call = api_call_method.startswith("다중 호출")
                 
                 # 결과 표시
                 st.markdown('<div class="highlight">', unsafe_allow_html=True)
                 st.subheader("🎯 변환된 프롬프트")
-                st.code(transformed_prompt, language="xml")
+                
+                # 이번 변환에서 발생한 API 호출을 기록
+                with request_trace() as calls:
+                    if use_multi_call:
+                        # 이전 다중 호출 결과가 있으면 바뀐 옵션이 영향을 주는 섹션만 다시 생성
+                        previous = st.session_state.get("previous_transform")
+                        result = engine.transform_prompt_incremental(user_input, options, previous=previous)
+                        st.session_state.previous_transform = result
+                        transformed_prompt = result.prompt
+                        st.code(transformed_prompt, language="xml")
+                        if previous is not None:
+                            st.caption("다시 생성한 단계: " + (", ".join(result.regenerated) or "없음 (이전 결과 재사용)"))
+                    else:
+                        # 단일 호출은 섹션이 도착하는 대로 점진적으로 표시
+                        prompt_placeholder = st.empty()
+                        partial_sections = {}
+                        for section, text in engine.transform_prompt_single_call_stream(enhanced_input):
+                            if section == PROMPT_EVENT:
+                                transformed_prompt = text
+                            else:
+                                partial_sections[section] = partial_sections.get(section, "") + text
+                                partial_prompt = engine.assemble_single_call_prompt(
+                                    {key: partial_sections.get(key, "").strip() or None for key in SECTION_KEYS}
+                                )
+                                prompt_placeholder.code(partial_prompt, language="xml")
+                        # 자동 선택에서 단일 호출 응답에 필수 섹션이 빠지면 다중 호출 방식으로 다시 변환
+                        if auto_route and engine.auto_escalation and partial_sections \
+                                and missing_sections(partial_sections):
+                            with st.spinner("일부 섹션이 누락되어 다중 호출 방식으로 다시 변환하는 중..."):
+                                transformed_prompt = engine.transform_prompt(enhanced_input, use_multi_call=True)
+                            use_multi_call = True
+                        prompt_placeholder.code(transformed_prompt, language="xml")
                 
                 # 사용된 설정 표시
-                st.caption(f"사용 모델: {st.session_state.model}, Temperature: {st.session_state.temperature}")
+                st.caption(f"사용 모델: {st.session_state.model}, Temperature: {st.session_state.temperature}"
+                           + (f", 호출 방식: {'다중' if use_multi_call else '단일'} 호출 (자동 선택)" if auto_route else ""))
+                
+                # 단계별 소요 시간과 토큰 사용량 표시
+                with st.expander("⏱️ 단계별 소요 시간과 토큰 사용량"):
+                    st.table([
+                        {
+                            "단계": call.stage,
+                            "소요 시간(초)": round(call.wall_time, 2),
+                            "첫 토큰(초)": round(call.ttft, 2) if call.ttft is not None else "-",
+                            "입력 토큰": call.prompt_tokens,
+                            "출력 토큰": call.completion_tokens,
+                            "캐시된 입력 토큰": call.cached_tokens,
+                            "캐시": "✓" if call.cache_hit else "",
+                            "중복 요청": "사용" if call.hedge_won else ("✓" if call.hedged else ""),
+                            "재시도": call.retries,
+                        }
+                        for call in calls
+                    ])
                 
                 # 클립보드 복사 버튼과 다운로드 버튼을 가로로 배치
                 col1, col2 = st.columns(2)
@@ -0,0 +1,561 @@
+"""
+프롬프트 변환 엔진 HTTP API 서버
+
+Streamlit 없이 다른 서비스에서 엔진을 호출할 수 있도록 표준 라이브러리 asyncio만으로
+HTTP/1.1(keep-alive) 엔드포인트를 제공합니다.
+
+- POST /transform: 입력 하나를 변환하고 `TransformResult`를 JSON으로 반환
+  (`deadline`(초)을 지정하면 예산 안에서 변환하고, 생략하거나 대체한 섹션을 `degraded`로 보고)
+  (토큰 예산을 설정한 서버에서 입력 토큰 한도를 넘는 입력을 거절하면 413)
+- POST /transform/batch: 여러 입력을 동시에 변환하고 입력 순서대로 결과를 반환
+- POST /transform/stream: 단일 호출 방식의 변환 결과를 섹션별 SSE(Server-Sent Events)로 스트리밍
+  (`use_multi_call: "auto"`이면 입력 복잡도에 따라 다중 호출 방식으로 변환)
+- GET /healthz: 처리 중/대기 중인 요청 수
+- GET /metrics: 단계별 지연 시간/토큰 집계 (Prometheus 텍스트 형식)
+
+동시에 처리할 변환 수(`max_concurrency`)와 대기열 길이(`max_queue`)를 넘는 요청은
+기다리게 하지 않고 바로 503(Retry-After)으로 거절하여 호출 측이 부하를 조절하도록 합니다.
+
+    python src/main.py --mode api --port 8000
+"""
+import asyncio
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple, Union
+
+from src.core.deadline import DeadlineExceededError
+from src.core.engine_registry import EngineRegistry
+from src.core.hedging import HedgePolicy
+from src.core.long_input import DEFAULT_CHUNK_TOKENS, LongInputPolicy
+from src.core.metrics import MetricsAggregator
+from src.core.prompt_engine import PROMPT_EVENT
+from src.core.response_cache import ResponseCache
+from src.core.router import AUTO_ROUTE, missing_sections, route_input
+from src.core.scheduler import RateLimit, RequestScheduler
+from src.core.semantic_cache import SemanticCache
+from src.core.token_budget import DEFAULT_MAX_INPUT_TOKENS, TRUNCATE, InputTooLargeError, TokenBudget
+
+# 요청 본문 최대 크기 (바이트)
+MAX_BODY_BYTES = 1024 * 1024
+# 요청 헤더 최대 크기 (바이트)
+MAX_HEADER_BYTES = 16 * 1024
+# 다음 요청을 기다리며 유휴 연결을 유지할 시간(초)
+KEEPALIVE_TIMEOUT = 15.0
+# 요청에서 지정할 수 있는 기본 모델 (웹 인터페이스의 모델 선택지와 같음)
+DEFAULT_ALLOWED_MODELS = ("gpt-4.1", "gpt-4.1-mini", "gpt-4.1-nano")
+# 요청에서 지정할 수 있는 temperature 범위 (OpenAI API와 같음)
+TEMPERATURE_RANGE = (0.0, 2.0)
+
+
+class HTTPError(Exception):
+    """HTTP 오류 응답으로 변환할 예외"""
+
+    def __init__(self, status: int, message: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+@dataclass
+class Request:
+    """파싱한 HTTP 요청"""
+    method: str
+    path: str
+    headers: Dict[str, str]
+    body: bytes = b""
+
+    def json(self) -> Dict[str, Any]:
+        """본문을 JSON 객체로 파싱합니다.
+
+        Raises:
+            HTTPError: 본문이 JSON 객체가 아닌 경우 (400)
+        """
+        try:
+            data = json.loads(self.body or b"{}")
+        except ValueError as e:
+            raise HTTPError(400, f"요청 본문이 올바른 JSON이 아닙니다: {e}")
+        if not isinstance(data, dict):
+            raise HTTPError(400, "요청 본문은 JSON 객체여야 합니다.")
+        return data
+
+
+@dataclass
+class Response:
+    """HTTP 응답"""
+    status: int
+    body: bytes = b""
+    content_type: str = "application/json; charset=utf-8"
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+def json_response(data: Any, status: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+    """데이터를 JSON 응답으로 만듭니다."""
+    body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+    return Response(status=status, body=body, headers=headers or {})
+
+
+def sse_event(event: str, data: Dict[str, Any]) -> bytes:
+    """SSE 이벤트 하나를 직렬화합니다."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8")
+
+
+class AdmissionController:
+    """동시 처리 한도와 대기열 길이 제한 (backpressure)
+
+    처리 중인 요청이 `max_concurrency`개이면 새 요청은 대기열에서 기다리고,
+    대기열까지 가득 차면 바로 503으로 거절합니다.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    def check(self, count: int = 1) -> None:
+        """요청 `count`개를 더 받을 수 있는지 확인합니다.
+
+        Raises:
+            HTTPError: 처리 중인 요청과 대기 중인 요청이 한도를 넘는 경우 (503)
+        """
+        if self.active + self.waiting + count > self.max_concurrency + self.max_queue:
+            self.rejected += 1
+            raise HTTPError(503, "처리할 수 있는 요청 수를 넘었습니다. 잠시 후 다시 시도해주세요.",
+                            {"Retry-After": "1"})
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """처리 슬롯을 얻을 때까지 기다린 뒤 블록이 끝나면 반환합니다."""
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+
+
+class PromptAPIServer:
+    """엔진 레지스트리의 비동기 엔진으로 변환 요청을 처리하는 HTTP API 서버"""
+
+    def __init__(self, registry: EngineRegistry, api_key: str, model: str = "gpt-4.1-nano",
+                 temperature: float = 0.7, max_concurrency: int = 32, max_queue: int = 256,
+                 request_timeout: Optional[float] = 120.0, max_batch_size: int = 100,
+                 auth_token: Optional[str] = None, allowed_models: Optional[Sequence[str]] = None):
+        """초기화 함수
+
+        Args:
+            registry: 비동기 엔진과 연결 풀을 제공할 엔진 레지스트리
+            api_key: OpenAI API 키
+            model: 요청에서 모델을 지정하지 않은 경우 사용할 모델
+            temperature: 요청에서 temperature를 지정하지 않은 경우 사용할 값
+            max_concurrency: 동시에 처리할 최대 변환 수
+            max_queue: 처리 슬롯을 기다릴 수 있는 최대 요청 수 (넘으면 503)
+            request_timeout: 변환 하나의 제한 시간(초, None이면 제한 없음. 넘으면 504)
+            max_batch_size: 일괄 변환 요청 하나에 담을 수 있는 최대 입력 수
+            auth_token: 설정하면 `Authorization: Bearer <토큰>` 헤더가 일치하는 요청만 처리
+            allowed_models: 요청에서 지정할 수 있는 모델 (없으면 `DEFAULT_ALLOWED_MODELS`, `model`은 항상 허용)
+        """
+        self.registry = registry
+        self.api_key = api_key
+        self.model = model
+        self.temperature = temperature
+        self.request_timeout = request_timeout
+        self.max_batch_size = max_batch_size
+        self.auth_token = auth_token
+        self.allowed_models = frozenset(allowed_models or DEFAULT_ALLOWED_MODELS) | {model}
+        self.admission = AdmissionController(max_concurrency, max_queue)
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    # 요청 처리
+
+    def _engine(self, options: Dict[str, Any]):
+        """요청의 모델/temperature 설정에 해당하는 비동기 엔진을 반환합니다.
+
+        Raises:
+            HTTPError: 허용하지 않는 모델이거나 temperature가 범위를 벗어난 경우 (400)
+        """
+        model = options.get("model") or self.model
+        temperature = options.get("temperature", self.temperature)
+        if not isinstance(model, str) or not isinstance(temperature, (int, float)) or isinstance(temperature, bool):
+            raise HTTPError(400, "model은 문자열, temperature는 숫자여야 합니다.")
+        if model not in self.allowed_models:
+            raise HTTPError(400, f"지원하지 않는 모델입니다 (모델: {', '.join(sorted(self.allowed_models))}): {model}")
+        low, high = TEMPERATURE_RANGE
+        if not low <= temperature <= high:
+            raise HTTPError(400, f"temperature는 {low:g} 이상 {high:g} 이하여야 합니다.")
+        return self.registry.get_async_engine(self.api_key, model=model, temperature=float(temperature))
+
+    @staticmethod
+    def _input_text(item: Dict[str, Any]) -> str:
+        """요청 항목에서 변환할 입력을 꺼냅니다."""
+        text = item.get("input")
+        if not isinstance(text, str) or not text.strip():
+            raise HTTPError(400, "input 필드에 변환할 문자열을 지정해주세요.")
+        return text
+
+    @staticmethod
+    def _call_mode(options: Dict[str, Any]) -> Union[bool, str]:
+        """요청의 `use_multi_call` 값을 엔진에 전달할 값으로 바꿉니다. ("auto" 또는 bool)"""
+        value = options.get("use_multi_call", False)
+        if value == AUTO_ROUTE:
+            return AUTO_ROUTE
+        if isinstance(value, str):
+            raise HTTPError(400, f"use_multi_call은 true/false 또는 \"{AUTO_ROUTE}\"여야 합니다.")
+        return bool(value)
+
+    @staticmethod
+    def _deadline(options: Dict[str, Any]) -> Optional[float]:
+        """요청의 `deadline`(시간 예산, 초) 값을 검증합니다. (없으면 None)"""
+        value = options.get("deadline")
+        if value is None:
+            return None
+        if not isinstance(value, (int, float)) or isinstance(value, bool) or value <= 0:
+            raise HTTPError(400, "deadline은 0보다 큰 숫자(초)여야 합니다.")
+        return float(value)
+
+    async def _transform(self, text: str, options: Dict[str, Any]) -> Dict[str, Any]:
+        """처리 슬롯 안에서 입력 하나를 변환합니다."""
+        engine = self._engine(options)
+        call_mode = self._call_mode(options)
+        deadline = self._deadline(options)
+        async with self.admission.slot():
+            try:
+                result = await asyncio.wait_for(
+                    engine.transform_prompt_detailed(
+                        text,
+                        use_multi_call=call_mode,
+                        fresh=bool(options.get("fresh", False)),
+                        deadline=deadline,
+                    ),
+                    timeout=self.request_timeout,
+                )
+            except DeadlineExceededError as e:
+                raise HTTPError(504, str(e))
+            except InputTooLargeError as e:
+                raise HTTPError(413, str(e))
+            except asyncio.TimeoutError:
+                raise HTTPError(504, f"변환이 제한 시간({self.request_timeout}초) 안에 끝나지 않았습니다.")
+            except Exception as e:
+                raise HTTPError(502, f"변환 중 오류가 발생했습니다: {e}")
+        return result.to_dict()
+
+    async def handle_transform(self, request: Request) -> Response:
+        """POST /transform"""
+        data = request.json()
+        text = self._input_text(data)
+        self.admission.check()
+        return json_response(await self._transform(text, data))
+
+    async def handle_batch(self, request: Request) -> Response:
+        """POST /transform/batch
+
+        본문은 `{"items": [{"id": ..., "input": ...}, ...]}` 형식이며, 항목에 없는 설정
+        (`use_multi_call`, `fresh`, `deadline`, `model`, `temperature`)은 본문 최상위 값을 사용합니다.
+        실패한 항목은 `error` 필드와 함께 반환됩니다.
+        """
+        data = request.json()
+        items = data.get("items")
+        if not isinstance(items, list) or not items:
+            raise HTTPError(400, "items 필드에 변환할 항목 목록을 지정해주세요.")
+        if len(items) > self.max_batch_size:
+            raise HTTPError(413, f"한 번에 변환할 수 있는 항목은 최대 {self.max_batch_size}개입니다.")
+        defaults = {key: value for key, value in data.items() if key != "items"}
+        requests: List[Tuple[Any, str, Dict[str, Any]]] = []
+        for index, item in enumerate(items):
+            if isinstance(item, str):
+                item = {"input": item}
+            if not isinstance(item, dict):
+                raise HTTPError(400, "items의 각 항목은 문자열이나 JSON 객체여야 합니다.")
+            requests.append((item.get("id", index), self._input_text(item), {**defaults, **item}))
+        self.admission.check(len(requests))
+
+        async def run(item_id: Any, text: str, options: Dict[str, Any]) -> Dict[str, Any]:
+            try:
+                return {"id": item_id, **await self._transform(text, options)}
+            except HTTPError as e:
+                return {"id": item_id, "error": e.message, "status": e.status}
+
+        results = await asyncio.gather(*(run(*args) for args in requests))
+        failed = sum(1 for result in results if "error" in result)
+        return json_response({"results": results, "succeeded": len(results) - failed, "failed": failed})
+
+    async def stream_transform(self, request: Request, writer: asyncio.StreamWriter) -> None:
+        """POST /transform/stream
+
+        단일 호출 방식의 변환 결과를 `section` 이벤트(`{"section", "text"}`)로 보내고,
+        마지막에 `prompt` 이벤트(`{"prompt", "elapsed"}`)를 보냅니다.
+        헤더를 보낸 뒤 발생한 오류는 `error` 이벤트로 전달합니다.
+
+        `use_multi_call`이 "auto"이면 복잡한 입력은 `section` 이벤트 없이 다중 호출 방식으로 변환하고,
+        단일 호출 응답에 필수 섹션이 빠지면 다중 호출 방식으로 다시 변환한 프롬프트를 `prompt` 이벤트로 보냅니다.
+        """
+        data = request.json()
+        text = self._input_text(data)
+        call_mode = self._call_mode(data)
+        if call_mode is True:
+            raise HTTPError(400, "스트리밍 변환은 단일 호출 방식만 지원합니다.")
+        engine = self._engine(data)
+        fresh = bool(data.get("fresh", False))
+        self.admission.check()
+        async with self.admission.slot():
+            started = time.perf_counter()
+            await self._write_head(writer, Response(200, content_type="text/event-stream; charset=utf-8",
+                                                    headers={"Cache-Control": "no-cache"}), keep_alive=False)
+            if call_mode == AUTO_ROUTE and route_input(text).use_multi_call:
+                events = self._multi_call_events(engine, text, fresh)
+            else:
+                events = engine.transform_prompt_single_call_stream(text, fresh=fresh)
+            sections: Dict[str, str] = {}
+            try:
+                async for key, value in events:
+                    if key == PROMPT_EVENT:
+                        if call_mode == AUTO_ROUTE and engine.auto_escalation and sections \
+                                and missing_sections(sections):
+                            value = await engine.transform_prompt(text, use_multi_call=True, fresh=fresh)
+                        payload = sse_event("prompt", {"prompt": value, "elapsed": time.perf_counter() - started})
+                    else:
+                        sections[key] = sections.get(key, "") + value
+                        payload = sse_event("section", {"section": key, "text": value})
+                    writer.write(payload)
+                    await writer.drain()
+            except (ConnectionError, asyncio.CancelledError):
+                # 클라이언트가 연결을 끊으면 스트림을 닫아 API 호출을 정리
+                raise
+            except Exception as e:
+                writer.write(sse_event("error", {"error": f"변환 중 오류가 발생했습니다: {e}"}))
+                await writer.drain()
+            finally:
+                await events.aclose()
+
+    @staticmethod
+    async def _multi_call_events(engine, text: str, fresh: bool) -> AsyncIterator[Tuple[str, str]]:
+        """다중 호출 방식의 변환 결과를 스트림 이벤트 형식(최종 프롬프트 이벤트 하나)으로 반환합니다."""
+        yield PROMPT_EVENT, await engine.transform_prompt(text, use_multi_call=True, fresh=fresh)
+
+    def handle_health(self) -> Response:
+        """GET /healthz"""
+        admission = self.admission
+        return json_response({
+            "status": "ok",
+            "active": admission.active,
+            "waiting": admission.waiting,
+            "rejected": admission.rejected,
+            "max_concurrency": admission.max_concurrency,
+            "max_queue": admission.max_queue,
+        })
+
+    def handle_metrics(self) -> Response:
+        """GET /metrics"""
+        instrumentation = self.registry.engine_options.get("instrumentation")
+        if not isinstance(instrumentation, MetricsAggregator):
+            raise HTTPError(404, "계측 집계기가 설정되어 있지 않습니다.")
+        body = instrumentation.to_prometheus().encode("utf-8")
+        return Response(200, body=body, content_type="text/plain; version=0.0.4; charset=utf-8")
+
+    def _authorize(self, request: Request) -> None:
+        """인증 토큰이 설정되어 있으면 요청의 Bearer 토큰을 확인합니다."""
+        if self.auth_token is None:
+            return
+        if request.headers.get("authorization", "") != f"Bearer {self.auth_token}":
+            raise HTTPError(401, "인증 토큰이 올바르지 않습니다.", {"WWW-Authenticate": "Bearer"})
+
+    async def dispatch(self, request: Request, writer: asyncio.StreamWriter) -> Optional[Response]:
+        """경로에 맞는 처리 함수를 호출합니다. 스트리밍 응답을 직접 보낸 경우 None을 반환합니다."""
+        path = request.path.split("?", 1)[0]
+        routes = {
+            ("POST", "/transform"): self.handle_transform,
+            ("POST", "/transform/batch"): self.handle_batch,
+        }
+        if request.method == "GET" and path == "/healthz":
+            return self.handle_health()
+        if request.method == "GET" and path == "/metrics":
+            return self.handle_metrics()
+        if (request.method, path) in routes:
+            self._authorize(request)
+            return await routes[(request.method, path)](request)
+        if (request.method, path) == ("POST", "/transform/stream"):
+            self._authorize(request)
+            await self.stream_transform(request, writer)
+            return None
+        if path in ("/transform", "/transform/batch", "/transform/stream", "/healthz", "/metrics"):
+            raise HTTPError(405, f"{request.method} 메서드는 지원하지 않습니다.")
+        raise HTTPError(404, f"{path} 경로를 찾을 수 없습니다.")
+
+    # HTTP 연결 처리
+
+    @staticmethod
+    async def _read_request(reader: asyncio.StreamReader) -> Optional[Request]:
+        """요청 하나를 읽습니다. 연결이 닫혔으면 None을 반환합니다."""
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=KEEPALIVE_TIMEOUT)
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+            return None
+        except asyncio.LimitOverrunError:
+            raise HTTPError(431, "요청 헤더가 너무 큽니다.")
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, _version = lines[0].split(" ", 2)
+        except ValueError:
+            raise HTTPError(400, "요청 줄 형식이 올바르지 않습니다.")
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        if headers.get("transfer-encoding"):
+            raise HTTPError(501, "Transfer-Encoding 요청 본문은 지원하지 않습니다. Content-Length를 지정해주세요.")
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            raise HTTPError(400, "Content-Length가 올바르지 않습니다.")
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, f"요청 본문은 최대 {MAX_BODY_BYTES}바이트까지 받을 수 있습니다.")
+        body = await reader.readexactly(length) if length else b""
+        return Request(method=method.upper(), path=target, headers=headers, body=body)
+
+    @staticmethod
+    async def _write_head(writer: asyncio.StreamWriter, response: Response, keep_alive: bool,
+                          content_length: Optional[int] = None) -> None:
+        """응답 상태 줄과 헤더를 보냅니다."""
+        reason = HTTPStatus(response.status).phrase
+        lines = [f"HTTP/1.1 {response.status} {reason}", f"Content-Type: {response.content_type}"]
+        if content_length is not None:
+            lines.append(f"Content-Length: {content_length}")
+        lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+        lines.extend(f"{name}: {value}" for name, value in response.headers.items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        await writer.drain()
+
+    async def _write_response(self, writer: asyncio.StreamWriter, response: Response, keep_alive: bool) -> None:
+        """응답 전체를 보냅니다."""
+        await self._write_head(writer, response, keep_alive, content_length=len(response.body))
+        writer.write(response.body)
+        await writer.drain()
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """연결 하나에서 keep-alive로 들어오는 요청을 차례로 처리합니다."""
+        try:
+            while True:
+                keep_alive = True
+                try:
+                    request = await self._read_request(reader)
+                    if request is None:
+                        break
+                    keep_alive = request.headers.get("connection", "").lower() != "close"
+                    response = await self.dispatch(request, writer)
+                    if response is None:
+                        # 스트리밍 응답은 끝나면 연결을 닫음
+                        break
+                except HTTPError as e:
+                    response = json_response({"error": e.message}, status=e.status, headers=e.headers)
+                    # 본문을 끝까지 읽지 못했을 수 있는 오류는 연결을 닫음
+                    keep_alive = keep_alive and e.status not in (400, 413, 431, 501)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    raise
+                except Exception as e:
+                    response = json_response({"error": f"서버 오류가 발생했습니다: {e}"}, status=500)
+                    keep_alive = False
+                await self._write_response(writer, response, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8000) -> asyncio.AbstractServer:
+        """서버 소켓을 열고 요청을 받기 시작합니다."""
+        self._server = await asyncio.start_server(
+            self.handle_connection, host, port, limit=MAX_HEADER_BYTES, backlog=1024
+        )
+        return self._server
+
+    async def serve_forever(self, host: str = "127.0.0.1", port: int = 8000) -> None:
+        """서버를 실행하고 종료될 때 연결 풀을 닫습니다."""
+        server = await self.start(host, port)
+        addresses = ", ".join(f"http://{sock.getsockname()[0]}:{sock.getsockname()[1]}" for sock in server.sockets)
+        print(f"프롬프트 변환 API 서버 실행 중: {addresses}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.registry.aclose()
+
+
+def create_engine_registry() -> EngineRegistry:
+    """웹 인터페이스와 같은 환경 변수 설정으로 API 서버용 엔진 레지스트리를 생성합니다."""
+    rpm = os.getenv("PROMPT_RATE_LIMIT_RPM")
+    tpm = os.getenv("PROMPT_RATE_LIMIT_TPM")
+    threshold = os.getenv("PROMPT_SEMANTIC_CACHE_THRESHOLD")
+    hedge_percentile = os.getenv("PROMPT_HEDGE_PERCENTILE")
+    token_budgets = os.getenv("PROMPT_TOKEN_BUDGETS")
+    long_input_threshold = os.getenv("PROMPT_LONG_INPUT_THRESHOLD")
+    return EngineRegistry(
+        max_connections=int(os.getenv("PROMPT_ENGINE_MAX_CONNECTIONS", "100")),
+        max_keepalive_connections=int(os.getenv("PROMPT_ENGINE_MAX_KEEPALIVE", "20")),
+        max_engines=int(os.getenv("PROMPT_ENGINE_MAX_ENGINES", "32")),
+        cache=ResponseCache(disk_path=os.getenv("PROMPT_CACHE_PATH") or None),
+        scheduler=RequestScheduler(default_limit=RateLimit(
+            rpm=int(rpm) if rpm else None,
+            tpm=int(tpm) if tpm else None,
+        )),
+        prefix_cache_layout=os.getenv("PROMPT_PREFIX_CACHE_LAYOUT", "").lower() in ("1", "true", "yes"),
+        semantic_cache=SemanticCache(
+            threshold=float(threshold),
+            path=os.getenv("PROMPT_SEMANTIC_CACHE_PATH") or None,
+        ) if threshold else None,
+        hedging=HedgePolicy(
+            percentile=float(hedge_percentile),
+            model=os.getenv("PROMPT_HEDGE_MODEL") or None,
+        ) if hedge_percentile else None,
+        token_budget=TokenBudget.from_overrides(
+            [item for item in token_budgets.split(",") if "=" in item],
+            max_input_tokens=int(os.getenv("PROMPT_MAX_INPUT_TOKENS", DEFAULT_MAX_INPUT_TOKENS)),
+            input_policy=os.getenv("PROMPT_INPUT_OVERFLOW", TRUNCATE),
+        ) if token_budgets else None,
+        long_input=LongInputPolicy(
+            threshold_tokens=int(long_input_threshold),
+            chunk_tokens=int(os.getenv("PROMPT_LONG_INPUT_CHUNK_TOKENS", DEFAULT_CHUNK_TOKENS)),
+        ) if long_input_threshold else None,
+        coalesce_requests=True,
+        instrumentation=MetricsAggregator(),
+    )
+
+
+def run_server(host: str = "127.0.0.1", port: int = 8000, api_key: Optional[str] = None, **options) -> None:
+    """API 서버를 실행합니다. (Ctrl+C로 종료)
+
+    Args:
+        host: 바인딩할 주소
+        port: 바인딩할 포트
+        api_key: OpenAI API 키 (없으면 환경 변수 OPENAI_API_KEY)
+        **options: `PromptAPIServer`에 전달할 추가 인자 (max_concurrency, max_queue 등)
+    """
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("OpenAI API 키가 제공되지 않았습니다. 환경 변수 OPENAI_API_KEY를 설정하거나 직접 제공해주세요.")
+    options.setdefault("auth_token", os.getenv("PROMPT_API_TOKEN") or None)
+    allowed_models = os.getenv("PROMPT_API_MODELS")
+    if allowed_models:
+        options.setdefault("allowed_models", [model.strip() for model in allowed_models.split(",") if model.strip()])
+    server = PromptAPIServer(create_engine_registry(), api_key, **options)
+    try:
+        asyncio.run(server.serve_forever(host, port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,724 @@
+import asyncio
+import inspect
+import time
+from functools import partial
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from src.core.deadline import Deadline, current_deadline, deadline_scope, is_timeout_error
+from src.core.hedging import HedgeAttempt
+from src.core.incremental import IncrementalResult, apply_options, normalize_options
+from src.core.long_input import (CHUNK_STAGE, REDUCE_STAGE, build_brief_input, iter_chunks, join_notes,
+                                 split_option_lines)
+from src.core.metrics import TransformResult, request_trace
+from src.core.prompt_engine import PROMPT_EVENT, BasePromptEngine
+from src.core.response_cache import cache_bypass, is_cache_bypassed
+from src.core.router import AUTO_ROUTE, missing_sections, route_input
+from src.core.schemas import SchemaValidationError, build_repair_messages
+from src.core.sections import SectionStreamParser, parse_sections
+from src.core.single_flight import AsyncSingleFlight, FlightAbortedError
+from src.core.stage_graph import Stage, arun_stage_graph
+from src.core.templates import SECTION_STAGES
+from src.core.token_budget import TRUNCATED_FINISH_REASON
+from src.core.tokens import estimate_message_tokens
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+
+class AsyncPromptEngine(BasePromptEngine):
+    """비동기 프롬프트 변환 엔진 클래스
+
+    `PromptEngine`과 같은 프롬프트 템플릿과 응답 파싱 로직을 사용하지만,
+    `AsyncOpenAI` 클라이언트 위에서 동작하므로 하나의 이벤트 루프에서
+    여러 변환 요청을 동시에 처리할 수 있습니다.
+    """
+
+    def _create_client(self, api_key: str) -> "AsyncOpenAI":
+        """API 키로 비동기 OpenAI 클라이언트를 생성합니다."""
+        from openai import AsyncOpenAI
+
+        if self.scheduler is not None:
+            # 재시도는 스케줄러가 담당
+            return AsyncOpenAI(api_key=api_key, max_retries=0)
+        return AsyncOpenAI(api_key=api_key)
+
+    def _create_flights(self) -> AsyncSingleFlight:
+        """이벤트 루프 안에서 동시 요청을 합칠 단일 비행 그룹을 생성합니다."""
+        return AsyncSingleFlight()
+
+    async def _send(self, messages: List[Dict], request: Callable[[], Awaitable[Any]],
+                    retries: Optional[List] = None, model: Optional[str] = None) -> Any:
+        """API 요청을 보냅니다. 스케줄러가 있으면 속도 제한과 재시도 정책을 적용합니다.
+
+        Args:
+            messages: 전송할 메시지 목록 (토큰 예산 계산용)
+            request: 실제 API 호출 코루틴을 반환하는 함수
+            retries: 재시도가 발생할 때마다 (예외, 대기 시간)을 추가할 목록
+            model: 요청할 모델 (없으면 엔진의 모델, 속도 제한 예산 계산용)
+        """
+        if self.scheduler is None:
+            return await request()
+        on_retry = (lambda error, delay: retries.append((error, delay))) if retries is not None else None
+        return await self.scheduler.acall(model or self.model, estimate_message_tokens(messages), request,
+                                          on_retry=on_retry)
+
+    @staticmethod
+    async def _offload(cache: Any, call: Callable[..., Any], *args: Any) -> Any:
+        """캐시 호출을 실행합니다. 디스크 계층이 있거나 알 수 없는 캐시는 이벤트 루프를 막지 않도록 스레드에서 실행합니다."""
+        if getattr(cache, "persistent", True):
+            return await asyncio.to_thread(call, *args)
+        return call(*args)
+
+    async def _acache_lookup(self, key: Optional[str]) -> Optional[str]:
+        """`_cache_lookup`의 비동기 버전"""
+        if key is None or is_cache_bypassed():
+            return None
+        return await self._offload(self.cache, self._cache_lookup, key)
+
+    async def _acache_store(self, key: Optional[str], content: Optional[str],
+                            validate: Optional[Callable[[str], Any]] = None) -> None:
+        """`_cache_store`의 비동기 버전"""
+        if key is None or content is None:
+            return
+        await self._offload(self.cache, self._cache_store, key, content, validate)
+
+    async def _asemantic_lookup(self, user_input: str, use_multi_call: Union[bool, str]) -> Optional[str]:
+        """`_semantic_lookup`의 비동기 버전"""
+        if self.semantic_cache is None or is_cache_bypassed():
+            return None
+        return await self._offload(self.semantic_cache, self._semantic_lookup, user_input, use_multi_call)
+
+    async def _asemantic_store(self, user_input: str, use_multi_call: Union[bool, str], prompt: str) -> None:
+        """`_semantic_store`의 비동기 버전"""
+        if self.semantic_cache is None:
+            return
+        await self._offload(self.semantic_cache, self._semantic_store, user_input, use_multi_call, prompt)
+
+    async def _complete(self, stage: str, messages: List[Dict],
+                        validate: Optional[Callable[[str], Any]] = None) -> str:
+        """채팅 완성 API를 비동기로 호출하고 응답 텍스트를 반환합니다.
+
+        요청 합치기를 사용하면 같은 이벤트 루프에서 진행 중인 같은 요청의 응답을 함께 받습니다.
+
+        Args:
+            stage: 호출한 단계 이름 (예: "analysis", "expert_role")
+            messages: 전송할 메시지 목록
+            validate: 응답을 캐시에 저장하기 전에 호출할 검증 함수 (`PromptEngine._complete` 참고)
+
+        Returns:
+            str: 모델 응답 텍스트
+        """
+        params = self._request_params(stage)
+        cache_key = self._cache_key(messages, **params)
+        started = time.perf_counter()
+        cached = await self._acache_lookup(cache_key)
+        if cached is not None:
+            self._record_call(stage, started, cache_hit=True)
+            return cached
+
+        store_key = cache_key if validate is None else None
+        flight_key = self._flight_key(messages, **params)
+        if flight_key is None:
+            content, leader = await self._request_completion(stage, messages, params, store_key, started), True
+        else:
+            content, leader = await self.flights.do(
+                flight_key, lambda: self._request_completion(stage, messages, params, store_key, started)
+            )
+        if not leader:
+            self._record_call(stage, started, coalesced=True)
+        elif validate is not None:
+            await self._acache_store(cache_key, content, validate)
+        return content
+
+    async def _request_completion(self, stage: str, messages: List[Dict], params: Dict[str, Any],
+                                  cache_key: Optional[str], started: float) -> str:
+        """채팅 완성 API를 실제로 비동기 호출하고 응답을 캐시에 저장합니다. (출력 토큰 한도에 도달해 잘린 응답은 제외)"""
+        if self.hedging is not None and self.hedging.applies(stage):
+            return await self._hedged_completion(stage, messages, params, cache_key, started)
+        retries: List = []
+        try:
+            response = await self._send(messages, lambda: self._api_client().chat.completions.create(
+                model=self.model,
+                temperature=self.temperature,
+                messages=messages,
+                **params,
+                **self._timeout_params()
+            ), retries=retries)
+        except Exception as e:
+            self._record_call(stage, started, retries=len(retries), error=e)
+            raise
+        content = response.choices[0].message.content
+        truncated = response.choices[0].finish_reason == TRUNCATED_FINISH_REASON
+        if not truncated:
+            await self._acache_store(cache_key, content)
+        self._record_call(stage, started, usage=getattr(response, "usage", None), retries=len(retries),
+                          truncated=truncated)
+        return content
+
+    async def _hedged_completion(self, stage: str, messages: List[Dict], params: Dict[str, Any],
+                                 cache_key: Optional[str], started: float) -> str:
+        """첫 토큰이 마감 시간 안에 오지 않으면 같은 요청을 한 번 더 보내고 먼저 끝난 응답을 사용합니다.
+
+        나머지 요청의 태스크는 취소하며, 한쪽이 실패하면 다른 쪽의 응답을 기다립니다.
+        """
+        policy = self.hedging
+        primary = HedgeAttempt(model=self.model, hedge=False, responded=asyncio.Event())
+        tasks = {asyncio.ensure_future(self._stream_attempt(primary, messages, params)): primary}
+        pending = set(tasks)
+        winner = content = error = None
+        try:
+            try:
+                await asyncio.wait_for(primary.responded.wait(), policy.delay(stage, self.model))
+            except asyncio.TimeoutError:
+                if policy.try_issue():
+                    hedge = HedgeAttempt(model=policy.model or self.model, hedge=True, responded=asyncio.Event())
+                    task = asyncio.ensure_future(self._stream_attempt(hedge, messages, params))
+                    tasks[task] = hedge
+                    pending.add(task)
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if winner is None:
+                            winner, content = tasks[task], task.result()
+                    elif error is None:
+                        error = task.exception()
+        finally:
+            for task in pending:
+                tasks[task].cancelled = True
+                task.cancel()
+        # 캐시 저장은 이벤트 루프를 막지 않도록 따로 수행 (`_finish_hedged`에는 캐시 키를 넘기지 않음)
+        content = self._finish_hedged(stage, started, None, list(tasks.values()), winner, content, error)
+        if not winner.truncated:
+            await self._acache_store(cache_key, content)
+        return content
+
+    async def _stream_attempt(self, attempt: HedgeAttempt, messages: List[Dict], params: Dict[str, Any]) -> str:
+        """요청을 스트리밍으로 보내 첫 토큰 시간을 기록하고, 전체 응답 텍스트를 반환합니다."""
+        started = time.perf_counter()
+        parts = []
+        stream = None
+        try:
+            stream = await self._send(messages, lambda: self._api_client().chat.completions.create(
+                model=attempt.model,
+                temperature=self.temperature,
+                messages=messages,
+                stream=True,
+                stream_options={"include_usage": True},
+                **params,
+                **self._timeout_params()
+            ), retries=attempt.retries, model=attempt.model)
+            async for chunk in stream:
+                if getattr(chunk, "usage", None) is not None:
+                    attempt.usage = chunk.usage
+                if not chunk.choices:
+                    continue
+                if getattr(chunk.choices[0], "finish_reason", None) == TRUNCATED_FINISH_REASON:
+                    attempt.truncated = True
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    if attempt.ttft is None:
+                        attempt.ttft = time.perf_counter() - started
+                        attempt.responded.set()
+                    parts.append(delta)
+        finally:
+            attempt.responded.set()
+            if attempt.cancelled and hasattr(stream, "close"):
+                # 취소된 요청의 HTTP 응답을 닫아 연결을 반환
+                await stream.close()
+        return "".join(parts)
+
+    async def _complete_structured(self, stage: str, messages: List[Dict]) -> Dict:
+        """JSON 스키마 응답을 받아 검증하고, 검증에 실패하면 한 번만 수정을 요청합니다.
+
+        응답은 검증을 통과한 경우에만 캐시에 저장합니다.
+
+        Raises:
+            SchemaValidationError: 수정 요청 후에도 응답이 스키마를 만족하지 않는 경우
+        """
+        validate = partial(self._parse_structured, stage)
+        content = await self._complete(stage, messages, validate=validate)
+        try:
+            return self._parse_structured(stage, content)
+        except SchemaValidationError as e:
+            content = await self._complete(stage, build_repair_messages(messages, content, e), validate=validate)
+            return self._parse_structured(stage, content)
+
+    async def _stream_complete(self, stage: str, messages: List[Dict], fresh: bool = False) -> AsyncIterator[str]:
+        """채팅 완성 API를 스트리밍 방식으로 비동기 호출하고 텍스트 조각을 차례로 반환합니다.
+
+        Args:
+            stage: 호출한 단계 이름
+            messages: 전송할 메시지 목록
+            fresh: True이면 캐시를 조회하지 않음
+
+        Yields:
+            str: 모델이 생성한 텍스트 조각
+        """
+        params = self._request_params(stage)
+        cache_key = self._cache_key(messages, **params)
+        started = time.perf_counter()
+        cached = None if fresh else await self._acache_lookup(cache_key)
+        if cached is not None:
+            self._record_call(stage, started, ttft=time.perf_counter() - started, cache_hit=True, streamed=True)
+            yield cached
+            return
+
+        retries: List = []
+        ttft = usage = None
+        truncated = False
+        parts = []
+        try:
+            stream = await self._send(messages, lambda: self._api_client().chat.completions.create(
+                model=self.model,
+                temperature=self.temperature,
+                messages=messages,
+                stream=True,
+                stream_options={"include_usage": True},
+                **params,
+                **self._timeout_params()
+            ), retries=retries)
+            async for chunk in stream:
+                # 마지막 청크에는 choices 없이 usage만 포함됨
+                if getattr(chunk, "usage", None) is not None:
+                    usage = chunk.usage
+                if not chunk.choices:
+                    continue
+                if getattr(chunk.choices[0], "finish_reason", None) == TRUNCATED_FINISH_REASON:
+                    truncated = True
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    if ttft is None:
+                        ttft = time.perf_counter() - started
+                    parts.append(delta)
+                    yield delta
+        except Exception as e:
+            self._record_call(stage, started, ttft=ttft, retries=len(retries), streamed=True, error=e)
+            raise
+        if not truncated:
+            await self._acache_store(cache_key, "".join(parts))
+        self._record_call(stage, started, ttft=ttft, usage=usage, retries=len(retries), streamed=True,
+                          truncated=truncated)
+
+    def _guard_stage(self, stage: Stage, deadline: Deadline, needed: Optional[float],
+                     reasons: Dict[str, str]) -> Stage:
+        """단계 하나를 시간 예산 안에서 실행하도록 감쌉니다. (마감 시간이 되면 진행 중인 호출을 취소)"""
+        async def run(results: Dict[str, Any]) -> Any:
+            reason = self._skip_reason(stage, results, deadline, needed, reasons)
+            if reason is None:
+                try:
+                    value = stage.func(results)
+                    if inspect.isawaitable(value):
+                        value = await asyncio.wait_for(value, deadline.remaining())
+                    return value
+                except Exception as e:
+                    if not is_timeout_error(e):
+                        raise
+                    reason = "timeout"
+            reasons[stage.name] = reason
+            return None
+
+        return Stage(stage.name, run, stage.depends_on)
+
+    async def condense_input(self, user_input: str) -> str:
+        """긴 입력을 부분별 요구사항 추출(map)과 통합(reduce)을 거쳐 요약 브리프로 줄입니다.
+
+        (`PromptEngine.condense_input` 참고)
+
+        Args:
+            user_input: 사용자가 입력한 프롬프트
+
+        Returns:
+            str: 변환에 사용할 입력 (요약 브리프 또는 원문)
+        """
+        if self.long_input is None or not self.long_input.applies(user_input, self.model):
+            return user_input
+        body, options = split_option_lines(user_input)
+        notes = await self._map_long_input(CHUNK_STAGE, iter_chunks(body, self.long_input.chunk_tokens, self.model))
+        rounds = 0
+        while len(notes) > 1:
+            rounds += 1
+            groups = self._reduce_groups(notes, rounds)
+            notes = await self._map_long_input(REDUCE_STAGE, (join_notes(group) for group in groups))
+        return build_brief_input(notes[0] if notes else "", options)
+
+    async def _map_long_input(self, stage: str, contents: Iterable[str]) -> List[str]:
+        """부분마다 같은 단계의 호출을 동시에 실행하고 결과를 입력 순서대로 반환합니다."""
+        semaphore = asyncio.Semaphore(self._long_input_concurrency())
+
+        async def run(content: str) -> str:
+            async with semaphore:
+                return await self._complete(stage, self._long_input_messages(stage, content))
+
+        tasks = []
+        try:
+            for content in contents:
+                tasks.append(asyncio.ensure_future(run(content)))
+                # 다음 부분을 나누기 전에 방금 만든 부분의 호출을 시작
+                await asyncio.sleep(0)
+            return list(await asyncio.gather(*tasks))
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    async def analyze_input(self, user_input: str) -> Dict:
+        """사용자 입력을 분석하여 핵심 요소와 특정 요구사항을 추출
+
+        Args:
+            user_input: 사용자가 입력한 간단한 프롬프트
+
+        Returns:
+            Dict: 입력에서 추출한 핵심 요소들과 특정 요구사항
+        """
+        messages = self._build_analysis_messages(user_input)
+        if self.structured_output:
+            return await self._complete_structured("analysis", messages)
+        content = await self._complete("analysis", messages)
+        return self._parse_analysis(content)
+
+    async def generate_expert_role(self, user_input: str, analysis: Dict) -> str:
+        """분석 결과를 바탕으로 전문가 역할 생성
+
+        Args:
+            user_input: 사용자가 입력한 간단한 프롬프트
+            analysis: 입력 분석 결과
+
+        Returns:
+            str: 생성된 전문가 역할 설명
+        """
+        return await self._complete("expert_role", self._build_expert_role_messages(analysis))
+
+    async def generate_instructions(self, user_input: str, analysis: Dict) -> str:
+        """분석 결과를 바탕으로 상세 지시사항 생성
+
+        Args:
+            user_input: 사용자가 입력한 간단한 프롬프트
+            analysis: 입력 분석 결과
+
+        Returns:
+            str: 생성된 지시사항
+        """
+        return await self._complete("instructions", self._build_instructions_messages(analysis))
+
+    async def generate_response_style(self, user_input: str, analysis: Dict) -> str:
+        """분석 결과를 바탕으로 응답 스타일 가이드라인 생성
+
+        Args:
+            user_input: 사용자가 입력한 간단한 프롬프트
+            analysis: 입력 분석 결과
+
+        Returns:
+            str: 생성된 응답 스타일 가이드라인
+        """
+        return await self._complete("response_style", self._build_response_style_messages(analysis))
+
+    async def generate_reminders(self, user_input: str, analysis: Dict) -> str:
+        """분석 결과를 바탕으로 주요 고려사항 생성
+
+        Args:
+            user_input: 사용자가 입력한 간단한 프롬프트
+            analysis: 입력 분석 결과
+
+        Returns:
+            str: 생성된 주요 고려사항
+        """
+        return await self._complete("reminders", self._build_reminders_messages(analysis))
+
+    async def generate_output_format(self, analysis: Dict) -> str:
+        """분석 결과를 바탕으로 출력 형식 생성
+
+        Args:
+            analysis: 입력 분석 결과
+
+        Returns:
+            str: 생성된 출력 형식
+        """
+        return await self._complete("output_format", self._build_output_format_messages(analysis))
+
+    async def extract_format_requirements(self, user_input: str) -> Dict:
+        """사용자 입력에서 명시적인 형식 요구사항을 추출
+
+        Args:
+            user_input: 사용자가 입력한 간단한 프롬프트
+
+        Returns:
+            Dict: 추출된 형식 요구사항
+        """
+        messages = self._build_format_requirements_messages(user_input)
+        if self.structured_output:
+            return await self._complete_structured("format_requirements", messages)
+        content = await self._complete("format_requirements", messages)
+        return self._parse_format_requirements(content)
+
+    async def analyze_input_with_format(self, user_input: str) -> Tuple[Dict, Dict]:
+        """한 번의 API 호출로 입력 분석과 형식 요구사항 추출을 함께 수행
+
+        Args:
+            user_input: 사용자가 입력한 간단한 프롬프트
+
+        Returns:
+            Tuple[Dict, Dict]: (`analyze_input` 결과, `extract_format_requirements` 결과)
+        """
+        messages = self._build_combined_analysis_messages(user_input)
+        if self.structured_output:
+            return self.split_combined_analysis(await self._complete_structured("combined_analysis", messages))
+        content = await self._complete("combined_analysis", messages)
+        return self.split_combined_analysis(self._parse_analysis(content))
+
+    async def transform_prompt_single_call(self, user_input: str) -> str:
+        """사용자 입력을 상세한 프롬프트로 변환합니다 (단일 API 호출 방식).
+
+        Args:
+            user_input: 사용자가 입력한 간단한 프롬프트
+
+        Returns:
+            str: 변환된 상세 프롬프트
+        """
+        user_input = await self.condense_input(user_input)
+        content = await self._complete("single_call", self._build_single_call_messages(user_input))
+        sections = parse_sections(content)
+        return self.assemble_single_call_prompt(sections)
+
+    async def transform_prompt_auto(self, user_input: str) -> str:
+        """입력 복잡도에 따라 단일 호출과 다중 호출 중 비용이 적은 방식을 골라 변환합니다.
+
+        단일 호출 응답에 필수 섹션이 빠져 있으면 (`auto_escalation`이 True일 때) 다중 호출 방식으로 다시 변환합니다.
+
+        Args:
+            user_input: 사용자가 입력한 간단한 프롬프트
+
+        Returns:
+            str: 변환된 상세 프롬프트
+        """
+        user_input = await self.condense_input(user_input)
+        if route_input(user_input).use_multi_call:
+            return await self._transform_multi_call(user_input, current_deadline())
+        content = await self._complete("single_call", self._build_single_call_messages(user_input))
+        sections = parse_sections(content)
+        if self.auto_escalation and missing_sections(sections):
+            return await self._transform_multi_call(user_input, current_deadline())
+        return self.assemble_single_call_prompt(sections)
+
+    async def transform_prompt_single_call_stream(self, user_input: str,
+                                                  fresh: bool = False) -> AsyncIterator[Tuple[str, str]]:
+        """단일 API 호출 방식의 변환 결과를 섹션별로 스트리밍합니다.
+
+        Args:
+            user_input: 사용자가 입력한 간단한 프롬프트
+            fresh: True이면 캐시된 응답을 사용하지 않고 새로 생성
+
+        Yields:
+            Tuple[str, str]: (섹션 키, 텍스트 조각). 마지막 이벤트는 (PROMPT_EVENT, 최종 프롬프트)입니다.
+        """
+        with cache_bypass(fresh):
+            cached_prompt = await self._asemantic_lookup(user_input, use_multi_call=False)
+            flight_key = self._transform_flight_key(user_input, use_multi_call=False)
+        if cached_prompt is not None:
+            yield PROMPT_EVENT, cached_prompt
+            return
+        if flight_key is None:
+            async for event in self._stream_single_call(user_input, fresh):
+                yield event
+            return
+
+        # 같은 입력을 변환 중인 요청이 있으면 섹션 조각 없이 최종 프롬프트만 함께 받음
+        future, leader = self.flights.claim(flight_key)
+        if not leader:
+            started = time.perf_counter()
+            try:
+                prompt = await asyncio.shield(future)
+            except FlightAbortedError:
+                async for event in self._stream_single_call(user_input, fresh):
+                    yield event
+                return
+            self._record_call("single_call", started, coalesced=True, streamed=True)
+            yield PROMPT_EVENT, prompt
+            return
+        prompt = None
+        try:
+            async for event in self._stream_single_call(user_input, fresh):
+                if event[0] == PROMPT_EVENT:
+                    prompt = event[1]
+                yield event
+        except BaseException as e:
+            # 최종 프롬프트를 보낸 뒤 소비가 중단된 경우에는 결과를 그대로 공유
+            self.flights.resolve(flight_key, future, result=prompt, error=e if prompt is None else None)
+            raise
+        self.flights.resolve(flight_key, future, result=prompt)
+
+    async def _stream_single_call(self, user_input: str, fresh: bool) -> AsyncIterator[Tuple[str, str]]:
+        """단일 API 호출 방식의 변환 결과를 실제로 스트리밍하고 의미 캐시에 저장합니다."""
+        parser = SectionStreamParser()
+        with cache_bypass(fresh):
+            messages = self._build_single_call_messages(await self.condense_input(user_input))
+        async for delta in self._stream_complete("single_call", messages, fresh=fresh or is_cache_bypassed()):
+            for event in parser.feed(delta):
+                yield event
+        for event in parser.close():
+            yield event
+        prompt = self.assemble_single_call_prompt(parser.sections())
+        await self._asemantic_store(user_input, False, prompt)
+        yield PROMPT_EVENT, prompt
+
+    async def transform_prompt_multi_call(self, user_input: str, deadline: Optional[float] = None) -> str:
+        """사용자 입력을 여러 API 호출을 통해 상세한 프롬프트로 변환합니다.
+
+        서로 의존하지 않는 호출은 최대 `max_concurrency`개까지 동시에 진행되며,
+        일부 단계가 실패하면 같은 입력으로 다시 실행할 때 완료된 단계부터 이어서 진행합니다.
+        시간 예산이 있으면 마감 시간에 진행 중인 호출을 취소하고 섹션을 생략하거나 대체합니다
+        (`PromptEngine.transform_prompt_multi_call` 참고).
+
+        Args:
+            user_input: 사용자가 입력한 간단한 프롬프트
+            deadline: 변환에 사용할 시간 예산(초, 없으면 제한 없음)
+
+        Returns:
+            str: 변환된 상세 프롬프트
+
+        Raises:
+            DeadlineExceededError: 시간 예산 안에 필수 섹션을 하나도 생성하지 못한 경우
+        """
+        # 긴 입력의 요약(여러 번의 API 호출)도 시간 예산 안에서 실행
+        with deadline_scope(deadline) as budget:
+            return await self._transform_multi_call(await self.condense_input(user_input), budget)
+
+    async def _transform_multi_call(self, user_input: str, budget: Optional[Deadline]) -> str:
+        """요약 브리프로 줄인 입력을 다중 호출 방식으로 변환합니다. (`PromptEngine._transform_multi_call` 참고)"""
+        stages = self._build_multi_call_stages(user_input)
+        checkpoint_key = self._checkpoint_key(user_input)
+        results = self.checkpoints.take(checkpoint_key)
+        if is_cache_bypassed():
+            # 캐시 없이 새로 생성하는 요청은 이전 실패에서 보관한 단계 결과도 사용하지 않음
+            results = {}
+        if budget is not None:
+            return await self._multi_call_within_deadline(user_input, stages, checkpoint_key, results, budget)
+        try:
+            sections = await arun_stage_graph(stages, max_concurrency=self.max_concurrency, results=results)
+        except Exception:
+            self.checkpoints.save(checkpoint_key, results)
+            raise
+        return self.assemble_multi_call_prompt(sections)
+
+    async def transform_prompt_incremental(self, user_input: str,
+                                           options: Optional[Dict[str, Optional[str]]] = None,
+                                           previous: Optional[IncrementalResult] = None) -> IncrementalResult:
+        """커스텀 옵션을 적용해 다중 호출 방식으로 변환하고, 이전 결과에서 바뀐 섹션만 다시 생성합니다.
+
+        (`PromptEngine.transform_prompt_incremental` 참고)
+
+        Args:
+            user_input: 사용자가 입력한 간단한 프롬프트 (커스텀 옵션을 덧붙이기 전)
+            options: 커스텀 옵션 (`scope`, `output_format`, `special_requirements`)
+            previous: 이전 변환 결과 (없거나 엔진 설정이 다르면 처음부터 변환)
+
+        Returns:
+            IncrementalResult: 변환 결과 (`regenerated`에 새로 실행한 단계 기록)
+        """
+        options = normalize_options(options)
+        sources = self._regeneration_sources(user_input, options, previous)
+        stages = self._build_multi_call_stages(apply_options(
+            user_input if sources is not None else await self.condense_input(user_input), options))
+        if sources is None:
+            analysis_stages = [stage for stage in stages if stage.name not in SECTION_STAGES]
+            results = await arun_stage_graph(analysis_stages, max_concurrency=self.max_concurrency)
+            prefilled = []
+        else:
+            results = self._analysis_results(sources)
+            prefilled = list(results)
+        self._reuse_sections(previous, results)
+        prefilled += [name for name in results if name in SECTION_STAGES]
+        await arun_stage_graph(stages, max_concurrency=self.max_concurrency, results=results)
+        return self._incremental_result(user_input, options, results, prefilled)
+
+    async def _multi_call_within_deadline(self, user_input: str, stages: List[Stage], checkpoint_key: str,
+                                          results: Dict[str, Any], deadline: Deadline) -> str:
+        """시간 예산 안에서 다중 호출 변환을 실행하고, 생성하지 못한 섹션을 생략하거나 대체합니다."""
+        # 예산이 빠듯하면 필수 섹션을 대체할 단일 호출 요청을 함께 보냄
+        fallback = None
+        if self._needs_fallback([stage for stage in stages if stage.name not in results], deadline):
+            fallback = asyncio.ensure_future(self._complete("single_call", self._build_single_call_messages(user_input)))
+        try:
+            reasons: Dict[str, str] = {}
+            guarded = self._guard_stages(stages, deadline, reasons)
+            try:
+                await arun_stage_graph(guarded, max_concurrency=self.max_concurrency, results=results)
+            except Exception:
+                self.checkpoints.save(checkpoint_key, self._completed_results(results))
+                raise
+            completed = self._completed_results(results)
+            if len(completed) == len(results):
+                return self.assemble_multi_call_prompt(results)
+            # 같은 입력을 다시 변환하면 생략한 단계만 새로 실행
+            self.checkpoints.save(checkpoint_key, completed)
+
+            fallback_content = None
+            if fallback is not None and missing_sections(results):
+                try:
+                    fallback_content = await asyncio.wait_for(asyncio.shield(fallback), deadline.remaining())
+                except Exception:
+                    # 대체용 요청이 실패하거나 끝나지 않으면 해당 섹션을 제외
+                    pass
+            sections = self._degrade_sections(user_input, results, reasons, deadline, fallback_content)
+            return self.assemble_multi_call_prompt(sections)
+        finally:
+            if fallback is not None and not fallback.done():
+                fallback.cancel()
+
+    async def transform_prompt_detailed(self, user_input: str, use_multi_call: Union[bool, str] = False,
+                                        fresh: bool = False, deadline: Optional[float] = None) -> TransformResult:
+        """사용자 입력을 변환하고 요청 단위 계측 결과를 함께 반환합니다.
+
+        Args:
+            user_input: 사용자가 입력한 간단한 프롬프트
+            use_multi_call: 여러 API 호출을 사용할지 여부 ("auto"이면 입력 복잡도에 따라 선택)
+            fresh: True이면 캐시된 응답을 사용하지 않고 새로 생성
+            deadline: 변환에 사용할 시간 예산(초)
+
+        Returns:
+            TransformResult: 변환된 프롬프트, 전체 소요 시간, 호출별 계측 기록, 생략하거나 대체한 섹션,
+                             적용된 토큰 예산
+        """
+        started = time.perf_counter()
+        with request_trace() as calls, deadline_scope(deadline) as budget:
+            prompt = await self.transform_prompt(user_input, use_multi_call=use_multi_call, fresh=fresh)
+        return TransformResult(prompt=prompt, elapsed=time.perf_counter() - started, calls=calls,
+                               degraded=list(budget.degraded) if budget is not None else [],
+                               budgets=self._effective_budgets(user_input, calls))
+
+    async def transform_prompt(self, user_input: str, use_multi_call: Union[bool, str] = False,
+                               fresh: bool = False, deadline: Optional[float] = None) -> str:
+        """사용자 입력을 상세한 프롬프트로 변환합니다.
+
+        Args:
+            user_input: 사용자가 입력한 간단한 프롬프트
+            use_multi_call: 여러 API 호출을 사용할지 여부 ("auto"이면 입력 복잡도에 따라 선택)
+            fresh: True이면 캐시된 응답을 사용하지 않고 새로 생성
+            deadline: 변환에 사용할 시간 예산(초, `PromptEngine.transform_prompt` 참고)
+
+        Returns:
+            str: 변환된 상세 프롬프트
+        """
+        with cache_bypass(fresh), deadline_scope(deadline):
+            prompt = await self._asemantic_lookup(user_input, use_multi_call)
+            if prompt is not None:
+                return prompt
+            flight_key = self._transform_flight_key(user_input, use_multi_call)
+            if flight_key is None:
+                return await self._transform(user_input, use_multi_call)
+            started = time.perf_counter()
+            prompt, leader = await self.flights.do(flight_key, lambda: self._transform(user_input, use_multi_call))
+        if not leader:
+            self._record_call(self._transform_stage(use_multi_call), started, coalesced=True)
+        return prompt
+
+    async def _transform(self, user_input: str, use_multi_call: Union[bool, str]) -> str:
+        """선택한 방식으로 변환하고 결과를 의미 캐시에 저장합니다."""
+        if use_multi_call == AUTO_ROUTE:
+            prompt = await self.transform_prompt_auto(user_input)
+        elif use_multi_call:
+            prompt = await self.transform_prompt_multi_call(user_input)
+        else:
+            prompt = await self.transform_prompt_single_call(user_input)
+        await self._asemantic_store(user_input, use_multi_call, prompt)
+        return prompt
@@ -0,0 +1,245 @@
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterator, Optional, Set, Tuple, Union
+
+# 입력 레코드에서 ID와 본문을 찾을 때 확인하는 필드 (앞에 있는 것이 우선)
+ID_FIELDS = ("id", "request_id")
+TEXT_FIELDS = ("input", "prompt", "user_input")
+
+
+def extract_record_id(record: Dict, line_number: int, id_field: Optional[str] = None) -> str:
+    """입력 레코드의 ID를 반환합니다. (ID 필드가 없으면 `line-{줄 번호}`)"""
+    id_candidates = (id_field,) if id_field else ID_FIELDS
+    record_id = next((record[f] for f in id_candidates if record.get(f) is not None), None)
+    return str(record_id) if record_id is not None else f"line-{line_number}"
+
+
+def extract_record(record: Dict, line_number: int, id_field: Optional[str] = None,
+                   text_field: Optional[str] = None) -> Tuple[str, str]:
+    """입력 레코드에서 ID와 변환할 텍스트를 꺼냅니다.
+
+    텍스트 필드가 없으면 `title`과 `body`를 합쳐 사용합니다.
+
+    Args:
+        record: JSONL 한 줄을 파싱한 딕셔너리
+        line_number: 입력 파일에서의 줄 번호 (ID가 없을 때 사용)
+        id_field: ID로 사용할 필드 이름 (없으면 기본 후보에서 탐색)
+        text_field: 본문으로 사용할 필드 이름 (없으면 기본 후보에서 탐색)
+
+    Returns:
+        Tuple[str, str]: (ID, 변환할 텍스트)
+
+    Raises:
+        ValueError: 변환할 텍스트가 없는 경우
+    """
+    record_id = extract_record_id(record, line_number, id_field)
+    text_candidates = (text_field,) if text_field else TEXT_FIELDS
+    text = next((record[f] for f in text_candidates if record.get(f)), None)
+    if text is None:
+        text = "\n\n".join(str(record[f]) for f in ("title", "body") if record.get(f))
+    if not text:
+        raise ValueError(f"{line_number}번째 줄에서 변환할 텍스트를 찾을 수 없습니다.")
+    return record_id, str(text)
+
+
+def parse_batch_line(line: str, line_number: int, id_field: Optional[str] = None,
+                     text_field: Optional[str] = None) -> Tuple[str, Optional[str], Optional[str]]:
+    """입력 JSONL 한 줄을 (ID, 텍스트, 오류)로 변환합니다.
+
+    JSON이 아니거나 변환할 텍스트가 없는 줄은 예외를 발생시키지 않고 오류 메시지를 반환하므로,
+    잘못된 줄 하나 때문에 나머지 입력의 처리가 중단되지 않습니다.
+
+    Returns:
+        Tuple[str, Optional[str], Optional[str]]: (ID, 변환할 텍스트, 오류 메시지). 오류가 있으면 텍스트는 None
+    """
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError as e:
+        return f"line-{line_number}", None, f"{line_number}번째 줄이 올바른 JSON이 아닙니다: {e}"
+    if not isinstance(record, dict):
+        return f"line-{line_number}", None, f"{line_number}번째 줄이 JSON 객체가 아닙니다."
+    try:
+        record_id, text = extract_record(record, line_number, id_field, text_field)
+    except ValueError as e:
+        return extract_record_id(record, line_number, id_field), None, str(e)
+    return record_id, text, None
+
+
+def iter_batch_inputs(input_path: str, id_field: Optional[str] = None,
+                      text_field: Optional[str] = None) -> Iterator[Tuple[str, Optional[str], Optional[str]]]:
+    """입력 JSONL 파일을 한 줄씩 읽어 (ID, 텍스트, 오류)를 반환합니다. (빈 줄은 건너뜀, `parse_batch_line` 참고)"""
+    with open(input_path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            yield parse_batch_line(line, line_number, id_field, text_field)
+
+
+def load_completed_ids(output_path: str) -> Set[str]:
+    """이미 성공적으로 처리되어 출력 파일에 기록된 ID 목록을 반환합니다.
+
+    비정상 종료로 마지막 줄이 잘린 경우 해당 줄은 무시하며,
+    오류로 기록된 ID는 다시 처리하도록 포함하지 않습니다.
+    """
+    completed: Set[str] = set()
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(record, dict) and record.get("prompt") is not None:
+                completed.add(str(record.get("id")))
+    return completed
+
+
+def _prepare_output(output_path: str) -> None:
+    """이어쓰기 전에 출력 파일이 줄바꿈으로 끝나도록 정리합니다."""
+    if not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
+        return
+    with open(output_path, "rb+") as f:
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b"\n":
+            f.write(b"\n")
+
+
+def run_batch(engine, input_path: str, output_path: str, concurrency: int = 4, use_multi_call: Union[bool, str] = False,
+              id_field: Optional[str] = None, text_field: Optional[str] = None,
+              deadline: Optional[float] = None) -> Dict[str, int]:
+    """JSONL 입력의 각 요청을 변환하여 JSONL 결과 파일에 기록합니다.
+
+    입력은 한 줄씩 읽어 최대 `concurrency`개를 동시에 처리하며, 결과는 완료된 순서대로
+    즉시 기록됩니다. 출력 파일에 이미 성공 결과가 있는 ID는 건너뛰므로 중단된 작업을
+    같은 명령으로 다시 실행하면 이어서 처리합니다. JSON이 아니거나 텍스트가 없는 줄은
+    변환 실패와 같이 `error`로 기록하고 다음 줄을 계속 처리합니다.
+
+    Args:
+        engine: 변환에 사용할 `PromptEngine`
+        input_path: 입력 JSONL 파일 경로
+        output_path: 결과 JSONL 파일 경로 (이어쓰기)
+        concurrency: 동시에 처리할 최대 요청 수
+        use_multi_call: 다중 호출 방식 사용 여부 ("auto"이면 입력 복잡도에 따라 선택)
+        id_field: ID로 사용할 입력 필드 이름
+        text_field: 본문으로 사용할 입력 필드 이름
+        deadline: 요청 하나의 시간 예산(초). 생략하거나 대체한 섹션은 결과의 `degraded`에 기록
+                  (엔진에 토큰 예산이 있으면 적용된 예산을 `budgets`에 기록)
+
+    Returns:
+        Dict[str, int]: 처리 통계 (succeeded, failed, skipped)
+    """
+    completed = load_completed_ids(output_path)
+    _prepare_output(output_path)
+    stats = {"succeeded": 0, "failed": 0, "skipped": 0}
+
+    def transform(record_id: str, text: str) -> Dict:
+        started = time.perf_counter()
+        try:
+            result = engine.transform_prompt_detailed(text, use_multi_call=use_multi_call, deadline=deadline)
+            record = {"id": record_id, "prompt": result.prompt, "elapsed": round(time.perf_counter() - started, 3)}
+            if result.degraded:
+                record["degraded"] = [section.to_dict() for section in result.degraded]
+            if result.budgets:
+                record["budgets"] = result.budgets
+            return record
+        except Exception as e:
+            return {"id": record_id, "error": str(e), "elapsed": round(time.perf_counter() - started, 3)}
+
+    concurrency = max(1, concurrency)
+    with open(output_path, "a", encoding="utf-8") as out, \
+            ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="prompt-batch") as executor:
+
+        def write_finished(futures) -> None:
+            for future in futures:
+                result = future.result()
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                out.flush()
+                stats["failed" if "error" in result else "succeeded"] += 1
+
+        running = set()
+        for record_id, text, error in iter_batch_inputs(input_path, id_field, text_field):
+            if record_id in completed:
+                stats["skipped"] += 1
+                continue
+            completed.add(record_id)
+            if error is not None:
+                out.write(json.dumps({"id": record_id, "error": error}, ensure_ascii=False) + "\n")
+                out.flush()
+                stats["failed"] += 1
+                continue
+
+            # 입력 전체를 메모리에 올리지 않도록 진행 중인 작업 수를 제한
+            if len(running) >= concurrency:
+                finished, running = wait(running, return_when=FIRST_COMPLETED)
+                write_finished(finished)
+            running.add(executor.submit(transform, record_id, text))
+
+        while running:
+            finished, running = wait(running, return_when=FIRST_COMPLETED)
+            write_finished(finished)
+
+    return stats
+
+
+def run_batch_api(backend, input_path: str, output_path: str, use_multi_call: Union[bool, str] = False,
+                  id_field: Optional[str] = None, text_field: Optional[str] = None,
+                  max_inputs_per_job: int = 5000) -> Dict[str, int]:
+    """JSONL 입력을 OpenAI Batch API로 변환하여 JSONL 결과 파일에 기록합니다.
+
+    `run_batch`와 같은 입력/출력 형식과 이어쓰기 규칙을 따르며, 입력을
+    `max_inputs_per_job`개씩 묶어 Batch 작업으로 제출합니다.
+
+    Args:
+        backend: 변환에 사용할 `OpenAIBatchBackend`
+        input_path: 입력 JSONL 파일 경로
+        output_path: 결과 JSONL 파일 경로 (이어쓰기)
+        use_multi_call: 다중 호출 방식 사용 여부 ("auto"이면 입력 복잡도에 따라 선택)
+        id_field: ID로 사용할 입력 필드 이름
+        text_field: 본문으로 사용할 입력 필드 이름
+        max_inputs_per_job: Batch 작업 하나에 담을 최대 입력 수
+
+    Returns:
+        Dict[str, int]: 처리 통계 (succeeded, failed, skipped)
+    """
+    completed = load_completed_ids(output_path)
+    _prepare_output(output_path)
+    stats = {"succeeded": 0, "failed": 0, "skipped": 0}
+
+    with open(output_path, "a", encoding="utf-8") as out:
+
+        def flush(chunk: Dict[str, str]) -> None:
+            prompts, errors = backend.transform(chunk, use_multi_call=use_multi_call)
+            for record_id in chunk:
+                if record_id in prompts:
+                    result = {"id": record_id, "prompt": prompts[record_id]}
+                    stats["succeeded"] += 1
+                else:
+                    result = {"id": record_id, "error": errors.get(record_id, "결과가 없습니다.")}
+                    stats["failed"] += 1
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            out.flush()
+
+        chunk: Dict[str, str] = {}
+        for record_id, text, error in iter_batch_inputs(input_path, id_field, text_field):
+            if record_id in completed or record_id in chunk:
+                stats["skipped"] += 1
+                continue
+            if error is not None:
+                out.write(json.dumps({"id": record_id, "error": error}, ensure_ascii=False) + "\n")
+                out.flush()
+                completed.add(record_id)
+                stats["failed"] += 1
+                continue
+            chunk[record_id] = text
+            if len(chunk) >= max_inputs_per_job:
+                flush(chunk)
+                completed.update(chunk)
+                chunk = {}
+        if chunk:
+            flush(chunk)
+
+    return stats
@@ -0,0 +1,227 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from src.core.stage_graph import Stage
+
+# 섹션을 생성하지 못했을 때의 처리 방식
+DROPPED = "dropped"            # 선택 섹션을 생략
+SINGLE_CALL = "single_call"    # 단일 호출 응답의 같은 섹션으로 대체
+OMITTED = "omitted"            # 대체할 결과가 없어 프롬프트에서 제외
+
+# 예산이 부족해 생략할 수 있는 선택 섹션
+OPTIONAL_SECTIONS = ("output_format",)
+
+# 관측값이 없을 때 사용할 단계별 예상 소요 시간(초, gpt-4.1-nano 기준)
+DEFAULT_STAGE_ESTIMATES = {
+    "analysis": 1.5,
+    "format_requirements": 1.0,
+    "combined_analysis": 2.0,
+    "expert_role": 1.5,
+    "instructions": 3.0,
+    "response_style": 2.0,
+    "reminders": 2.0,
+    "output_format": 2.5,
+    "single_call": 5.0,
+}
+
+# 시간 초과로 처리할 예외 클래스 이름 (내장/asyncio/concurrent.futures의 TimeoutError, OpenAI SDK의 요청 시간 초과)
+TIMEOUT_ERROR_NAMES = ("TimeoutError", "APITimeoutError")
+
+# 현재 요청의 마감 시간 (스레드/태스크별로 독립적)
+_current_deadline: ContextVar[Optional["Deadline"]] = ContextVar("prompt_engine_deadline", default=None)
+
+
+class DeadlineExceededError(TimeoutError):
+    """요청의 시간 예산 안에 API 호출이나 변환을 마칠 수 없는 경우 발생하는 예외"""
+
+
+@dataclass
+class DegradedSection:
+    """시간 예산 때문에 생략하거나 대체한 섹션
+
+    Attributes:
+        section: 섹션 키 (예: "output_format", "instructions")
+        action: 처리 방식 (`DROPPED`, `SINGLE_CALL`, `OMITTED`)
+        reason: 원인 ("budget": 남은 예산이 예상 소요 시간보다 적어 시작하지 않음,
+                "timeout": 호출 중 마감 시간 도달, "dependency": 선행 단계를 생성하지 못함)
+    """
+    section: str
+    action: str
+    reason: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class Deadline:
+    """요청 하나의 시간 예산 (스레드 안전)
+
+    `deadline_scope()` 안에서 발생한 API 호출은 남은 시간을 요청 제한 시간으로 사용하며,
+    생략하거나 대체한 섹션은 `degraded`에 기록됩니다.
+    """
+
+    def __init__(self, budget: float, clock: Callable[[], float] = time.monotonic):
+        """초기화 함수
+
+        Args:
+            budget: 시간 예산(초)
+            clock: 현재 시각을 반환하는 함수
+        """
+        if budget <= 0:
+            raise ValueError("시간 예산은 0보다 커야 합니다.")
+        self.budget = budget
+        self._clock = clock
+        self.expires_at = clock() + budget
+        self.degraded: List[DegradedSection] = []
+        self._lock = threading.Lock()
+
+    def remaining(self) -> float:
+        """남은 시간(초, 마감 시간이 지났으면 0)"""
+        return max(0.0, self.expires_at - self._clock())
+
+    def expired(self) -> bool:
+        """마감 시간이 지났는지 확인합니다."""
+        return self.remaining() <= 0
+
+    def request_timeout(self) -> float:
+        """API 요청에 사용할 제한 시간(초)을 반환합니다.
+
+        Raises:
+            DeadlineExceededError: 마감 시간이 이미 지난 경우
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceededError(f"시간 예산({self.budget:g}초)을 모두 사용했습니다.")
+        return remaining
+
+    def degrade(self, section: str, action: str, reason: str) -> None:
+        """생략하거나 대체한 섹션을 기록합니다."""
+        with self._lock:
+            self.degraded.append(DegradedSection(section=section, action=action, reason=reason))
+
+
+@contextmanager
+def deadline_scope(budget: Optional[float]) -> Iterator[Optional[Deadline]]:
+    """블록 안의 API 호출에 시간 예산을 적용하는 컨텍스트 관리자
+
+    이미 더 이른 마감 시간이 적용 중이면 그 마감 시간을 그대로 사용하며,
+    `budget`이 None이면 현재 마감 시간(없으면 None)을 반환합니다.
+    다중 호출 방식의 작업 스레드와 비동기 태스크에도 컨텍스트가 전달됩니다.
+    """
+    outer = _current_deadline.get()
+    if budget is None or (outer is not None and outer.remaining() <= budget):
+        yield outer
+        return
+    deadline = Deadline(budget)
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """현재 컨텍스트의 마감 시간을 반환합니다. (시간 예산이 없으면 None)"""
+    return _current_deadline.get()
+
+
+def is_timeout_error(error: BaseException) -> bool:
+    """예외가 시간 초과 오류인지 확인합니다. (`DeadlineExceededError`와 SDK의 요청 시간 초과 포함)
+
+    마감 시간이 지난 뒤에 발생했더라도 인증 오류, 잘못된 요청, 응답 파싱 오류 같은 다른 예외는
+    시간 초과로 보지 않습니다.
+    """
+    # Python 3.11 이전의 asyncio.TimeoutError, concurrent.futures.TimeoutError는 내장 TimeoutError의 하위 클래스가 아님
+    return any(cls.__name__ in TIMEOUT_ERROR_NAMES for cls in type(error).__mro__)
+
+
+class DeadlinePolicy:
+    """시간 예산이 부족할 때 섹션을 생략하거나 단일 호출 결과로 대체하는 정책 (스레드 안전)
+
+    단계별 소요 시간을 지수 이동 평균으로 기록해 예상 소요 시간으로 사용합니다.
+    다중 호출 변환을 시작할 때 남은 예산이 가장 긴 의존 경로의 예상 시간보다 적으면
+    단일 호출 요청을 함께 보내 두고, 마감 시간까지 생성하지 못한 필수 섹션을 그 결과로 대체합니다.
+    선택 섹션(출력 형식)은 남은 예산이 예상 소요 시간보다 적으면 시작하지 않고 생략합니다.
+    """
+
+    def __init__(self, optional_sections: Sequence[str] = OPTIONAL_SECTIONS, single_call_fallback: bool = True,
+                 estimates: Optional[Dict[str, float]] = None, smoothing: float = 0.3,
+                 safety_factor: float = 1.2):
+        """초기화 함수
+
+        Args:
+            optional_sections: 예산이 부족하면 생략할 섹션 키 목록
+            single_call_fallback: True이면 예산이 빠듯할 때 단일 호출 응답으로 필수 섹션을 대체
+            estimates: 관측값이 없을 때 사용할 단계별 예상 소요 시간(초, 없으면 기본값)
+            smoothing: 관측한 소요 시간을 예상 시간에 반영하는 비율 (0~1)
+            safety_factor: 남은 예산과 비교할 때 예상 소요 시간에 곱할 배수
+        """
+        self.optional_sections = frozenset(optional_sections)
+        self.single_call_fallback = single_call_fallback
+        self.smoothing = smoothing
+        self.safety_factor = safety_factor
+        self._estimates = {**DEFAULT_STAGE_ESTIMATES, **(estimates or {})}
+        self._lock = threading.Lock()
+
+    def estimate(self, stage: str) -> float:
+        """단계의 예상 소요 시간(초)을 반환합니다."""
+        with self._lock:
+            return self._estimates.get(stage, DEFAULT_STAGE_ESTIMATES["instructions"])
+
+    def observe(self, stage: str, seconds: float) -> None:
+        """완료한 단계의 소요 시간을 예상 시간에 반영합니다."""
+        with self._lock:
+            previous = self._estimates.get(stage)
+            if previous is None:
+                self._estimates[stage] = seconds
+            else:
+                self._estimates[stage] = previous + self.smoothing * (seconds - previous)
+
+    def fits(self, seconds: float, remaining: float) -> bool:
+        """예상 소요 시간이 `seconds`인 작업을 남은 시간 안에 마칠 수 있을 것으로 예상되는지 확인합니다."""
+        return remaining >= seconds * self.safety_factor
+
+    def critical_path(self, stages: Sequence[Stage]) -> float:
+        """의존 관계를 따라 가장 오래 걸릴 것으로 예상되는 경로의 시간(초)을 계산합니다."""
+        by_name = {stage.name: stage for stage in stages}
+        finish: Dict[str, float] = {}
+
+        def finish_time(name: str) -> float:
+            if name not in finish:
+                stage = by_name[name]
+                # 이미 완료되어 목록에 없는 선행 단계는 0초로 계산
+                finish[name] = self.estimate(name) + max(
+                    (finish_time(dep) for dep in stage.depends_on if dep in by_name), default=0.0
+                )
+            return finish[name]
+
+        return max((finish_time(name) for name in by_name), default=0.0)
+
+    def optional_stages(self, stages: Sequence[Stage]) -> Dict[str, float]:
+        """생략할 수 있는 단계와, 그 단계부터 선택 섹션을 모두 만들 때까지의 예상 시간(초)을 반환합니다.
+
+        선택 섹션과, 결과를 선택 섹션만 사용하는 단계(예: 형식 요구사항 추출)가 해당됩니다.
+        """
+        dependents = {stage.name: [s.name for s in stages if stage.name in s.depends_on] for stage in stages}
+        optional = {stage.name for stage in stages if stage.name in self.optional_sections}
+        changed = True
+        while changed:
+            changed = False
+            for stage in stages:
+                names = dependents[stage.name]
+                if stage.name not in optional and names and all(name in optional for name in names):
+                    optional.add(stage.name)
+                    changed = True
+
+        needed: Dict[str, float] = {}
+
+        def path_time(name: str) -> float:
+            if name not in needed:
+                needed[name] = self.estimate(name) + max((path_time(dep) for dep in dependents[name]), default=0.0)
+            return needed[name]
+
+        return {name: path_time(name) for name in optional}
@@ -0,0 +1,221 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, List, Optional, Set, Tuple, TypeVar
+
+from src.core.async_prompt_engine import AsyncPromptEngine
+from src.core.prompt_engine import PromptEngine
+
+if TYPE_CHECKING:
+    import asyncio
+
+    from openai import AsyncOpenAI, OpenAI
+
+# 레지스트리가 보관하는 엔진 타입 (PromptEngine 또는 AsyncPromptEngine)
+E = TypeVar("E")
+
+
+def hash_api_key(api_key: str) -> str:
+    """레지스트리 키로 사용할 API 키의 해시를 반환합니다. (원문 키는 보관하지 않음)"""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+
+class EngineRegistry:
+    """프로세스 전체에서 OpenAI 클라이언트와 프롬프트 엔진을 재사용하기 위한 레지스트리
+
+    클라이언트는 API 키별로 하나씩 생성되어 keep-alive 연결 풀을 유지하고,
+    엔진은 (API 키, 모델, temperature) 조합별로 하나씩 생성되어 같은 키의
+    클라이언트를 공유합니다. 따라서 반복 요청은 TCP/TLS 연결을 다시 맺지 않습니다.
+    엔진은 최근에 사용한 `max_engines`개까지만 보관하고, 넘으면 가장 오래 사용하지 않은 엔진을 제거합니다.
+    제거된 엔진의 API 키를 쓰는 엔진이 더 이상 없으면 그 키의 클라이언트도 제거하고 연결 풀을 닫습니다.
+    """
+
+    def __init__(self, max_connections: int = 100, max_keepalive_connections: int = 20,
+                 keepalive_expiry: float = 60.0, timeout: float = 120.0, max_engines: Optional[int] = 32,
+                 **engine_options):
+        """초기화 함수
+
+        Args:
+            max_connections: API 키별 최대 동시 연결 수
+            max_keepalive_connections: 재사용을 위해 유지할 최대 유휴 연결 수
+            keepalive_expiry: 유휴 연결을 유지할 시간(초)
+            timeout: API 요청 제한 시간(초)
+            max_engines: 동기/비동기 엔진을 각각 보관할 최대 개수 (None이면 제한 없음)
+            **engine_options: 엔진 생성 시 전달할 추가 인자 (예: cache, max_concurrency, scheduler)
+        """
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        self.max_engines = max_engines
+        self.engine_options = engine_options
+        self._clients: "OrderedDict[str, OpenAI]" = OrderedDict()
+        self._async_clients: "OrderedDict[str, AsyncOpenAI]" = OrderedDict()
+        self._engines: "OrderedDict[Tuple[str, str, float], PromptEngine]" = OrderedDict()
+        self._async_engines: "OrderedDict[Tuple[str, str, float], AsyncPromptEngine]" = OrderedDict()
+        # 이벤트 루프 밖에서 제거되어 `aclose()`에서 닫을 비동기 클라이언트와 진행 중인 닫기 작업
+        self._retired_async_clients: List["AsyncOpenAI"] = []
+        self._closing: Set["asyncio.Task"] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def limits(self) -> Any:
+        """API 키별 연결 풀 크기 설정 (SDK가 사용하는 HTTP 라이브러리의 `Limits`)"""
+        from openai import DEFAULT_CONNECTION_LIMITS
+
+        return type(DEFAULT_CONNECTION_LIMITS)(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    def _client_max_retries(self) -> int:
+        """클라이언트의 재시도 횟수 (스케줄러가 재시도를 담당하면 0, 아니면 SDK 기본값)"""
+        from openai import DEFAULT_MAX_RETRIES
+
+        return 0 if self.engine_options.get("scheduler") is not None else DEFAULT_MAX_RETRIES
+
+    def _create_client(self, api_key: str) -> "OpenAI":
+        from openai import DefaultHttpxClient, OpenAI
+
+        return OpenAI(
+            api_key=api_key,
+            timeout=self.timeout,
+            max_retries=self._client_max_retries(),
+            http_client=DefaultHttpxClient(limits=self.limits, timeout=self.timeout),
+        )
+
+    def _create_async_client(self, api_key: str) -> "AsyncOpenAI":
+        from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+        return AsyncOpenAI(
+            api_key=api_key,
+            timeout=self.timeout,
+            max_retries=self._client_max_retries(),
+            http_client=DefaultAsyncHttpxClient(limits=self.limits, timeout=self.timeout),
+        )
+
+    @staticmethod
+    def _lookup_client(clients: "OrderedDict[str, Any]", key_hash: str, create) -> Any:
+        """보관 중인 클라이언트를 반환하거나 새로 만들어 보관합니다. (호출 측에서 `_lock`을 잡은 상태로 호출)"""
+        client = clients.get(key_hash)
+        if client is None:
+            client = clients[key_hash] = create()
+        clients.move_to_end(key_hash)
+        return client
+
+    def get_client(self, api_key: str) -> "OpenAI":
+        """API 키에 해당하는 동기 클라이언트를 반환합니다. (없으면 생성)"""
+        with self._lock:
+            return self._lookup_client(self._clients, hash_api_key(api_key), lambda: self._create_client(api_key))
+
+    def get_async_client(self, api_key: str) -> "AsyncOpenAI":
+        """API 키에 해당하는 비동기 클라이언트를 반환합니다. (없으면 생성)
+
+        비동기 클라이언트의 연결 풀은 이벤트 루프에 묶이므로, 하나의 이벤트 루프에서만 사용해야 합니다.
+        """
+        with self._lock:
+            return self._lookup_client(
+                self._async_clients, hash_api_key(api_key), lambda: self._create_async_client(api_key)
+            )
+
+    def _lookup_engine(self, engines: "OrderedDict[Tuple[str, str, float], E]", key: Tuple[str, str, float],
+                       clients: "OrderedDict[str, Any]", create) -> Tuple[E, List[Any]]:
+        """보관 중인 엔진을 반환하거나 새로 만들어 보관합니다. (한도를 넘으면 가장 오래 사용하지 않은 엔진 제거)
+
+        호출 측에서 `_lock`을 잡은 상태로 호출해야 합니다.
+
+        Returns:
+            Tuple[E, List[Any]]: (엔진, 남은 엔진이 사용하지 않아 제거한 클라이언트 목록)
+        """
+        engine = engines.get(key)
+        if engine is not None:
+            engines.move_to_end(key)
+            return engine, []
+        engine = create()
+        engines[key] = engine
+        evicted = set()
+        if self.max_engines is not None:
+            while len(engines) > self.max_engines:
+                evicted.add(engines.popitem(last=False)[0][0])
+        in_use = {engine_key[0] for engine_key in engines}
+        released = [clients.pop(key_hash) for key_hash in evicted - in_use if key_hash in clients]
+        return engine, released
+
+    def get_engine(self, api_key: str, model: str = "gpt-4.1-nano", temperature: float = 0.7) -> PromptEngine:
+        """설정 조합에 해당하는 동기 엔진을 반환합니다. (없으면 생성)
+
+        Args:
+            api_key: OpenAI API 키
+            model: 사용할 OpenAI 모델
+            temperature: 생성 시 사용할 temperature 값
+
+        Returns:
+            PromptEngine: 공유 클라이언트를 사용하는 엔진
+        """
+        key = (hash_api_key(api_key), model, float(temperature))
+        with self._lock:
+            client = self._lookup_client(self._clients, key[0], lambda: self._create_client(api_key))
+            engine, released = self._lookup_engine(self._engines, key, self._clients, lambda: PromptEngine(
+                model=model, temperature=temperature, client=client, **self.engine_options
+            ))
+        for old_client in released:
+            old_client.close()
+        return engine
+
+    def get_async_engine(self, api_key: str, model: str = "gpt-4.1-nano",
+                         temperature: float = 0.7) -> AsyncPromptEngine:
+        """설정 조합에 해당하는 비동기 엔진을 반환합니다. (없으면 생성)
+
+        Args:
+            api_key: OpenAI API 키
+            model: 사용할 OpenAI 모델
+            temperature: 생성 시 사용할 temperature 값
+
+        Returns:
+            AsyncPromptEngine: 공유 비동기 클라이언트를 사용하는 엔진
+        """
+        key = (hash_api_key(api_key), model, float(temperature))
+        with self._lock:
+            client = self._lookup_client(self._async_clients, key[0], lambda: self._create_async_client(api_key))
+            engine, released = self._lookup_engine(
+                self._async_engines, key, self._async_clients, lambda: AsyncPromptEngine(
+                    model=model, temperature=temperature, client=client, **self.engine_options
+                ))
+        for old_client in released:
+            self._close_async_client(old_client)
+        return engine
+
+    def _close_async_client(self, client: "AsyncOpenAI") -> None:
+        """제거한 비동기 클라이언트를 실행 중인 이벤트 루프에서 닫습니다. (루프 밖이면 `aclose()`에서 닫음)"""
+        import asyncio
+
+        try:
+            task = asyncio.get_running_loop().create_task(client.close())
+        except RuntimeError:
+            with self._lock:
+                self._retired_async_clients.append(client)
+            return
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    def close(self) -> None:
+        """동기 클라이언트의 연결 풀을 닫고 등록된 엔진을 모두 제거합니다.
+
+        비동기 클라이언트는 이벤트 루프 안에서 `aclose()`로 닫아야 합니다.
+        """
+        with self._lock:
+            for client in self._clients.values():
+                client.close()
+            self._clients.clear()
+            self._engines.clear()
+
+    async def aclose(self) -> None:
+        """비동기 클라이언트의 연결 풀을 닫고 등록된 비동기 엔진을 모두 제거합니다."""
+        with self._lock:
+            clients = list(self._async_clients.values()) + self._retired_async_clients
+            self._async_clients.clear()
+            self._async_engines.clear()
+            self._retired_async_clients = []
+        for client in clients:
+            await client.close()
@@ -0,0 +1,124 @@
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+from src.core.metrics import percentile
+
+
+class HedgePolicy:
+    """첫 토큰 시간(TTFT) 분위수를 기준으로 중복 요청(헤징)을 보낼 시점을 정하는 정책 (스레드 안전)
+
+    (단계, 모델)별 최근 첫 토큰 시간의 `percentile` 분위수를 마감 시간으로 사용합니다.
+    호출이 마감 시간 안에 첫 토큰을 받지 못하면 엔진이 같은 요청을 한 번 더 보내고
+    먼저 끝난 응답을 사용하며, 나머지 요청은 취소합니다. 여러 엔진이 하나의 정책을
+    공유할 수 있으며, `stats()`의 헤지 발행/승리 횟수로 비용과 지연 시간의 균형을 조절합니다.
+    """
+
+    def __init__(self, percentile: float = 0.95, min_delay: float = 0.2, max_delay: float = 10.0,
+                 initial_delay: float = 2.0, min_samples: int = 20, window: int = 500,
+                 model: Optional[str] = None, max_hedge_rate: float = 0.1,
+                 stages: Optional[Sequence[str]] = None):
+        """초기화 함수
+
+        Args:
+            percentile: 마감 시간으로 사용할 첫 토큰 시간 분위수 (0~1, 예: 0.95이면 p95)
+            min_delay: 마감 시간의 하한(초)
+            max_delay: 마감 시간의 상한(초)
+            initial_delay: 표본이 `min_samples`개보다 적을 때 사용할 마감 시간(초)
+            min_samples: 분위수로 마감 시간을 계산하기 위한 최소 표본 수
+            window: (단계, 모델)별로 보관할 최근 첫 토큰 시간 표본 수
+            model: 중복 요청에 사용할 모델 (예: "gpt-4.1-nano", 없으면 원래 요청과 같은 모델)
+            max_hedge_rate: 전체 호출 중 중복 요청을 보낼 수 있는 최대 비율 (비용 상한)
+            stages: 헤징을 적용할 단계 이름 목록 (없으면 모든 단계)
+        """
+        if not 0 < percentile < 1:
+            raise ValueError("percentile은 0과 1 사이의 값이어야 합니다.")
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.initial_delay = initial_delay
+        self.min_samples = min_samples
+        self.window = window
+        self.model = model
+        self.max_hedge_rate = max_hedge_rate
+        self.stages = frozenset(stages) if stages is not None else None
+        self._samples: Dict[Tuple[str, str], Deque[float]] = {}
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "issued": 0, "won": 0}
+
+    def applies(self, stage: str) -> bool:
+        """단계에 헤징을 적용하는지 확인합니다."""
+        return self.stages is None or stage in self.stages
+
+    def delay(self, stage: str, model: str) -> float:
+        """중복 요청을 보내기 전까지 첫 토큰을 기다릴 시간(초)을 반환합니다."""
+        with self._lock:
+            samples = sorted(self._samples.get((stage, model), ()))
+        if len(samples) < self.min_samples:
+            return self.initial_delay
+        return min(self.max_delay, max(self.min_delay, percentile(samples, self.percentile)))
+
+    def observe(self, stage: str, model: str, ttft: float) -> None:
+        """원래 요청의 첫 토큰 시간을 기록합니다. (첫 토큰 전에 취소되면 취소 시점까지의 시간)"""
+        with self._lock:
+            samples = self._samples.get((stage, model))
+            if samples is None:
+                samples = self._samples[(stage, model)] = deque(maxlen=self.window)
+            samples.append(ttft)
+            self._stats["calls"] += 1
+
+    def try_issue(self) -> bool:
+        """비용 상한 안이면 중복 요청 한 번을 기록하고 True를 반환합니다."""
+        with self._lock:
+            if self._stats["issued"] >= self.max_hedge_rate * (self._stats["calls"] + 1):
+                return False
+            self._stats["issued"] += 1
+            return True
+
+    def record_win(self) -> None:
+        """중복 요청이 원래 요청보다 먼저 끝난 경우를 기록합니다."""
+        with self._lock:
+            self._stats["won"] += 1
+
+    def stats(self) -> Dict[str, int]:
+        """헤징을 적용한 호출 수(`calls`), 중복 요청 수(`issued`), 중복 요청이 먼저 끝난 횟수(`won`)를 반환합니다."""
+        with self._lock:
+            return dict(self._stats)
+
+
+@dataclass
+class HedgeAttempt:
+    """헤징 중인 요청 하나의 진행 상태
+
+    Attributes:
+        model: 요청한 모델
+        hedge: 중복 요청인지 여부
+        responded: 첫 토큰을 받거나 요청이 끝나면 설정되는 이벤트 (`threading.Event` 또는 `asyncio.Event`)
+        ttft: 첫 토큰까지 걸린 시간(초)
+        usage: 응답의 `usage` 객체
+        retries: 스케줄러의 재시도 기록
+        stream: 취소할 때 닫을 응답 스트림
+        truncated: 출력 토큰 한도에 도달해 응답이 잘렸는지 여부
+        cancelled: 취소 여부
+    """
+    model: str
+    hedge: bool
+    responded: Any
+    ttft: Optional[float] = None
+    usage: Any = None
+    retries: List = field(default_factory=list)
+    stream: Any = None
+    truncated: bool = False
+    cancelled: bool = False
+
+    def cancel(self) -> None:
+        """요청을 취소하고 응답 스트림을 닫습니다. (동기 스트림만, 비동기 요청은 태스크를 취소)"""
+        self.cancelled = True
+        close = getattr(self.stream, "close", None)
+        if close is not None:
+            try:
+                close()
+            except Exception:
+                # 다른 스레드가 읽는 중인 스트림은 닫지 못할 수 있으며, 이 경우 다음 청크에서 중단됨
+                pass
@@ -0,0 +1,136 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+# 웹 인터페이스의 커스텀 옵션 키와 입력 뒤에 덧붙이는 줄의 머리말 (덧붙이는 순서대로)
+OPTION_LABELS = (
+    ("scope", "범위"),
+    ("output_format", "출력 형식"),
+    ("special_requirements", "특별 요구사항"),
+)
+
+# 옵션 값으로 바로 덮어쓸 수 있는 분석 결과 필드: {옵션 키: ((결과 이름, 필드), ...)}
+OPTION_FIELDS = {
+    "scope": (("analysis", "scope"),),
+    "output_format": (("analysis", "output_format"), ("format_requirements", "format_type")),
+    "special_requirements": (("analysis", "special_requirements"),),
+}
+
+# 섹션 생성 단계가 메시지를 구성할 때 읽는 결과 (나머지 섹션은 입력 분석 결과)
+SECTION_SOURCES = {"output_format": "format_requirements"}
+
+
+class FieldRecorder(dict):
+    """메시지 구성 함수가 읽은 필드를 순서대로 기록하는 딕셔너리"""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.fields: List[str] = []
+
+    def _record(self, key: str) -> None:
+        if key not in self.fields:
+            self.fields.append(key)
+
+    def __getitem__(self, key: str) -> Any:
+        self._record(key)
+        return super().__getitem__(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        self._record(key)
+        return super().get(key, default)
+
+
+def normalize_options(options: Optional[Dict[str, Optional[str]]]) -> Dict[str, str]:
+    """값이 있는 커스텀 옵션만 남깁니다.
+
+    Raises:
+        ValueError: 알 수 없는 옵션 키가 있는 경우
+    """
+    options = options or {}
+    unknown = [key for key in options if key not in OPTION_FIELDS]
+    if unknown:
+        raise ValueError(f"알 수 없는 옵션입니다 (옵션: {', '.join(OPTION_FIELDS)}): {unknown}")
+    return {key: options[key].strip() for key, _ in OPTION_LABELS if options.get(key) and options[key].strip()}
+
+
+def apply_options(user_input: str, options: Optional[Dict[str, Optional[str]]] = None) -> str:
+    """커스텀 옵션을 `범위: ...` 같은 줄로 입력 뒤에 덧붙입니다. (웹 인터페이스와 같은 형식)"""
+    options = normalize_options(options)
+    return user_input + "".join(f"\n\n{label}: {options[key]}" for key, label in OPTION_LABELS if key in options)
+
+
+@dataclass
+class IncrementalResult:
+    """다시 변환할 때 바뀐 섹션만 생성하기 위한 다중 호출 변환 결과
+
+    Attributes:
+        prompt: 변환된 프롬프트
+        user_input: 커스텀 옵션을 덧붙이기 전의 사용자 입력
+        options: 적용한 커스텀 옵션 (값이 있는 옵션만)
+        analysis: 입력 분석 결과 (옵션 변경분을 반영한 값)
+        format_requirements: 형식 요구사항 추출 결과 (옵션 변경분을 반영한 값)
+        sections: 섹션 키별 생성 결과
+        dependencies: 섹션 키별로 메시지 구성에 사용한 (결과 이름, 필드) 목록
+        regenerated: 이번 변환에서 새로 실행한 단계 (처음 변환이면 모든 단계)
+        scope: 결과를 재사용할 수 있는 엔진 설정 (모델, temperature, 메시지 구성 방식)
+    """
+    prompt: str
+    user_input: str
+    options: Dict[str, str]
+    analysis: Dict[str, Any]
+    format_requirements: Dict[str, Any]
+    sections: Dict[str, str]
+    dependencies: Dict[str, Tuple[Tuple[str, str], ...]] = field(default_factory=dict)
+    regenerated: List[str] = field(default_factory=list)
+    scope: Optional[str] = None
+
+    def sources(self) -> Dict[str, Dict[str, Any]]:
+        """결과 이름별 분석 결과를 반환합니다."""
+        return {"analysis": self.analysis, "format_requirements": self.format_requirements}
+
+
+def option_overrides(previous: IncrementalResult, options: Dict[str, str]) -> Optional[Dict[str, Dict[str, Any]]]:
+    """이전 분석 결과에 옵션 변경분을 반영한 결과를 계산합니다.
+
+    옵션을 추가하거나 값을 바꾼 경우는 해당 필드를 옵션 값으로 덮어씁니다. 옵션을 지운 경우는
+    입력 본문에서 어떤 값을 추출할지 알 수 없으므로 None을 반환합니다. (입력 분석을 다시 실행)
+
+    Args:
+        previous: 이전 변환 결과
+        options: 새 커스텀 옵션 (`normalize_options()` 결과)
+
+    Returns:
+        Optional[Dict[str, Dict[str, Any]]]: 결과 이름별 분석 결과 (다시 분석해야 하면 None)
+    """
+    if any(key not in options for key in previous.options):
+        return None
+    sources = {name: dict(value) for name, value in previous.sources().items()}
+    for key, value in options.items():
+        if previous.options.get(key) == value:
+            continue
+        for name, field_name in OPTION_FIELDS[key]:
+            sources[name][field_name] = value
+    return sources
+
+
+def reusable_sections(previous: IncrementalResult, sources: Dict[str, Dict[str, Any]]) -> Dict[str, str]:
+    """읽는 필드의 값이 바뀌지 않아 이전 결과를 그대로 쓸 수 있는 섹션을 반환합니다.
+
+    Args:
+        previous: 이전 변환 결과
+        sources: 결과 이름별 새 분석 결과
+
+    Returns:
+        Dict[str, str]: 재사용할 섹션 키별 생성 결과
+    """
+    old_sources = previous.sources()
+    reused = {}
+    for section, fields in previous.dependencies.items():
+        if section not in previous.sections:
+            continue
+        source = SECTION_SOURCES.get(section, "analysis")
+        # 출력 형식은 형식 요구사항이 있는 경우에만 생성
+        if bool(old_sources[source]) != bool(sources[source]):
+            continue
+        if all(old_sources[name].get(key) == sources[name].get(key) for name, key in fields):
+            reused[section] = previous.sections[section]
+    return reused
@@ -0,0 +1,140 @@
+import re
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
+
+from src.core.router import OPTION_LINE_RE
+from src.core.tokens import count_tokens
+
+# 부분별 요구사항 추출과 추출 결과 통합 단계의 이름 (`TEMPLATES`의 `{단계}_system`)
+CHUNK_STAGE = "chunk_requirements"
+REDUCE_STAGE = "reduce_requirements"
+
+# 이 토큰 수를 넘는 입력은 요약 브리프로 줄여서 변환
+DEFAULT_THRESHOLD_TOKENS = 3000
+
+# 부분 하나(요구사항 추출 호출 하나)의 최대 입력 토큰 수
+DEFAULT_CHUNK_TOKENS = 1500
+
+# 요구사항 통합을 반복할 최대 횟수 (통합 결과가 줄어들지 않는 경우의 상한)
+MAX_REDUCE_ROUNDS = 4
+
+# 문단 경계 (빈 줄)와 문장 경계
+PARAGRAPH_RE = re.compile(r"\S[\s\S]*?(?=\n[ \t]*\n|\Z)")
+SENTENCE_END_RE = re.compile(r"(?<=[.?!。])\s+|\n")
+
+
+@dataclass
+class LongInputPolicy:
+    """긴 입력을 부분별로 요구사항을 추출한 뒤 요약 브리프로 합쳐 변환하는 정책
+
+    입력이 `threshold_tokens`를 넘으면 `chunk_tokens` 이하의 부분으로 나누어 부분마다
+    요구사항을 동시에 추출하고(map), 추출 결과를 하나의 간결한 브리프로 합칩니다(reduce).
+    이후 입력 분석, 형식 요구사항 추출, 단일 호출은 원문 대신 브리프를 사용하므로
+    입력 크기와 관계없이 호출 하나의 입력 토큰 수와 지연 시간이 제한됩니다.
+
+    Attributes:
+        threshold_tokens: 브리프로 줄일 최소 입력 토큰 수
+        chunk_tokens: 부분 하나와 통합 호출 하나의 최대 입력 토큰 수
+        max_concurrency: 동시에 진행할 최대 추출 호출 수 (None이면 엔진의 `max_concurrency`)
+    """
+    threshold_tokens: int = DEFAULT_THRESHOLD_TOKENS
+    chunk_tokens: int = DEFAULT_CHUNK_TOKENS
+    max_concurrency: Optional[int] = None
+
+    def __post_init__(self):
+        if self.chunk_tokens <= 0 or self.threshold_tokens <= 0:
+            raise ValueError("threshold_tokens와 chunk_tokens는 0보다 커야 합니다.")
+
+    def applies(self, user_input: str, model: Optional[str] = None) -> bool:
+        """입력을 브리프로 줄여야 하는지 확인합니다."""
+        return count_tokens(user_input, model) > self.threshold_tokens
+
+
+def split_option_lines(user_input: str) -> Tuple[str, str]:
+    """입력 끝에 덧붙은 커스텀 옵션 줄(`범위:`, `출력 형식:`, `특별 요구사항:`)을 본문과 분리합니다.
+
+    옵션 줄은 요약하지 않고 브리프 뒤에 그대로 붙이기 위해 사용합니다.
+
+    Returns:
+        Tuple[str, str]: (본문, 옵션 줄)
+    """
+    lines = user_input.split("\n")
+    start = len(lines)
+    while start > 0 and (not lines[start - 1].strip() or OPTION_LINE_RE.match(lines[start - 1])):
+        start -= 1
+    options = "\n".join(line for line in lines[start:] if line.strip())
+    if not options:
+        return user_input, ""
+    return "\n".join(lines[:start]), options
+
+
+def _split_oversized(text: str, max_tokens: int, model: Optional[str]) -> Iterator[Tuple[str, int]]:
+    """한도를 넘는 문단을 문장 단위로, 문장도 넘으면 글자 수 비율로 나눕니다."""
+    for sentence in SENTENCE_END_RE.split(text):
+        if not sentence.strip():
+            continue
+        tokens = count_tokens(sentence, model)
+        if tokens <= max_tokens:
+            yield sentence, tokens
+            continue
+        step = max(1, len(sentence) * max_tokens // tokens)
+        for start in range(0, len(sentence), step):
+            piece = sentence[start:start + step]
+            yield piece, count_tokens(piece, model)
+
+
+def iter_chunks(text: str, max_tokens: int, model: Optional[str] = None) -> Iterator[str]:
+    """텍스트를 `max_tokens` 이하의 부분으로 나누어 앞에서부터 차례로 반환합니다.
+
+    문단(빈 줄) 경계를 우선하고, 한 문단이 한도를 넘으면 문장 경계에서 나눕니다.
+    전체를 미리 나누지 않고 문단을 읽는 대로 부분을 만들므로, 호출 측은 첫 부분부터
+    바로 요구사항 추출을 시작할 수 있습니다.
+
+    Args:
+        text: 나눌 텍스트
+        max_tokens: 부분 하나의 최대 토큰 수
+        model: 토큰 수를 셀 모델 이름
+
+    Returns:
+        Iterator[str]: 부분 텍스트
+    """
+    parts: List[str] = []
+    used = 0
+    for match in PARAGRAPH_RE.finditer(text):
+        paragraph = match.group(0).strip()
+        tokens = count_tokens(paragraph, model)
+        pieces = [(paragraph, tokens)] if tokens <= max_tokens else _split_oversized(paragraph, max_tokens, model)
+        for piece, piece_tokens in pieces:
+            if parts and used + piece_tokens > max_tokens:
+                yield "\n\n".join(parts)
+                parts, used = [], 0
+            parts.append(piece)
+            used += piece_tokens
+    if parts:
+        yield "\n\n".join(parts)
+
+
+def group_notes(notes: List[str], max_tokens: int, model: Optional[str] = None) -> List[List[str]]:
+    """통합 호출 하나의 입력이 `max_tokens`를 넘지 않도록 추출 결과를 순서대로 묶습니다."""
+    groups: List[List[str]] = []
+    used = 0
+    for note in notes:
+        tokens = count_tokens(note, model)
+        if groups and used + tokens <= max_tokens:
+            groups[-1].append(note)
+            used += tokens
+        else:
+            groups.append([note])
+            used = tokens
+    return groups
+
+
+def join_notes(notes: List[str]) -> str:
+    """부분별 추출 결과를 통합 요청 메시지 본문으로 합칩니다."""
+    return "\n\n".join(f"[부분 {index}]\n{note.strip()}" for index, note in enumerate(notes, 1))
+
+
+def build_brief_input(brief: str, options: str) -> str:
+    """요약 브리프 뒤에 커스텀 옵션 줄을 다시 붙여 변환할 입력을 만듭니다."""
+    brief = brief.strip()
+    return f"{brief}\n\n{options}" if options else brief
@@ -0,0 +1,293 @@
+import math
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Any, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from src.core.deadline import DegradedSection
+
+# 집계기에서 계산하는 분위수
+QUANTILES = (0.5, 0.95, 0.99)
+
+# 현재 요청에서 발생한 API 호출 기록 (스레드/태스크별로 독립적)
+_current_trace: ContextVar[Optional[List["CallRecord"]]] = ContextVar("prompt_engine_trace", default=None)
+
+
+@dataclass
+class CallRecord:
+    """API 호출 한 번에 대한 계측 기록
+
+    Attributes:
+        stage: 호출한 단계 이름 (예: "analysis", "single_call")
+        model: 요청한 모델
+        wall_time: 호출 시작부터 응답 완료까지 걸린 시간(초)
+        ttft: 첫 토큰까지 걸린 시간(초, 스트리밍 호출만 기록)
+        prompt_tokens: 입력 토큰 수 (`response.usage`, 없으면 0)
+        completion_tokens: 출력 토큰 수 (`response.usage`, 없으면 0)
+        cached_tokens: 입력 토큰 중 프롬프트 캐시로 처리된 토큰 수
+                       (`usage.prompt_tokens_details.cached_tokens`, 없으면 0)
+        cache_hit: 응답 캐시에서 가져왔는지 여부
+        coalesced: 동시에 진행 중이던 같은 요청의 응답을 함께 받았는지 여부 (직접 API를 호출하지 않음)
+        hedged: 첫 토큰이 늦어 같은 요청을 한 번 더 보냈는지 여부
+        hedge_won: 중복 요청의 응답을 사용했는지 여부 (`model`은 중복 요청에 사용한 모델)
+        retries: 스케줄러가 다시 시도한 횟수
+        streamed: 스트리밍 호출 여부
+        truncated: 출력 토큰 한도(`max_tokens`)에 도달해 응답이 잘렸는지 여부 (`finish_reason == "length"`)
+        error: 실패한 경우 예외 메시지
+    """
+    stage: str
+    model: str
+    wall_time: float
+    ttft: Optional[float] = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    cache_hit: bool = False
+    coalesced: bool = False
+    hedged: bool = False
+    hedge_won: bool = False
+    retries: int = 0
+    streamed: bool = False
+    truncated: bool = False
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class TransformResult:
+    """변환된 프롬프트와 요청 단위 계측 결과
+
+    Attributes:
+        prompt: 변환된 프롬프트
+        elapsed: 전체 변환에 걸린 시간(초)
+        calls: 변환 중 발생한 API 호출 기록 (완료된 순서)
+        degraded: 시간 예산 때문에 생략하거나 단일 호출 결과로 대체한 섹션
+        budgets: 적용된 토큰 예산 (`TokenBudget.describe()`, 예산을 사용하지 않으면 빈 딕셔너리)
+    """
+    prompt: str
+    elapsed: float
+    calls: List[CallRecord] = field(default_factory=list)
+    degraded: List[DegradedSection] = field(default_factory=list)
+    budgets: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def prompt_tokens(self) -> int:
+        return sum(call.prompt_tokens for call in self.calls)
+
+    @property
+    def completion_tokens(self) -> int:
+        return sum(call.completion_tokens for call in self.calls)
+
+    @property
+    def cached_tokens(self) -> int:
+        return sum(call.cached_tokens for call in self.calls)
+
+    @property
+    def cache_hits(self) -> int:
+        return sum(1 for call in self.calls if call.cache_hit)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON으로 직렬화할 수 있는 딕셔너리로 변환합니다."""
+        return {
+            "prompt": self.prompt,
+            "elapsed": self.elapsed,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached_tokens": self.cached_tokens,
+            "cache_hits": self.cache_hits,
+            "calls": [call.to_dict() for call in self.calls],
+            "degraded": [section.to_dict() for section in self.degraded],
+            "budgets": self.budgets,
+        }
+
+
+@contextmanager
+def request_trace() -> Iterator[List[CallRecord]]:
+    """블록 안에서 발생한 API 호출 기록을 모으는 컨텍스트 관리자
+
+    다중 호출 방식의 작업 스레드와 비동기 태스크에도 컨텍스트가 전달되므로,
+    하나의 변환 요청에서 발생한 모든 호출이 같은 목록에 기록됩니다.
+    """
+    calls: List[CallRecord] = []
+    token = _current_trace.set(calls)
+    try:
+        yield calls
+    finally:
+        _current_trace.reset(token)
+
+
+def current_trace() -> Optional[List[CallRecord]]:
+    """현재 컨텍스트의 호출 기록 목록을 반환합니다. (추적 중이 아니면 None)"""
+    return _current_trace.get()
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """정렬된 값 목록에서 최근접 순위(nearest-rank) 방식으로 분위수를 계산합니다."""
+    if not values:
+        return 0.0
+    rank = max(1, math.ceil(q * len(values)))
+    return values[min(rank, len(values)) - 1]
+
+
+class _StageStats:
+    """(단계, 모델)별 누적 통계"""
+
+    def __init__(self, max_samples: int):
+        self.calls = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_tokens = 0
+        self.wall_time_sum = 0.0
+        self.wall_times: Deque[float] = deque(maxlen=max_samples)
+        self.ttfts: Deque[float] = deque(maxlen=max_samples)
+
+
+class MetricsAggregator:
+    """API 호출 기록을 (단계, 모델)별로 집계하는 메모리 집계기 (스레드 안전)
+
+    엔진의 `instrumentation`으로 전달하면 모든 호출이 기록되며,
+    지연 시간 분위수(p50/p95/p99)는 최근 `max_samples`개 호출로 계산합니다.
+    """
+
+    def __init__(self, max_samples: int = 10000):
+        """초기화 함수
+
+        Args:
+            max_samples: 분위수 계산에 사용할 (단계, 모델)별 최근 호출 수
+        """
+        self.max_samples = max_samples
+        self._stats: Dict[Tuple[str, str], _StageStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, call: CallRecord) -> None:
+        """호출 기록 하나를 집계합니다."""
+        with self._lock:
+            stats = self._stats.get((call.stage, call.model))
+            if stats is None:
+                stats = self._stats[(call.stage, call.model)] = _StageStats(self.max_samples)
+            stats.calls += 1
+            stats.errors += 1 if call.error else 0
+            stats.cache_hits += 1 if call.cache_hit else 0
+            stats.coalesced += 1 if call.coalesced else 0
+            stats.hedges += 1 if call.hedged else 0
+            stats.hedge_wins += 1 if call.hedge_won else 0
+            stats.retries += call.retries
+            stats.prompt_tokens += call.prompt_tokens
+            stats.completion_tokens += call.completion_tokens
+            stats.cached_tokens += call.cached_tokens
+            stats.wall_time_sum += call.wall_time
+            stats.wall_times.append(call.wall_time)
+            if call.ttft is not None:
+                stats.ttfts.append(call.ttft)
+
+    def reset(self) -> None:
+        """집계 결과를 모두 지웁니다."""
+        with self._lock:
+            self._stats.clear()
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """(단계, 모델)별 집계 결과를 반환합니다.
+
+        Returns:
+            List[Dict[str, Any]]: 단계별 호출 수, 오류/캐시 적중/요청 합치기/중복 요청(헤지)/재시도 횟수,
+                                  토큰 수(프롬프트 캐시 토큰 포함),
+                                  지연 시간 분위수(`p50`, `p95`, `p99`)와 첫 토큰 시간 분위수(`ttft_p50` 등)
+        """
+        rows = []
+        with self._lock:
+            for (stage, model), stats in sorted(self._stats.items()):
+                wall_times = sorted(stats.wall_times)
+                ttfts = sorted(stats.ttfts)
+                row = {
+                    "stage": stage,
+                    "model": model,
+                    "calls": stats.calls,
+                    "errors": stats.errors,
+                    "cache_hits": stats.cache_hits,
+                    "coalesced": stats.coalesced,
+                    "hedges": stats.hedges,
+                    "hedge_wins": stats.hedge_wins,
+                    "retries": stats.retries,
+                    "prompt_tokens": stats.prompt_tokens,
+                    "completion_tokens": stats.completion_tokens,
+                    "cached_tokens": stats.cached_tokens,
+                    "wall_time_sum": stats.wall_time_sum,
+                }
+                for q in QUANTILES:
+                    row[f"p{int(q * 100)}"] = percentile(wall_times, q)
+                for q in QUANTILES:
+                    row[f"ttft_p{int(q * 100)}"] = percentile(ttfts, q) if ttfts else None
+                rows.append(row)
+        return rows
+
+    def to_prometheus(self, prefix: str = "prompt_engine") -> str:
+        """집계 결과를 Prometheus 텍스트 노출 형식으로 반환합니다.
+
+        Args:
+            prefix: 메트릭 이름 접두어
+
+        Returns:
+            str: Prometheus 텍스트 형식 (`/metrics` 응답 본문으로 사용 가능)
+        """
+        rows = self.summary()
+        lines: List[str] = []
+
+        def header(name: str, kind: str, help_text: str) -> str:
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            return f"{prefix}_{name}"
+
+        def labels(row: Dict[str, Any], **extra: str) -> str:
+            pairs = {"stage": row["stage"], "model": row["model"], **extra}
+            return "{" + ",".join(f'{k}="{_escape_label(str(v))}"' for k, v in pairs.items()) + "}"
+
+        name = header("call_duration_seconds", "summary", "API call wall time per stage")
+        for row in rows:
+            for q in QUANTILES:
+                lines.append(f"{name}{labels(row, quantile=str(q))} {row[f'p{int(q * 100)}']:.6f}")
+            lines.append(f"{name}_sum{labels(row)} {row['wall_time_sum']:.6f}")
+            lines.append(f"{name}_count{labels(row)} {row['calls']}")
+
+        name = header("time_to_first_token_seconds", "summary", "Time to first streamed token per stage")
+        for row in rows:
+            if row["ttft_p50"] is None:
+                continue
+            for q in QUANTILES:
+                lines.append(f"{name}{labels(row, quantile=str(q))} {row[f'ttft_p{int(q * 100)}']:.6f}")
+
+        counters = (
+            ("calls_total", "calls", "API calls per stage"),
+            ("errors_total", "errors", "Failed API calls per stage"),
+            ("cache_hits_total", "cache_hits", "Responses served from the response cache"),
+            ("coalesced_total", "coalesced", "Responses shared from an identical in-flight request"),
+            ("hedges_total", "hedges", "Duplicate requests issued after a slow first token"),
+            ("hedge_wins_total", "hedge_wins", "Calls answered by the duplicate request"),
+            ("retries_total", "retries", "Scheduler retries per stage"),
+        )
+        for metric, key, help_text in counters:
+            name = header(metric, "counter", help_text)
+            for row in rows:
+                lines.append(f"{name}{labels(row)} {row[key]}")
+
+        name = header("tokens_total", "counter", "Tokens reported by response.usage")
+        for row in rows:
+            lines.append(f"{name}{labels(row, type='prompt')} {row['prompt_tokens']}")
+            lines.append(f"{name}{labels(row, type='completion')} {row['completion_tokens']}")
+            lines.append(f"{name}{labels(row, type='cached')} {row['cached_tokens']}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label(value: str) -> str:
+    """Prometheus 레이블 값의 특수 문자를 이스케이프합니다."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
@@ -0,0 +1,336 @@
+import json
+import os
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from src.core.router import AUTO_ROUTE, missing_sections, route_input
+from src.core.schemas import SchemaValidationError
+from src.core.sections import parse_sections
+from src.core.token_budget import TRUNCATED_FINISH_REASON
+
+# Batch API 작업의 최종 상태
+TERMINAL_BATCH_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+# custom_id에서 입력 ID와 단계 이름을 구분하는 구분자
+CUSTOM_ID_SEPARATOR = "::"
+
+CHAT_COMPLETIONS_ENDPOINT = "/v1/chat/completions"
+
+
+class BatchAPIError(RuntimeError):
+    """Batch API 작업이 완료되지 못한 경우 발생하는 예외"""
+
+
+# 출력 토큰 한도에 도달해 잘린 응답의 오류 메시지
+TRUNCATED_OUTPUT_ERROR = "출력 토큰 한도(max_tokens)에 도달해 응답이 잘렸습니다."
+
+
+class OpenAIBatchBackend:
+    """OpenAI Batch API를 이용한 오프라인 대량 변환 백엔드
+
+    `PromptEngine`이 보낼 요청 메시지를 그대로 Batch API 입력 JSONL로 만들어 제출하고,
+    작업이 끝날 때까지 상태를 확인한 뒤 결과를 `<prompt>` 구조로 다시 조립합니다.
+    실시간 호출보다 느리지만 대량 작업의 비용을 크게 줄일 수 있습니다.
+    """
+
+    def __init__(self, engine, poll_interval: float = 30.0, completion_window: str = "24h",
+                 work_dir: Optional[str] = None, sleep: Callable[[float], None] = time.sleep):
+        """초기화 함수
+
+        Args:
+            engine: 요청 메시지 구성과 결과 조립에 사용할 동기 `PromptEngine`
+                    (엔진의 클라이언트, 모델, temperature를 그대로 사용)
+            poll_interval: 작업 상태 확인 간격(초)
+            completion_window: Batch API 완료 기한
+            work_dir: 입력 JSONL 파일을 저장할 디렉토리 (없으면 임시 디렉토리)
+            sleep: 상태 확인 사이에 대기할 때 사용할 함수
+            
+        Raises:
+            ValueError: 엔진에 긴 입력 처리 정책(`long_input`)이 설정된 경우
+                        (요약 호출은 Batch 작업으로 처리하지 않음)
+        """
+        if getattr(engine, "long_input", None) is not None:
+            raise ValueError("Batch API 백엔드는 긴 입력 처리 정책(long_input)을 지원하지 않습니다.")
+        self.engine = engine
+        self.client = engine.client
+        self.poll_interval = poll_interval
+        self.completion_window = completion_window
+        self.work_dir = work_dir
+        self._sleep = sleep
+
+    def build_request_line(self, custom_id: str, messages: List[Dict]) -> Dict:
+        """단일 요청에 대한 Batch API 입력 레코드를 만듭니다."""
+        stage = custom_id.rpartition(CUSTOM_ID_SEPARATOR)[2]
+        return {
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": CHAT_COMPLETIONS_ENDPOINT,
+            "body": self.engine.build_request(stage, messages),
+        }
+
+    def write_requests(self, requests: Dict[str, List[Dict]]) -> str:
+        """요청 목록을 Batch API 입력 JSONL 파일로 저장하고 경로를 반환합니다."""
+        fd, path = tempfile.mkstemp(prefix="prompt-batch-", suffix=".jsonl", dir=self.work_dir)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for custom_id, messages in requests.items():
+                f.write(json.dumps(self.build_request_line(custom_id, messages), ensure_ascii=False) + "\n")
+        return path
+
+    def submit(self, input_path: str) -> str:
+        """입력 파일을 업로드하고 Batch 작업을 생성한 뒤 작업 ID를 반환합니다."""
+        with open(input_path, "rb") as f:
+            input_file = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=CHAT_COMPLETIONS_ENDPOINT,
+            completion_window=self.completion_window,
+        )
+        return batch.id
+
+    def wait(self, batch_id: str, timeout: Optional[float] = None):
+        """작업이 최종 상태가 될 때까지 상태를 확인하고 작업 객체를 반환합니다.
+
+        Args:
+            batch_id: Batch 작업 ID
+            timeout: 최대 대기 시간(초). 초과하면 BatchAPIError 발생
+
+        Returns:
+            최종 상태의 Batch 작업 객체
+        """
+        started = time.monotonic()
+        while True:
+            batch = self.client.batches.retrieve(batch_id)
+            if batch.status in TERMINAL_BATCH_STATUSES:
+                return batch
+            if timeout is not None and time.monotonic() - started > timeout:
+                raise BatchAPIError(f"Batch 작업 {batch_id}이(가) {timeout}초 안에 끝나지 않았습니다. (상태: {batch.status})")
+            self._sleep(self.poll_interval)
+
+    def fetch_results(self, batch) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """작업 결과 파일을 내려받아 custom_id별 응답 텍스트와 오류를 반환합니다.
+
+        만료되거나 일부만 완료된 작업도 완료된 요청의 결과는 반환합니다.
+        출력 토큰 한도에 도달해 잘린 응답은 결과 파일에 잘림 여부를 남길 곳이 없으므로
+        성공으로 받지 않고 오류로 기록합니다. (해당 입력은 다음 실행에서 다시 변환)
+
+        Returns:
+            Tuple[Dict[str, str], Dict[str, str]]: (custom_id별 응답 텍스트, custom_id별 오류 메시지)
+        """
+        contents: Dict[str, str] = {}
+        errors: Dict[str, str] = {}
+        for file_id in (getattr(batch, "output_file_id", None), getattr(batch, "error_file_id", None)):
+            if not file_id:
+                continue
+            for line in self.client.files.content(file_id).text.splitlines():
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                custom_id = record.get("custom_id")
+                response = record.get("response") or {}
+                if record.get("error") or response.get("status_code", 200) >= 400:
+                    errors[custom_id] = json.dumps(record.get("error") or response.get("body"), ensure_ascii=False)
+                    continue
+                choice = response["body"]["choices"][0]
+                if choice.get("finish_reason") == TRUNCATED_FINISH_REASON:
+                    errors[custom_id] = TRUNCATED_OUTPUT_ERROR
+                    continue
+                contents[custom_id] = choice["message"]["content"]
+        if batch.status != "completed" and not contents and not errors:
+            raise BatchAPIError(f"Batch 작업 {batch.id}이(가) '{batch.status}' 상태로 종료되었습니다.")
+        return contents, errors
+
+    def run_requests(self, requests: Dict[str, List[Dict]],
+                     timeout: Optional[float] = None) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """요청 목록을 하나의 Batch 작업으로 실행합니다.
+
+        Args:
+            requests: custom_id별 요청 메시지
+            timeout: 최대 대기 시간(초)
+
+        Returns:
+            Tuple[Dict[str, str], Dict[str, str]]: (custom_id별 응답 텍스트, custom_id별 오류 메시지)
+        """
+        if not requests:
+            return {}, {}
+        input_path = self.write_requests(requests)
+        try:
+            batch = self.wait(self.submit(input_path), timeout=timeout)
+        finally:
+            os.remove(input_path)
+        contents, errors = self.fetch_results(batch)
+        # 결과가 없는 요청은 오류로 간주
+        for custom_id in requests:
+            if custom_id not in contents and custom_id not in errors:
+                errors[custom_id] = f"결과가 없습니다. (작업 상태: {batch.status})"
+        return contents, errors
+
+    def transform_single_call(self, inputs: Dict[str, str],
+                              timeout: Optional[float] = None) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """단일 호출 방식의 변환을 하나의 Batch 작업으로 수행합니다.
+
+        Args:
+            inputs: 입력 ID별 사용자 입력
+            timeout: 최대 대기 시간(초)
+
+        Returns:
+            Tuple[Dict[str, str], Dict[str, str]]: (입력 ID별 변환된 프롬프트, 입력 ID별 오류 메시지)
+        """
+        sections, errors = self._single_call_sections(inputs, timeout=timeout)
+        prompts = {
+            input_id: self.engine.assemble_single_call_prompt(parsed) for input_id, parsed in sections.items()
+        }
+        return prompts, errors
+
+    def _single_call_sections(self, inputs: Dict[str, str],
+                              timeout: Optional[float] = None) -> Tuple[Dict[str, Dict], Dict[str, str]]:
+        """단일 호출 방식의 요청을 하나의 Batch 작업으로 수행하고 응답을 섹션별로 나눕니다."""
+        requests = {
+            _custom_id(input_id, "single_call"): self.engine.build_stage_messages("single_call", text)
+            for input_id, text in inputs.items()
+        }
+        contents, errors = self.run_requests(requests, timeout=timeout)
+
+        sections: Dict[str, Dict] = {}
+        for input_id in inputs:
+            content = contents.get(_custom_id(input_id, "single_call"))
+            if content is not None:
+                sections[input_id] = parse_sections(content)
+        return sections, _errors_by_input(errors)
+
+    def transform_multi_call(self, inputs: Dict[str, str],
+                             timeout: Optional[float] = None) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """다중 호출 방식의 변환을 두 번의 Batch 작업으로 수행합니다.
+
+        첫 번째 작업에서 입력 분석과 형식 요구사항 추출(엔진의 `merge_analysis_calls`이면
+        통합 분석 한 번)을, 두 번째 작업에서
+        그 결과에 의존하는 섹션 생성 요청을 처리합니다.
+
+        Args:
+            inputs: 입력 ID별 사용자 입력
+            timeout: 작업별 최대 대기 시간(초)
+
+        Returns:
+            Tuple[Dict[str, str], Dict[str, str]]: (입력 ID별 변환된 프롬프트, 입력 ID별 오류 메시지)
+        """
+        engine = self.engine
+
+        # 1단계: 입력 분석과 형식 요구사항 추출 (merge_analysis_calls이면 하나의 요청)
+        if engine.merge_analysis_calls:
+            first_stages = ("combined_analysis",)
+        else:
+            first_stages = ("analysis", "format_requirements")
+        first_requests = {}
+        for input_id, text in inputs.items():
+            for stage in first_stages:
+                first_requests[_custom_id(input_id, stage)] = engine.build_stage_messages(stage, text)
+        first_contents, errors = self.run_requests(first_requests, timeout=timeout)
+
+        analyses: Dict[str, Dict] = {}
+        format_requirements: Dict[str, Dict] = {}
+        for input_id in inputs:
+            parsed = {}
+            for stage in first_stages:
+                content = first_contents.get(_custom_id(input_id, stage))
+                if content is None:
+                    continue
+                try:
+                    parsed[stage] = engine.parse_stage_output(stage, content)
+                except SchemaValidationError as e:
+                    # Batch 작업에서는 수정 요청을 다시 보내지 않고 해당 입력을 실패로 기록
+                    errors[_custom_id(input_id, stage)] = str(e)
+            if len(parsed) < len(first_stages):
+                continue
+            if "combined_analysis" in parsed:
+                parsed["analysis"], parsed["format_requirements"] = \
+                    engine.split_combined_analysis(parsed["combined_analysis"])
+            analyses[input_id] = parsed["analysis"]
+            format_requirements[input_id] = parsed["format_requirements"]
+
+        # 2단계: 분석 결과에 의존하는 섹션 생성
+        section_stages = ("expert_role", "instructions", "response_style", "reminders")
+        second_requests = {}
+        for input_id, analysis in analyses.items():
+            for stage in section_stages:
+                second_requests[_custom_id(input_id, stage)] = engine.build_stage_messages(stage, analysis)
+            if format_requirements[input_id]:
+                second_requests[_custom_id(input_id, "output_format")] = \
+                    engine.build_stage_messages("output_format", format_requirements[input_id])
+        second_contents, second_errors = self.run_requests(second_requests, timeout=timeout)
+        errors.update(second_errors)
+
+        prompts: Dict[str, str] = {}
+        for input_id, analysis in analyses.items():
+            sections = {"analysis": analysis, "output_format": ""}
+            for stage in section_stages + ("output_format",):
+                content = second_contents.get(_custom_id(input_id, stage))
+                if content is not None:
+                    sections[stage] = content
+            if all(stage in sections for stage in section_stages):
+                prompts[input_id] = engine.assemble_multi_call_prompt(sections)
+        return prompts, _errors_by_input(errors)
+
+    def transform_auto(self, inputs: Dict[str, str],
+                       timeout: Optional[float] = None) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """입력 복잡도에 따라 입력별로 단일 호출과 다중 호출 방식을 골라 변환합니다.
+
+        단순한 입력은 단일 호출 방식의 Batch 작업으로 먼저 변환하고, 복잡한 입력과
+        단일 호출 응답에 필수 섹션이 빠진 입력(엔진의 `auto_escalation`이 True일 때)은
+        함께 다중 호출 방식으로 변환합니다.
+
+        Args:
+            inputs: 입력 ID별 사용자 입력
+            timeout: 작업별 최대 대기 시간(초)
+
+        Returns:
+            Tuple[Dict[str, str], Dict[str, str]]: (입력 ID별 변환된 프롬프트, 입력 ID별 오류 메시지)
+        """
+        multi_inputs = {input_id: text for input_id, text in inputs.items() if route_input(text).use_multi_call}
+        single_inputs = {input_id: text for input_id, text in inputs.items() if input_id not in multi_inputs}
+
+        prompts: Dict[str, str] = {}
+        errors: Dict[str, str] = {}
+        if single_inputs:
+            sections, errors = self._single_call_sections(single_inputs, timeout=timeout)
+            for input_id, parsed in sections.items():
+                if self.engine.auto_escalation and missing_sections(parsed):
+                    multi_inputs[input_id] = single_inputs[input_id]
+                else:
+                    prompts[input_id] = self.engine.assemble_single_call_prompt(parsed)
+        if multi_inputs:
+            multi_prompts, multi_errors = self.transform_multi_call(multi_inputs, timeout=timeout)
+            prompts.update(multi_prompts)
+            errors.update(multi_errors)
+        return prompts, errors
+
+    def transform(self, inputs: Dict[str, str], use_multi_call: Union[bool, str] = False,
+                  timeout: Optional[float] = None) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """입력 목록을 Batch API로 변환합니다.
+
+        Args:
+            inputs: 입력 ID별 사용자 입력
+            use_multi_call: 다중 호출 방식 사용 여부 ("auto"이면 입력 복잡도에 따라 입력별로 선택)
+            timeout: 작업별 최대 대기 시간(초)
+
+        Returns:
+            Tuple[Dict[str, str], Dict[str, str]]: (입력 ID별 변환된 프롬프트, 입력 ID별 오류 메시지)
+        """
+        if use_multi_call == AUTO_ROUTE:
+            return self.transform_auto(inputs, timeout=timeout)
+        if use_multi_call:
+            return self.transform_multi_call(inputs, timeout=timeout)
+        return self.transform_single_call(inputs, timeout=timeout)
+
+
+def _custom_id(input_id: str, stage: str) -> str:
+    """입력 ID와 단계 이름으로 Batch 요청의 custom_id를 만듭니다."""
+    return f"{input_id}{CUSTOM_ID_SEPARATOR}{stage}"
+
+
+def _errors_by_input(errors: Dict[str, str]) -> Dict[str, str]:
+    """custom_id별 오류를 입력 ID별 오류로 묶습니다."""
+    grouped: Dict[str, str] = {}
+    for custom_id, message in errors.items():
+        input_id, _, stage = custom_id.rpartition(CUSTOM_ID_SEPARATOR)
+        grouped.setdefault(input_id, f"{stage}: {message}")
+    return grouped
@@ -1,94 +1,432 @@
 import re
 import os
 import json
-from typing import Dict, List, Optional, Tuple
-from openai import OpenAI
+import contextvars
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import partial
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
-class PromptEngine:
-    """프롬프트 변환 엔진 클래스
+from src.core.deadline import (DROPPED, OMITTED, SINGLE_CALL, Deadline, DeadlineExceededError, DeadlinePolicy,
+                               current_deadline, deadline_scope, is_timeout_error)
+from src.core.hedging import HedgeAttempt
+from src.core.incremental import (SECTION_SOURCES, FieldRecorder, IncrementalResult, apply_options,
+                                  normalize_options, option_overrides, reusable_sections)
+from src.core.long_input import (CHUNK_STAGE, MAX_REDUCE_ROUNDS, REDUCE_STAGE, LongInputPolicy,
+                                 build_brief_input, group_notes, iter_chunks, join_notes, split_option_lines)
+from src.core.metrics import CallRecord, TransformResult, current_trace, request_trace
+from src.core.response_cache import cache_bypass, is_cache_bypassed, make_cache_key
+from src.core.router import AUTO_ROUTE, REQUIRED_SECTIONS, missing_sections, route_input
+from src.core.schemas import (AnalysisWithFormat, FormatRequirements, InputAnalysis, SchemaValidationError,
+                              build_repair_messages)
+from src.core.sections import SectionStreamParser, parse_sections
+from src.core.single_flight import FlightAbortedError, SingleFlight
+from src.core.stage_graph import Stage, StageCheckpoints, run_stage_graph
+from src.core.templates import INPUT_STAGES, PREFIX_CACHE_SYSTEM_PROMPTS, SECTION_STAGES, TEMPLATES
+from src.core.token_budget import TRUNCATED_FINISH_REASON, TokenBudget
+from src.core.tokens import estimate_message_tokens
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+# 스트리밍 변환에서 최종 프롬프트를 전달하는 마지막 이벤트의 키
+PROMPT_EVENT = "prompt"
+
+# 단일 호출 결과의 섹션 키, 프롬프트 태그, 내용 앞에 붙일 문구 (출력 순서대로)
+SINGLE_CALL_PROMPT_LAYOUT = (
+    ("analysis", "analysis", ""),
+    ("expert_role", "role", "당신은 "),
+    ("instructions", "instructions", ""),
+    ("response_style", "response_style", ""),
+    ("reminders", "reminder", ""),
+    ("output_format", "output_format", ""),
+)
+
+# 최종 프롬프트를 구성하는 섹션 키
+SECTION_KEYS = tuple(key for key, _, _ in SINGLE_CALL_PROMPT_LAYOUT)
+
+# 구조화 출력 모드에서 JSON 스키마로 응답을 받는 단계와 스키마
+STRUCTURED_STAGE_SCHEMAS = {
+    "analysis": InputAnalysis,
+    "format_requirements": FormatRequirements,
+    "combined_analysis": AnalysisWithFormat,
+}
+
+
+class BasePromptEngine(ABC):
+    """프롬프트 변환 엔진의 공통 기반 클래스
     
-    사용자의 간단한 입력을 구조화된 상세 프롬프트로 변환합니다.
+    API 요청 메시지 구성과 응답 파싱, 최종 프롬프트 조립을 담당합니다.
+    실제 API 호출 방식(동기/비동기)은 하위 클래스에서 구현합니다.
     """
     
-    def __init__(self, openai_api_key: Optional[str] = None, model: str = "gpt-4.1-nano", temperature: float = 0.7):
+    def __init__(self, openai_api_key: Optional[str] = None, model: str = "gpt-4.1-nano", temperature: float = 0.7,
+                 max_concurrency: int = 6, cache=None, client=None, structured_output: bool = False,
+                 merge_analysis_calls: bool = False, scheduler=None, instrumentation=None,
+                 prefix_cache_layout: bool = False, semantic_cache=None, coalesce_requests: bool = False,
+                 auto_escalation: bool = True, hedging=None, deadline_policy: Optional[DeadlinePolicy] = None,
+                 token_budget: Optional[TokenBudget] = None, long_input: Optional[LongInputPolicy] = None):
         """초기화 함수
         
         Args:
             openai_api_key: OpenAI API 키 (없으면 환경 변수에서 가져옴)
             model: 사용할 OpenAI 모델
             temperature: 생성 시 사용할 temperature 값
+            max_concurrency: 다중 호출 방식에서 동시에 진행할 최대 API 호출 수 (1이면 순차 실행)
+            cache: API 응답 캐시 (`ResponseCache` 또는 get/set 메서드를 가진 객체, 없으면 캐시 미사용)
+            client: 미리 생성한 OpenAI 클라이언트 (여러 엔진이 연결 풀을 공유할 때 사용)
+            structured_output: True이면 입력 분석과 형식 요구사항 추출을 JSON 스키마
+                               (`response_format`)로 요청하고 응답을 검증합니다.
+            merge_analysis_calls: True이면 다중 호출 방식에서 입력 분석과 형식 요구사항 추출을
+                                  하나의 API 호출로 처리합니다.
+            scheduler: 모든 API 호출에 속도 제한과 재시도 정책을 적용할 `RequestScheduler`
+                       (설정하면 OpenAI SDK 자체의 재시도는 사용하지 않음)
+            instrumentation: API 호출마다 `record(CallRecord)`로 계측 기록을 받을 객체
+                             (예: `MetricsAggregator`)
+            prefix_cache_layout: True이면 모든 단계가 같은 공통 설명과 단계별 고정 지시문으로 시작하고
+                                 요청마다 달라지는 정보는 마지막 사용자 메시지에 두어,
+                                 OpenAI 자동 프롬프트 캐시가 적용되도록 메시지를 구성합니다.
+            semantic_cache: 표현만 조금 다른 입력에 변환 결과를 재사용할 `SemanticCache`
+                            (없으면 사용하지 않음)
+            coalesce_requests: True이면 동시에 들어온 같은 변환 요청과 같은 API 요청을
+                               하나의 실행으로 합치고, 기다리던 호출은 그 결과를 함께 받습니다.
+            auto_escalation: True이면 `use_multi_call="auto"` 변환에서 단일 호출 방식을 고른 입력의
+                             응답에 필수 섹션이 빠져 있을 때 다중 호출 방식으로 다시 변환합니다.
+            hedging: 첫 토큰이 늦은 호출에 중복 요청을 보낼 `HedgePolicy` (없으면 사용하지 않음).
+                     적용하는 단계의 호출은 첫 토큰 시간을 재기 위해 내부적으로 스트리밍으로 요청합니다.
+            deadline_policy: 시간 예산(`deadline`)을 지정한 다중 호출 변환에서 섹션을 생략하거나
+                             단일 호출 결과로 대체하는 `DeadlinePolicy` (없으면 기본 정책)
+            token_budget: 단계별 출력 토큰 예산(`max_tokens`)과 입력 크기 제한을 적용할 `TokenBudget`
+                          (없으면 제한하지 않음)
+            long_input: 기준보다 긴 입력을 부분별 요구사항 추출과 통합으로 요약 브리프로 줄여 변환할
+                        `LongInputPolicy` (없으면 원문을 그대로 사용)
         """
-        # OpenAI 클라이언트 초기화
-        if openai_api_key:
-            self.client = OpenAI(api_key=openai_api_key)
-        else:
-            api_key = os.getenv("OPENAI_API_KEY")
-            if not api_key:
+        self.scheduler = scheduler
+        
+        # OpenAI 클라이언트는 처음 사용할 때 생성 (openai 패키지 임포트 비용을 첫 API 호출로 미룸)
+        self._client = client
+        self._api_key = None
+        self._client_lock = threading.Lock()
+        if client is None:
+            self._api_key = openai_api_key or os.getenv("OPENAI_API_KEY")
+            if not self._api_key:
                 raise ValueError("OpenAI API 키가 제공되지 않았습니다. 환경 변수 OPENAI_API_KEY를 설정하거나 직접 제공해주세요.")
-            self.client = OpenAI(api_key=api_key)
             
         # 모델과 temperature 설정
         self.model = model
         self.temperature = temperature
+        self.max_concurrency = max_concurrency
+        self.cache = cache
+        self.structured_output = structured_output
+        self.merge_analysis_calls = merge_analysis_calls
+        self.instrumentation = instrumentation
+        self.prefix_cache_layout = prefix_cache_layout
+        self.semantic_cache = semantic_cache
+        self.auto_escalation = auto_escalation
+        self.hedging = hedging
+        # 단계별 예상 소요 시간은 시간 예산 없이 호출한 경우에도 기록
+        self.deadline_policy = deadline_policy or DeadlinePolicy()
+        self.token_budget = token_budget
+        self.long_input = long_input
+        # 진행 중인 같은 요청을 합치는 단일 비행 그룹 (`flights.stats()`로 합친 횟수 확인)
+        self.flights = self._create_flights() if coalesce_requests else None
+        # 실패한 다중 호출 변환의 완료된 단계 결과 (다시 실행하면 이어서 진행)
+        self.checkpoints = StageCheckpoints()
     
-    def analyze_input(self, user_input: str) -> Dict:
-        """사용자 입력을 분석하여 핵심 요소와 특정 요구사항을 추출
+    @property
+    def client(self):
+        """OpenAI 클라이언트 (처음 사용할 때 생성)"""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = self._create_client(self._api_key)
+        return self._client
+    
+    @client.setter
+    def client(self, client) -> None:
+        self._client = client
+    
+    @abstractmethod
+    def _create_client(self, api_key: str):
+        """API 키로 OpenAI 클라이언트를 생성합니다."""
+    
+    @abstractmethod
+    def _create_flights(self):
+        """동시 요청을 합칠 단일 비행 그룹을 생성합니다."""
+    
+    def _request_params(self, stage: str) -> Dict[str, Any]:
+        """단계별로 API 요청에 추가할 인자를 반환합니다. (구조화 출력 모드의 `response_format`, 출력 토큰 예산 등)"""
+        params: Dict[str, Any] = {}
+        schema = STRUCTURED_STAGE_SCHEMAS.get(stage) if self.structured_output else None
+        if schema is not None:
+            params["response_format"] = schema.response_format()
+        max_tokens = self.token_budget.completion_limit(stage) if self.token_budget is not None else None
+        if max_tokens is not None:
+            params["max_tokens"] = max_tokens
+        return params
+    
+    def build_stage_messages(self, stage: str, source: Union[str, Dict]) -> List[Dict]:
+        """단계 이름으로 요청 메시지를 구성합니다.
+        
+        실시간 호출과 같은 메시지를 Batch API 등 다른 경로로 보낼 때 사용합니다.
         
         Args:
-            user_input: 사용자가 입력한 간단한 프롬프트
+            stage: 단계 이름 (`INPUT_STAGES` 또는 `SECTION_STAGES` 중 하나)
+            source: 입력 단계이면 사용자 입력, 섹션 생성 단계이면 입력 분석 결과
+                    (출력 형식 단계는 형식 요구사항)
             
-        Returns:
-            Dict: 입력에서 추출한 핵심 요소들과 특정 요구사항
+        Raises:
+            ValueError: 알 수 없는 단계인 경우
         """
-        # OpenAI API를 사용하여 입력 분석
-        response = self.client.chat.completions.create(
-            model=self.model,
-            temperature=self.temperature,
-            messages=[
-                {"role": "system", "content": """당신은 텍스트 분석 전문가입니다. 사용자의 입력을 상세히 분석하여 다음 정보를 JSON 형식으로 추출해주세요:
-
-1. 주제 (topic): 입력의 주요 주제
-2. 분야 (domain): 관련된 전문 분야
-3. 목적 (purpose): 사용자가 원하는 정보 또는 도움의 종류
-4. 핵심어 (keywords): 입력에서 중요한 핵심 단어들 (최대 5개)
-5. 전문성 수준 (expertise_level): 필요한 전문성 수준 (초급, 중급, 고급)
-6. 특정 범위 (scope): 사용자가 언급한 특정 범위, 시간적/공간적 제약 (없으면 "광범위")
-7. 특정 검색어 (search_terms): 사용자가 명시적으로 검색하거나 강조한 용어들 (없으면 빈 배열)
-8. 원하는 출력 형식 (output_format): 사용자가 요청한 특정 출력 형식이나 구조 (예: "목록", "단계별 가이드", "비교 분석" 등)
-9. 특별 요구사항 (special_requirements): 기타 사용자가 언급한 특별 요구사항들
-
-입력을 세밀하게
-"""
-                },
-                {"role": "user", "content": user_input}
-            ]
-        )
+        if stage not in INPUT_STAGES + SECTION_STAGES:
+            raise ValueError(f"알 수 없는 단계입니다: {stage}")
+        return getattr(self, f"_build_{stage}_messages")(source)
+    
+    def build_request(self, stage: str, messages: List[Dict]) -> Dict[str, Any]:
+        """실시간 호출과 같은 인자로 채팅 완성 API 요청 본문을 구성합니다.
         
-        # JSON 응답 파싱
-        try:
-            analysis = response.choices[0].message.content
-            # 문자열에서 JSON 부분만 추출
-            json_match = re.search(r'{.*}', analysis, re.DOTALL)
-            if json_match:
-                import json
-                return json.loads(json_match.group(0))
-            else:
-                # JSON이 감지되지 않으면 원본 응답을 반환
-                return {"raw_analysis": analysis}
-        except Exception as e:
-            print(f"분석 응답 처리 오류: {e}")
-            return {"error": str(e), "raw_analysis": response.choices[0].message.content}
-
-    def generate_expert_role(self, user_input: str, analysis: Dict) -> str:
-        """분석 결과를 바탕으로 전문가 역할 생성
+        모델, temperature와 단계별 인자(구조화 출력 모드의 `response_format`, 출력 토큰 예산)를 포함합니다.
+        """
+        return {
+            "model": self.model,
+            "temperature": self.temperature,
+            "messages": messages,
+            **self._request_params(stage),
+        }
+    
+    def _fit_input(self, user_input: str) -> str:
+        """사용자 입력을 입력 토큰 한도에 맞춥니다. (`TokenBudget.fit_input` 참고)
+        
+        Raises:
+            InputTooLargeError: 입력이 한도를 넘고 처리 방식이 거절인 경우
+        """
+        if self.token_budget is None:
+            return user_input
+        return self.token_budget.fit_input(user_input, self.model)[0]
+    
+    def _effective_budgets(self, user_input: str, calls: List[CallRecord]) -> Dict[str, Any]:
+        """변환 결과에 보고할 실제 적용된 토큰 예산을 계산합니다. (예산을 사용하지 않으면 빈 딕셔너리)"""
+        if self.token_budget is None:
+            return {}
+        return self.token_budget.describe(user_input, (call.stage for call in calls), self.model,
+                                          truncated=(call.stage for call in calls if call.truncated))
+    
+    @staticmethod
+    def _timeout_params() -> Dict[str, Any]:
+        """시간 예산이 있으면 남은 시간을 API 요청의 `timeout` 인자로 반환합니다.
+        
+        Raises:
+            DeadlineExceededError: 마감 시간이 이미 지난 경우
+        """
+        deadline = current_deadline()
+        if deadline is None:
+            return {}
+        return {"timeout": deadline.request_timeout()}
+    
+    def _api_client(self):
+        """API 요청을 보낼 클라이언트를 반환합니다.
+        
+        시간 예산이 있으면 SDK의 자동 재시도를 끈 클라이언트를 사용합니다. SDK는 요청 시간 초과도
+        다시 시도하므로, 남은 시간을 `timeout`으로 넘겨도 재시도 때문에 마감 시간을 넘길 수 있습니다.
+        """
+        if current_deadline() is None:
+            return self.client
+        return self.client.with_options(max_retries=0)
+    
+    def _cache_key(self, messages: List[Dict], **params: Any) -> Optional[str]:
+        """현재 모델 설정과 메시지, 추가 요청 인자로 캐시 키를 계산합니다. (캐시 미사용 시 None)"""
+        if self.cache is None:
+            return None
+        return make_cache_key(self.model, self.temperature, messages, **params)
+    
+    def _flight_key(self, messages: List[Dict], **params: Any) -> Optional[str]:
+        """같은 API 요청을 합칠 키를 계산합니다. (요청 합치기 미사용 또는 캐시 우회 중이면 None)"""
+        if self.flights is None or is_cache_bypassed():
+            return None
+        return make_cache_key(self.model, self.temperature, messages, **params)
+    
+    def _transform_flight_key(self, user_input: str,
+                              use_multi_call: Union[bool, str]) -> Optional[Tuple[str, str, str]]:
+        """같은 변환 요청을 합칠 키를 계산합니다. (요청 합치기 미사용 또는 캐시 우회 중이면 None)"""
+        # 시간 예산이 있는 변환은 섹션이 생략될 수 있으므로 다른 요청과 합치지 않음
+        if self.flights is None or is_cache_bypassed() or current_deadline() is not None:
+            return None
+        return ("transform", self._semantic_scope(use_multi_call), user_input)
+    
+    @staticmethod
+    def _transform_stage(use_multi_call: Union[bool, str]) -> str:
+        """변환 방식별로 합쳐진 요청의 계측 기록에 남길 단계 이름을 반환합니다."""
+        if use_multi_call == AUTO_ROUTE:
+            return "auto_call"
+        return "multi_call" if use_multi_call else "single_call"
+    
+    def _record_call(self, stage: str, started: float, ttft: Optional[float] = None, usage=None,
+                     cache_hit: bool = False, coalesced: bool = False, retries: int = 0, streamed: bool = False,
+                     error: Optional[BaseException] = None, model: Optional[str] = None,
+                     hedged: bool = False, hedge_won: bool = False, truncated: bool = False) -> None:
+        """API 호출 한 번의 계측 기록을 현재 요청의 추적 목록과 계측 훅에 전달합니다.
         
         Args:
-            user_input: 사용자가 입력한 간단한 프롬프트
-            analysis: 입력 분석 결과
-            
-        Returns:
-            str: 생성된 전문가 역할 설명
+            stage: 호출한 단계 이름
+            started: 호출 시작 시각 (`time.perf_counter()`)
+            ttft: 첫 토큰까지 걸린 시간(초)
+            usage: 응답의 `usage` 객체
+            cache_hit: 캐시에서 가져온 응답인지 여부
+            coalesced: 진행 중이던 같은 요청의 응답을 함께 받았는지 여부
+            retries: 스케줄러가 다시 시도한 횟수
+            streamed: 스트리밍 호출 여부
+            error: 호출이 실패한 경우의 예외
+            model: 응답한 모델 (없으면 엔진의 모델)
+            hedged: 중복 요청을 보냈는지 여부
+            hedge_won: 중복 요청의 응답을 사용했는지 여부
+            truncated: 출력 토큰 한도에 도달해 응답이 잘렸는지 여부
         """
+        if not (cache_hit or coalesced or error is not None):
+            self.deadline_policy.observe(stage, time.perf_counter() - started)
+        trace = current_trace()
+        if trace is None and self.instrumentation is None:
+            return
+        record = CallRecord(
+            stage=stage,
+            model=model or self.model,
+            wall_time=time.perf_counter() - started,
+            ttft=ttft,
+            prompt_tokens=getattr(usage, "prompt_tokens", None) or 0,
+            completion_tokens=getattr(usage, "completion_tokens", None) or 0,
+            cached_tokens=getattr(getattr(usage, "prompt_tokens_details", None), "cached_tokens", None) or 0,
+            cache_hit=cache_hit,
+            coalesced=coalesced,
+            hedged=hedged,
+            hedge_won=hedge_won,
+            retries=retries,
+            streamed=streamed,
+            truncated=truncated,
+            error=str(error) if error is not None else None,
+        )
+        if trace is not None:
+            trace.append(record)
+        if self.instrumentation is not None:
+            self.instrumentation.record(record)
+    
+    def _finish_hedged(self, stage: str, started: float, cache_key: Optional[str], attempts: List[HedgeAttempt],
+                       winner: Optional[HedgeAttempt], content: Optional[str],
+                       error: Optional[BaseException]) -> str:
+        """헤징한 호출의 결과를 정책과 계측 기록에 반영하고, 사용한 응답을 캐시에 저장합니다. (잘린 응답은 제외)"""
+        primary = attempts[0]
+        hedged = len(attempts) > 1
+        self.hedging.observe(stage, self.model,
+                             primary.ttft if primary.ttft is not None else time.perf_counter() - started)
+        if winner is None:
+            self._record_call(stage, started, retries=sum(len(a.retries) for a in attempts), streamed=True,
+                              error=error, hedged=hedged)
+            raise error
+        if winner.hedge:
+            self.hedging.record_win()
+        if not winner.truncated:
+            self._cache_store(cache_key, content)
+        self._record_call(stage, started, ttft=winner.ttft, usage=winner.usage, retries=len(winner.retries),
+                          streamed=True, model=winner.model, hedged=hedged, hedge_won=winner.hedge,
+                          truncated=winner.truncated)
+        return content
+    
+    def _checkpoint_key(self, user_input: str) -> str:
+        """다중 호출 변환의 중간 결과를 보관할 키를 계산합니다."""
+        return make_cache_key(
+            self.model,
+            self.temperature,
+            [{"role": "user", "content": user_input}],
+            structured_output=self.structured_output,
+            merge_analysis_calls=self.merge_analysis_calls,
+            prefix_cache_layout=self.prefix_cache_layout,
+        )
+    
+    def _semantic_scope(self, use_multi_call: Union[bool, str]) -> str:
+        """의미 캐시에서 변환 결과를 공유할 수 있는 범위(모델과 변환 설정)를 계산합니다."""
+        return make_cache_key(
+            self.model,
+            self.temperature,
+            [],
+            use_multi_call=use_multi_call,
+            structured_output=self.structured_output,
+            merge_analysis_calls=self.merge_analysis_calls,
+            prefix_cache_layout=self.prefix_cache_layout,
+        )
+    
+    def _semantic_lookup(self, user_input: str, use_multi_call: Union[bool, str]) -> Optional[str]:
+        """의미 캐시에서 비슷한 입력의 변환 결과를 조회합니다. 캐시 우회 중이면 조회하지 않습니다."""
+        if self.semantic_cache is None or is_cache_bypassed():
+            return None
+        started = time.perf_counter()
+        prompt = self.semantic_cache.lookup(user_input, scope=self._semantic_scope(use_multi_call))
+        if prompt is not None:
+            self._record_call("semantic_cache", started, cache_hit=True)
+        return prompt
+    
+    def _semantic_store(self, user_input: str, use_multi_call: Union[bool, str], prompt: str) -> None:
+        """변환 결과를 의미 캐시에 저장합니다. (시간 예산 때문에 섹션을 생략한 결과는 저장하지 않음)"""
+        deadline = current_deadline()
+        if deadline is not None and deadline.degraded:
+            return
+        if self.semantic_cache is not None:
+            self.semantic_cache.store(user_input, prompt, scope=self._semantic_scope(use_multi_call))
+    
+    def _cache_lookup(self, key: Optional[str]) -> Optional[str]:
+        """캐시에서 응답을 조회합니다. 캐시 우회 중이면 조회하지 않습니다."""
+        if key is None or is_cache_bypassed():
+            return None
+        return self.cache.get(key)
+    
+    def _cache_store(self, key: Optional[str], content: Optional[str],
+                     validate: Optional[Callable[[str], Any]] = None) -> None:
+        """새로 받은 응답을 캐시에 저장합니다. (`validate`가 있으면 검증을 통과한 응답만 저장)"""
+        if key is None or content is None:
+            return
+        if validate is not None:
+            try:
+                validate(content)
+            except SchemaValidationError:
+                return
+        self.cache.set(key, content)
+    
+    def _input_stage_messages(self, stage: str, user_input: str) -> List[Dict]:
+        """사용자 입력을 그대로 전달하는 단계(분석, 형식 요구사항 추출, 단일 호출)의 메시지를 구성합니다.
+        
+        입력 토큰 한도가 있으면 입력을 한도에 맞춰 전달합니다.
+        """
+        user_input = self._fit_input(user_input)
+        if self.prefix_cache_layout:
+            system_prompt = PREFIX_CACHE_SYSTEM_PROMPTS[stage]
+        else:
+            system_prompt = TEMPLATES[f"{stage}_system"].text
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_input}
+        ]
+    
+    def _section_stage_messages(self, stage: str, **fields: str) -> List[Dict]:
+        """분석 결과로 섹션을 생성하는 단계의 메시지를 구성합니다.
+        
+        접두어 캐시 레이아웃에서는 고정 지시문을 시스템 메시지에 두고,
+        사용자 메시지에는 주제 정보만 전달합니다.
+        """
+        if self.prefix_cache_layout:
+            return [
+                {"role": "system", "content": PREFIX_CACHE_SYSTEM_PROMPTS[stage]},
+                {"role": "user", "content": TEMPLATES[f"{stage}_fields"].format(**fields)}
+            ]
+        return [
+            {"role": "system", "content": TEMPLATES[f"{stage}_system"].text},
+            {"role": "user", "content": TEMPLATES[stage].format(**fields)}
+        ]
+    
+    def _build_analysis_messages(self, user_input: str) -> List[Dict]:
+        """입력 분석 요청 메시지를 구성합니다."""
+        return self._input_stage_messages("analysis", user_input)
+    
+    def _build_expert_role_messages(self, analysis: Dict) -> List[Dict]:
+        """전문가 역할 생성 요청 메시지를 구성합니다."""
         # 특정 검색어나 범위가 있으면 포함
         special_focus = ""
         if analysis.get('scope') and analysis.get('scope') != "광범위":
@@ -97,40 +435,17 @@ class PromptEngine:
         if analysis.get('search_terms') and len(analysis.get('search_terms', [])) > 0:
             special_focus += f"\n특정 검색어: {', '.join(analysis.get('search_terms'))}"
         
-        # OpenAI API를 사용하여 전문가 역할 생성
-        role_prompt = f"""
-        다음 주제에 관한 최고 수준의 전문가 역할을 상세하게 설명해주세요:
-        
-        주제: {analysis.get('topic', '일반 주제')}
-        분야: {analysis.get('domain', '다양한 분야')}
-        필요 전문성: {analysis.get('expertise_level', '고급')}{special_focus}
-        
-        이 역할에는 관련 경험, 자격, 전문 지식, 접근 방식 등이 포함되어야 합니다.
-        전문가의 배경, 경력, 성과 등을 구체적으로 설명하세요.
-        1-2단락 정도의 상세한 설명으로 작성해주세요.
-        """
-        
-        response = self.client.chat.completions.create(
-            model=self.model,
-            temperature=self.temperature,
-            messages=[
-                {"role": "system", "content": "당신은 전문 분야별 역할 정의를 작성하는 전문가입니다."},
-                {"role": "user", "content": role_prompt}
-            ]
+        # 전문가 역할 생성 요청 프롬프트
+        return self._section_stage_messages(
+            "expert_role",
+            topic=analysis.get('topic', '일반 주제'),
+            domain=analysis.get('domain', '다양한 분야'),
+            expertise_level=analysis.get('expertise_level', '고급'),
+            special_focus=special_focus,
         )
-        
-        return response.choices[0].message.content
     
-    def generate_instructions(self, user_input: str, analysis: Dict) -> str:
-        """분석 결과를 바탕으로 상세 지시사항 생성
-        
-        Args:
-            user_input: 사용자가 입력한 간단한 프롬프트
-            analysis: 입력 분석 결과
-            
-        Returns:
-            str: 생성된 지시사항
-        """
+    def _build_instructions_messages(self, analysis: Dict) -> List[Dict]:
+        """지시사항 생성 요청 메시지를 구성합니다."""
         # 특정 요구사항이나 형식 포함
         special_requirements = ""
         
@@ -143,174 +458,797 @@ class PromptEngine:
         if analysis.get('scope') and analysis.get('scope') != "광범위":
             special_requirements += f"\n분석 범위: {analysis.get('scope')}"
         
-        # OpenAI API를 사용하여 지시사항 생성
-        instructions_prompt = f"""
-        다음 주제에 관한 상세하고 체계적인 지시사항을 작성해주세요:
+        # 지시사항 생성 요청 프롬프트
+        return self._section_stage_messages(
+            "instructions",
+            topic=analysis.get('topic', '일반 주제'),
+            domain=analysis.get('domain', '다양한 분야'),
+            purpose=analysis.get('purpose', '정보 제공'),
+            keywords=', '.join(analysis.get('keywords', ['관련 키워드'])),
+            special_requirements=special_requirements,
+        )
+    
+    def _build_response_style_messages(self, analysis: Dict) -> List[Dict]:
+        """응답 스타일 생성 요청 메시지를 구성합니다."""
+        # 원하는 출력 형식이 있으면 포함
+        format_requirements = ""
+        if analysis.get('output_format'):
+            format_requirements = f"\n원하는 출력 형식: {analysis.get('output_format')}"
+        
+        # 응답 스타일 생성 요청 프롬프트
+        return self._section_stage_messages(
+            "response_style",
+            topic=analysis.get('topic', '일반 주제'),
+            domain=analysis.get('domain', '다양한 분야'),
+            expertise_level=analysis.get('expertise_level', '고급'),
+            format_requirements=format_requirements,
+        )
+    
+    def _build_reminders_messages(self, analysis: Dict) -> List[Dict]:
+        """주요 고려사항 생성 요청 메시지를 구성합니다."""
+        # 특정 요구사항이나 범위 포함
+        special_considerations = ""
+        if analysis.get('special_requirements'):
+            special_considerations += f"\n특별 요구사항: {analysis.get('special_requirements')}"
+            
+        if analysis.get('scope') and analysis.get('scope') != "광범위":
+            special_considerations += f"\n분석 범위: {analysis.get('scope')}"
+            
+        if analysis.get('search_terms') and len(analysis.get('search_terms', [])) > 0:
+            special_considerations += f"\n중점적으로 다룰 검색어: {', '.join(analysis.get('search_terms'))}"
+        
+        # 주요 고려사항 생성 요청 프롬프트
+        return self._section_stage_messages(
+            "reminders",
+            topic=analysis.get('topic', '일반 주제'),
+            domain=analysis.get('domain', '다양한 분야'),
+            purpose=analysis.get('purpose', '정보 제공'),
+            special_considerations=special_considerations,
+        )
+    
+    def _build_output_format_messages(self, analysis: Dict) -> List[Dict]:
+        """출력 형식 생성 요청 메시지를 구성합니다."""
+        # 원하는 출력 형식이 있으면 포함
+        format_guidance = ""
+        if analysis.get('output_format'):
+            format_guidance = f"\n원하는 출력 형식: {analysis.get('output_format')}"
+            
+        # 특정 검색어나 범위가 있으면 포함
+        if analysis.get('scope') and analysis.get('scope') != "광범위":
+            format_guidance += f"\n분석 범위: {analysis.get('scope')}"
+            
+        if analysis.get('search_terms') and len(analysis.get('search_terms', [])) > 0:
+            format_guidance += f"\n중점적으로 다룰 검색어: {', '.join(analysis.get('search_terms'))}"
         
-        주제: {analysis.get('topic', '일반 주제')}
-        분야: {analysis.get('domain', '다양한 분야')}
-        목적: {analysis.get('purpose', '정보 제공')}
-        핵심어: {', '.join(analysis.get('keywords', ['관련 키워드']))}{special_requirements}
+        # 출력 형식 생성 요청 프롬프트
+        return self._section_stage_messages(
+            "output_format",
+            topic=analysis.get('topic', '일반 주제'),
+            domain=analysis.get('domain', '다양한 분야'),
+            purpose=analysis.get('purpose', '정보 제공'),
+            format_guidance=format_guidance,
+        )
+    
+    def _build_format_requirements_messages(self, user_input: str) -> List[Dict]:
+        """형식 요구사항 추출 요청 메시지를 구성합니다."""
+        return self._input_stage_messages("format_requirements", user_input)
+    
+    def _build_combined_analysis_messages(self, user_input: str) -> List[Dict]:
+        """입력 분석과 형식 요구사항 추출을 함께 요청하는 메시지를 구성합니다."""
+        return self._input_stage_messages("combined_analysis", user_input)
+    
+    def _build_single_call_messages(self, user_input: str) -> List[Dict]:
+        """단일 호출 방식의 요청 메시지를 구성합니다."""
+        return self._input_stage_messages("single_call", user_input)
+    
+    def _parse_analysis(self, content: str) -> Dict:
+        """입력 분석 응답에서 JSON 분석 결과를 추출합니다."""
+        try:
+            # 문자열에서 JSON 부분만 추출
+            json_match = re.search(r'{.*}', content, re.DOTALL)
+            if json_match:
+                return json.loads(json_match.group(0))
+            else:
+                # JSON이 감지되지 않으면 원본 응답을 반환
+                return {"raw_analysis": content}
+        except Exception as e:
+            print(f"분석 응답 처리 오류: {e}")
+            return {"error": str(e), "raw_analysis": content}
+    
+    def _parse_format_requirements(self, content: str) -> Dict:
+        """형식 요구사항 추출 응답에서 JSON 결과를 추출합니다."""
+        try:
+            json_match = re.search(r'{.*}', content, re.DOTALL)
+            if json_match:
+                return json.loads(json_match.group(0))
+            else:
+                return {}
+        except Exception as e:
+            print(f"형식 요구사항 추출 오류: {e}")
+            return {}
+    
+    def _parse_structured(self, stage: str, content: str) -> Dict:
+        """JSON 스키마 응답을 검증하고 기존 반환 형식의 딕셔너리로 변환합니다.
         
-        최소 5-7개의 주요 지시사항을 작성하고, 각 항목마다 2-3개의 하위 지시사항을 포함해주세요.
-        지시사항은 다음 형식을 따라야 합니다:
+        Raises:
+            SchemaValidationError: 응답이 스키마를 만족하지 않는 경우
+        """
+        return STRUCTURED_STAGE_SCHEMAS[stage].parse(content).to_dict()
+    
+    def parse_stage_output(self, stage: str, content: str) -> Dict:
+        """입력 분석 또는 형식 요구사항 추출 응답을 현재 모드에 맞게 파싱합니다.
         
-        1. [첫 번째 주요 지시사항]:
-           - [하위 지시사항 1]
-           - [하위 지시사항 2]
-        2. [두 번째 주요 지시사항]:
-           - [하위 지시사항 1]
-           - [하위 지시사항 2]
-           - [하위 지시사항 3]
+        Raises:
+            SchemaValidationError: 구조화 출력 모드에서 응답이 스키마를 만족하지 않는 경우
+        """
+        if self.structured_output:
+            return self._parse_structured(stage, content)
+        if stage in ("analysis", "combined_analysis"):
+            return self._parse_analysis(content)
+        return self._parse_format_requirements(content)
+    
+    def split_combined_analysis(self, data: Dict) -> Tuple[Dict, Dict]:
+        """통합 분석 결과를 (입력 분석, 형식 요구사항)으로 나눕니다.
         
-        각 지시사항은 논리적 순서로 배치하고, 포괄적이면서도 구체적이어야 합니다.
-        특히 사용자가 언급한 특정 검색어나 요구사항에 집중하세요.
+        각각 `analyze_input`, `extract_format_requirements`와 같은 형식으로 반환합니다.
         """
+        analysis = dict(data)
+        format_requirements = analysis.pop("format_requirements", None)
+        if not isinstance(format_requirements, dict):
+            format_requirements = {}
+        return analysis, format_requirements
+    
+    def _build_multi_call_stages(self, user_input: str) -> List[Stage]:
+        """다중 호출 방식의 단계 목록과 의존 관계를 정의합니다.
         
-        response = self.client.chat.completions.create(
-            model=self.model,
-            temperature=self.temperature,
-            messages=[
-                {"role": "system", "content": "당신은 체계적이고 전문적인 지시사항을 작성하는 전문가입니다."},
-                {"role": "user", "content": instructions_prompt}
+        각 단계 함수는 하위 클래스의 `analyze_input`, `generate_*` 메서드를 호출하므로
+        동기 엔진에서는 결과를, 비동기 엔진에서는 코루틴을 반환합니다.
+        """
+        # 섹션 생성 단계와 의존 관계 정의
+        # - 분석과 형식 요구사항 추출은 서로 독립적이므로 동시에 실행
+        #   (merge_analysis_calls이면 한 번의 호출 결과를 나누어 사용)
+        # - 역할/지시사항/응답 스타일/고려사항은 분석 결과만 필요
+        # - 출력 형식은 형식 요구사항 추출 결과만 필요
+        if self.merge_analysis_calls:
+            analysis_stages = [
+                Stage("combined_analysis", lambda r: self.analyze_input_with_format(user_input)),
+                Stage("analysis", lambda r: r["combined_analysis"][0], ("combined_analysis",)),
+                Stage("format_requirements", lambda r: r["combined_analysis"][1], ("combined_analysis",)),
             ]
-        )
+        else:
+            analysis_stages = [
+                Stage("analysis", lambda r: self.analyze_input(user_input)),
+                Stage("format_requirements", lambda r: self.extract_format_requirements(user_input)),
+            ]
+        return analysis_stages + [
+            Stage("expert_role", lambda r: self.generate_expert_role(user_input, r["analysis"]), ("analysis",)),
+            Stage("instructions", lambda r: self.generate_instructions(user_input, r["analysis"]), ("analysis",)),
+            Stage("response_style", lambda r: self.generate_response_style(user_input, r["analysis"]), ("analysis",)),
+            Stage("reminders", lambda r: self.generate_reminders(user_input, r["analysis"]), ("analysis",)),
+            # 출력 형식 생성 (형식 요구사항이 있는 경우)
+            Stage(
+                "output_format",
+                lambda r: self.generate_output_format(r["format_requirements"]) if r["format_requirements"] else "",
+                ("format_requirements",),
+            ),
+        ]
+    
+    def _long_input_messages(self, stage: str, content: str) -> List[Dict]:
+        """긴 입력의 부분별 요구사항 추출 또는 통합 요청 메시지를 구성합니다.
         
-        return response.choices[0].message.content
+        접두어 캐시 레이아웃과 관계없이 짧은 전용 시스템 메시지를 사용합니다.
+        """
+        return [
+            {"role": "system", "content": TEMPLATES[f"{stage}_system"].text},
+            {"role": "user", "content": content}
+        ]
     
-    def generate_response_style(self, user_input: str, analysis: Dict) -> str:
-        """분석 결과를 바탕으로 응답 스타일 가이드라인 생성
+    def _long_input_concurrency(self) -> int:
+        """긴 입력의 요구사항 추출을 동시에 진행할 최대 호출 수"""
+        return max(1, self.long_input.max_concurrency or self.max_concurrency)
+    
+    def _reduce_groups(self, notes: List[str], rounds: int) -> List[List[str]]:
+        """다음 통합 단계에서 한 번의 호출로 합칠 추출 결과 묶음을 계산합니다."""
+        groups = group_notes(notes, self.long_input.chunk_tokens, self.model)
+        if len(groups) == len(notes) or rounds >= MAX_REDUCE_ROUNDS:
+            # 더 묶을 수 없으면(추출 결과가 한도에 가까우면) 한 번에 통합
+            return [notes]
+        return groups
+    
+    def section_dependencies(self, analysis: Dict, format_requirements: Dict) -> Dict[str, Tuple[Tuple[str, str], ...]]:
+        """섹션 생성 단계별로 메시지를 구성할 때 읽는 분석 결과 필드를 기록합니다. (API를 호출하지 않음)
         
         Args:
-            user_input: 사용자가 입력한 간단한 프롬프트
             analysis: 입력 분석 결과
+            format_requirements: 형식 요구사항 추출 결과
             
         Returns:
-            str: 생성된 응답 스타일 가이드라인
+            Dict[str, Tuple[Tuple[str, str], ...]]: 섹션 키별 (결과 이름, 필드) 목록
         """
-        # 원하는 출력 형식이 있으면 포함
-        format_requirements = ""
-        if analysis.get('output_format'):
-            format_requirements = f"\n원하는 출력 형식: {analysis.get('output_format')}"
+        sources = {"analysis": analysis, "format_requirements": format_requirements}
+        builders = {
+            "expert_role": self._build_expert_role_messages,
+            "instructions": self._build_instructions_messages,
+            "response_style": self._build_response_style_messages,
+            "reminders": self._build_reminders_messages,
+            "output_format": self._build_output_format_messages,
+        }
+        dependencies = {}
+        for section, build in builders.items():
+            source = SECTION_SOURCES.get(section, "analysis")
+            recorder = FieldRecorder(sources[source])
+            build(recorder)
+            dependencies[section] = tuple((source, key) for key in recorder.fields)
+        return dependencies
+    
+    def _regeneration_scope(self) -> str:
+        """이전 변환 결과의 섹션을 재사용할 수 있는 범위(모델과 메시지 구성 방식)를 계산합니다."""
+        return make_cache_key(
+            self.model,
+            self.temperature,
+            [],
+            structured_output=self.structured_output,
+            merge_analysis_calls=self.merge_analysis_calls,
+            prefix_cache_layout=self.prefix_cache_layout,
+        )
+    
+    def _regeneration_sources(self, user_input: str, options: Dict[str, str],
+                              previous: Optional[IncrementalResult]) -> Optional[Dict[str, Dict]]:
+        """입력 분석을 다시 실행하지 않고 이전 분석 결과에 옵션 변경분만 반영할 수 있으면 그 결과를 반환합니다."""
+        if previous is None or previous.scope != self._regeneration_scope() or previous.user_input != user_input:
+            return None
+        return option_overrides(previous, options)
+    
+    def _analysis_results(self, sources: Dict[str, Dict]) -> Dict[str, Any]:
+        """분석 결과를 다중 호출 단계 실행 결과의 형태로 바꿉니다. (분석 단계를 다시 실행하지 않도록 미리 채움)"""
+        results = {"analysis": sources["analysis"], "format_requirements": sources["format_requirements"]}
+        if self.merge_analysis_calls:
+            results["combined_analysis"] = (sources["analysis"], sources["format_requirements"])
+        return results
+    
+    def _reuse_sections(self, previous: Optional[IncrementalResult], results: Dict[str, Any]) -> None:
+        """읽는 필드가 바뀌지 않은 섹션은 이전 결과를 단계 실행 결과에 미리 채웁니다."""
+        if previous is None or previous.scope != self._regeneration_scope():
+            return
+        results.update(reusable_sections(previous, {
+            "analysis": results["analysis"],
+            "format_requirements": results["format_requirements"],
+        }))
+    
+    def _incremental_result(self, user_input: str, options: Dict[str, str], results: Dict[str, Any],
+                            prefilled: List[str]) -> IncrementalResult:
+        """단계 실행 결과로 다음 재변환에 사용할 결과를 만듭니다."""
+        analysis, format_requirements = results["analysis"], results["format_requirements"]
+        return IncrementalResult(
+            prompt=self.assemble_multi_call_prompt(results),
+            user_input=user_input,
+            options=options,
+            analysis=analysis,
+            format_requirements=format_requirements,
+            sections={key: results[key] for key in SECTION_STAGES},
+            dependencies=self.section_dependencies(analysis, format_requirements),
+            regenerated=[name for name in results if name not in prefilled],
+            scope=self._regeneration_scope(),
+        )
+    
+    def assemble_single_call_prompt(self, sections: Dict[str, Optional[str]]) -> str:
+        """단일 호출로 추출한 섹션들을 최종 프롬프트로 조립합니다.
+        
+        스트리밍 중에는 지금까지 받은 섹션만으로 부분 프롬프트를 만들 때도 사용합니다.
+        """
+        parts = ["<prompt>\n"]
+        
+        # 필수 섹션 추가 후 선택적 섹션(출력 형식) 추가
+        for key, tag, prefix in SINGLE_CALL_PROMPT_LAYOUT:
+            if sections.get(key):
+                parts.append(f"<{tag}>\n{prefix}{sections[key]}\n</{tag}>\n\n")
         
-        # OpenAI API를 사용하여 응답 스타일 생성
-        style_prompt = f"""
-        다음 주제에 관한 전문적인 응답 스타일 가이드라인을 작성해주세요:
+        parts.append("</prompt>")
         
-        주제: {analysis.get('topic', '일반 주제')}
-        분야: {analysis.get('domain', '다양한 분야')}
-        전문성 수준: {analysis.get('expertise_level', '고급')}{format_requirements}
+        return "".join(parts).strip()
+    
+    def assemble_multi_call_prompt(self, sections: Dict[str, Any]) -> str:
+        """다중 호출로 생성한 섹션들을 최종 프롬프트로 조립합니다.
         
-        응답의 톤, 접근 방식, 전문성 수준, 용어 사용, 구성 방식 등에 대한 구체적인 지침을 포함해주세요.
-        한 단락 정도의 구체적인 설명으로 작성해주세요.
-        사용자가 요청한 특정 출력 형식이 있다면 이를 반영하세요.
+        시간 예산 때문에 생성하지 못한 섹션(None)은 제외합니다.
         """
+        blocks = []
+        for key, tag, _ in SINGLE_CALL_PROMPT_LAYOUT:
+            content = sections.get(key)
+            # 출력 형식은 형식 요구사항이 있는 경우에만 추가
+            if content is None or (key == "output_format" and not content):
+                continue
+            blocks.append(f"<{tag}>\n{content}\n</{tag}>")
+        return "<prompt>\n\n" + "\n\n".join(blocks) + "\n</prompt>"
+    
+    def _needs_fallback(self, stages: List[Stage], deadline: Deadline) -> bool:
+        """남은 예산이 다중 호출의 예상 소요 시간보다 적어 단일 호출 요청을 함께 보내야 하는지 확인합니다."""
+        policy = self.deadline_policy
+        return policy.single_call_fallback and \
+            deadline.remaining() < policy.critical_path(stages) * policy.safety_factor
+    
+    def _guard_stages(self, stages: List[Stage], deadline: Deadline, reasons: Dict[str, str]) -> List[Stage]:
+        """시간 예산 안에서 실행할 수 있도록 각 단계를 감쌉니다.
         
-        response = self.client.chat.completions.create(
-            model=self.model,
-            temperature=self.temperature,
-            messages=[
-                {"role": "system", "content": "당신은 전문적인 커뮤니케이션 스타일 가이드를 작성하는 전문가입니다."},
-                {"role": "user", "content": style_prompt}
-            ]
-        )
+        감싼 단계는 시작하지 않거나 마감 시간까지 끝나지 않으면 예외 대신 None을 반환하고,
+        `reasons`에 원인을 기록합니다.
+        """
+        optional = self.deadline_policy.optional_stages(stages)
+        return [self._guard_stage(stage, deadline, optional.get(stage.name), reasons) for stage in stages]
+    
+    @abstractmethod
+    def _guard_stage(self, stage: Stage, deadline: Deadline, needed: Optional[float],
+                     reasons: Dict[str, str]) -> Stage:
+        """단계 하나를 시간 예산 안에서 실행하도록 감쌉니다.
         
-        return response.choices[0].message.content
+        Args:
+            stage: 감쌀 단계
+            deadline: 요청의 마감 시간
+            needed: 생략할 수 있는 단계이면 선택 섹션까지 만드는 데 필요한 예상 시간(초), 아니면 None
+            reasons: 생성하지 못한 단계의 원인을 기록할 딕셔너리
+        """
     
-    def generate_reminders(self, user_input: str, analysis: Dict) -> str:
-        """분석 결과를 바탕으로 주요 고려사항 생성
+    def _skip_reason(self, stage: Stage, results: Dict[str, Any], deadline: Deadline, needed: Optional[float],
+                     reasons: Dict[str, str]) -> Optional[str]:
+        """단계를 시작하지 않을 이유를 반환합니다. (시작해도 되면 None)"""
+        for dep in stage.depends_on:
+            if results.get(dep) is None:
+                # 결과에 나타나지 않는 중간 단계(형식 요구사항 추출 등)의 원인은 그대로 전달
+                return "dependency" if dep in SECTION_KEYS else reasons.get(dep, "dependency")
+        if deadline.expired() or (needed is not None and not self.deadline_policy.fits(needed, deadline.remaining())):
+            return "budget"
+        return None
+    
+    @staticmethod
+    def _completed_results(results: Dict[str, Any]) -> Dict[str, Any]:
+        """단계별 실행 결과에서 생략하지 않고 완료한 단계의 결과만 골라냅니다."""
+        return {name: value for name, value in results.items() if value is not None}
+    
+    def _degrade_sections(self, user_input: str, results: Dict[str, Any], reasons: Dict[str, str],
+                          deadline: Deadline, fallback: Optional[str]) -> Dict[str, Any]:
+        """생성하지 못한 섹션을 정책에 따라 생략하거나 단일 호출 응답으로 대체합니다.
+        
+        단일 호출 응답은 함께 보낸 요청의 결과를 사용하고, 없으면 응답 캐시에서 찾습니다.
         
         Args:
             user_input: 사용자가 입력한 간단한 프롬프트
-            analysis: 입력 분석 결과
+            results: 단계별 실행 결과 (생성하지 못한 단계는 None)
+            reasons: 단계별로 생성하지 못한 원인
+            deadline: 처리 내역을 기록할 마감 시간
+            fallback: 단일 호출 응답 텍스트
             
         Returns:
-            str: 생성된 주요 고려사항
-        """
-        # 특정 요구사항이나 범위 포함
-        special_considerations = ""
-        if analysis.get('special_requirements'):
-            special_considerations += f"\n특별 요구사항: {analysis.get('special_requirements')}"
+            Dict[str, Any]: 최종 프롬프트를 조립할 섹션 (제외할 섹션은 None)
             
-        if analysis.get('scope') and analysis.get('scope') != "광범위":
-            special_considerations += f"\n분석 범위: {analysis.get('scope')}"
+        Raises:
+            DeadlineExceededError: 필수 섹션을 하나도 만들지 못한 경우
+        """
+        if fallback is None:
+            messages = self._build_single_call_messages(user_input)
+            fallback = self._cache_lookup(self._cache_key(messages, **self._request_params("single_call")))
+        fallback_sections = parse_sections(fallback) if fallback else {}
+        sections = dict(results)
+        for key, _, prefix in SINGLE_CALL_PROMPT_LAYOUT:
+            if sections.get(key) is not None:
+                continue
+            reason = reasons.get(key, "dependency")
+            if key in self.deadline_policy.optional_sections:
+                sections[key] = ""
+                deadline.degrade(key, DROPPED, reason)
+            elif fallback_sections.get(key):
+                sections[key] = f"{prefix}{fallback_sections[key]}"
+                deadline.degrade(key, SINGLE_CALL, reason)
+            else:
+                deadline.degrade(key, OMITTED, reason)
+        if all(sections.get(key) is None for key in REQUIRED_SECTIONS):
+            raise DeadlineExceededError(f"시간 예산({deadline.budget:g}초) 안에 필수 섹션을 생성하지 못했습니다.")
+        return sections
+
+
+class PromptEngine(BasePromptEngine):
+    """프롬프트 변환 엔진 클래스
+    
+    사용자의 간단한 입력을 구조화된 상세 프롬프트로 변환합니다.
+    """
+    
+    def _create_client(self, api_key: str) -> "OpenAI":
+        """API 키로 동기 OpenAI 클라이언트를 생성합니다."""
+        from openai import OpenAI
+        
+        if self.scheduler is not None:
+            # 재시도는 스케줄러가 담당
+            return OpenAI(api_key=api_key, max_retries=0)
+        return OpenAI(api_key=api_key)
+    
+    def _create_flights(self) -> SingleFlight:
+        """스레드 간에 동시 요청을 합칠 단일 비행 그룹을 생성합니다."""
+        return SingleFlight()
+    
+    def _send(self, messages: List[Dict], request: Callable[[], Any], retries: Optional[List] = None,
+              model: Optional[str] = None) -> Any:
+        """API 요청을 보냅니다. 스케줄러가 있으면 속도 제한과 재시도 정책을 적용합니다.
+        
+        Args:
+            messages: 전송할 메시지 목록 (토큰 예산 계산용)
+            request: 실제 API 호출을 수행하는 함수
+            retries: 재시도가 발생할 때마다 (예외, 대기 시간)을 추가할 목록
+            model: 요청할 모델 (없으면 엔진의 모델, 속도 제한 예산 계산용)
+        """
+        if self.scheduler is None:
+            return request()
+        on_retry = (lambda error, delay: retries.append((error, delay))) if retries is not None else None
+        return self.scheduler.call(model or self.model, estimate_message_tokens(messages), request, on_retry=on_retry)
+    
+    def _complete(self, stage: str, messages: List[Dict], validate: Optional[Callable[[str], Any]] = None) -> str:
+        """채팅 완성 API를 호출하고 응답 텍스트를 반환합니다.
+        
+        캐시가 설정되어 있으면 같은 요청에 대한 저장된 응답을 먼저 확인하고,
+        요청 합치기를 사용하면 진행 중인 같은 요청이 있을 때 그 응답을 함께 받습니다.
+        
+        Args:
+            stage: 호출한 단계 이름 (예: "analysis", "expert_role")
+            messages: 전송할 메시지 목록
+            validate: 응답을 캐시에 저장하기 전에 호출할 검증 함수 (`SchemaValidationError`를
+                      발생시키면 저장하지 않음. 응답은 검증 결과와 관계없이 반환)
             
-        if analysis.get('search_terms') and len(analysis.get('search_terms', [])) > 0:
-            special_considerations += f"\n중점적으로 다룰 검색어: {', '.join(analysis.get('search_terms'))}"
+        Returns:
+            str: 모델 응답 텍스트
+        """
+        params = self._request_params(stage)
+        cache_key = self._cache_key(messages, **params)
+        started = time.perf_counter()
+        cached = self._cache_lookup(cache_key)
+        if cached is not None:
+            self._record_call(stage, started, cache_hit=True)
+            return cached
+        
+        # 검증이 필요한 응답은 요청을 보낸 쪽(요청 합치기의 대표 요청)에서 검증한 뒤 저장
+        store_key = cache_key if validate is None else None
+        flight_key = self._flight_key(messages, **params)
+        if flight_key is None:
+            content, leader = self._request_completion(stage, messages, params, store_key, started), True
+        else:
+            content, leader = self.flights.do(
+                flight_key, lambda: self._request_completion(stage, messages, params, store_key, started)
+            )
+        if not leader:
+            self._record_call(stage, started, coalesced=True)
+        elif validate is not None:
+            self._cache_store(cache_key, content, validate)
+        return content
+    
+    def _request_completion(self, stage: str, messages: List[Dict], params: Dict[str, Any],
+                            cache_key: Optional[str], started: float) -> str:
+        """채팅 완성 API를 실제로 호출하고 응답을 캐시에 저장합니다.
         
-        # OpenAI API를 사용하여 주요 고려사항 생성
-        reminders_prompt = f"""
-        다음 주제에 관한 주요 고려사항 목록을 작성해주세요:
+        출력 토큰 한도에 도달해 잘린 응답은 캐시에 저장하지 않고 계측 기록에 `truncated`로 남깁니다.
+        """
+        if self.hedging is not None and self.hedging.applies(stage):
+            return self._hedged_completion(stage, messages, params, cache_key, started)
+        retries: List = []
+        try:
+            response = self._send(messages, lambda: self._api_client().chat.completions.create(
+                model=self.model,
+                temperature=self.temperature,
+                messages=messages,
+                **params,
+                **self._timeout_params()
+            ), retries=retries)
+        except Exception as e:
+            self._record_call(stage, started, retries=len(retries), error=e)
+            raise
+        content = response.choices[0].message.content
+        truncated = response.choices[0].finish_reason == TRUNCATED_FINISH_REASON
+        if not truncated:
+            self._cache_store(cache_key, content)
+        self._record_call(stage, started, usage=getattr(response, "usage", None), retries=len(retries),
+                          truncated=truncated)
+        return content
+    
+    def _hedged_completion(self, stage: str, messages: List[Dict], params: Dict[str, Any],
+                           cache_key: Optional[str], started: float) -> str:
+        """첫 토큰이 마감 시간 안에 오지 않으면 같은 요청을 한 번 더 보내고 먼저 끝난 응답을 사용합니다.
         
-        주제: {analysis.get('topic', '일반 주제')}
-        분야: {analysis.get('domain', '다양한 분야')}
-        목적: {analysis.get('purpose', '정보 제공')}{special_considerations}
+        마감 시간은 `HedgePolicy.delay()`가 최근 첫 토큰 시간의 분위수로 계산하며, 중복 요청은
+        정책의 `model`(없으면 같은 모델)로 보냅니다. 먼저 끝난 요청의 응답을 사용하고
+        나머지 요청은 스트림을 닫아 취소합니다. 한쪽이 실패하면 다른 쪽의 응답을 기다립니다.
+        """
+        policy = self.hedging
+        primary = HedgeAttempt(model=self.model, hedge=False, responded=threading.Event())
+        futures = {self._start_attempt(primary, messages, params): primary}
+        if not primary.responded.wait(policy.delay(stage, self.model)) and policy.try_issue():
+            hedge = HedgeAttempt(model=policy.model or self.model, hedge=True, responded=threading.Event())
+            futures[self._start_attempt(hedge, messages, params)] = hedge
+        
+        winner = content = error = None
+        pending = set(futures)
+        while pending and winner is None:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if winner is None:
+                        winner, content = futures[future], future.result()
+                elif error is None:
+                    error = future.exception()
+        for future in pending:
+            futures[future].cancel()
+        return self._finish_hedged(stage, started, cache_key, list(futures.values()), winner, content, error)
+    
+    def _start_attempt(self, attempt: HedgeAttempt, messages: List[Dict], params: Dict[str, Any]) -> Future:
+        """헤징할 요청 하나를 별도 스레드에서 시작합니다."""
+        def run():
+            try:
+                return self._stream_attempt(attempt, messages, params)
+            finally:
+                attempt.responded.set()
+        
+        return self._start_background(run)
+    
+    @staticmethod
+    def _start_background(fn: Callable[[], Any]) -> Future:
+        """함수를 호출 스레드의 컨텍스트로 별도 데몬 스레드에서 실행하고, 결과를 받을 Future를 반환합니다.
         
-        최소 5-7개의 중요한 고려사항, 주의점, 윤리적 측면, 한계, 다양한 관점 등을 포함해주세요.
-        각 항목은 간결하고 명확하게 불릿 포인트(-)로 작성해주세요.
-        사용자가 언급한 특정 범위, 검색어 또는 요구사항을 고려하세요.
+        기다리지 않기로 한 작업도 스레드 풀 종료를 막지 않도록 풀 대신 데몬 스레드를 사용합니다.
         """
+        future: Future = Future()
+        context = contextvars.copy_context()
         
-        response = self.client.chat.completions.create(
-            model=self.model,
-            temperature=self.temperature,
-            messages=[
-                {"role": "system", "content": "당신은 주제별 중요 고려사항을 정리하는 전문가입니다."},
-                {"role": "user", "content": reminders_prompt}
-            ]
-        )
+        def run():
+            try:
+                future.set_result(context.run(fn))
+            except BaseException as e:
+                future.set_exception(e)
         
-        return response.choices[0].message.content
+        threading.Thread(target=run, daemon=True).start()
+        return future
     
-    def generate_output_format(self, analysis: Dict) -> str:
-        """분석 결과를 바탕으로 출력 형식 생성
+    def _stream_attempt(self, attempt: HedgeAttempt, messages: List[Dict], params: Dict[str, Any]) -> str:
+        """요청을 스트리밍으로 보내 첫 토큰 시간을 기록하고, 전체 응답 텍스트를 반환합니다."""
+        started = time.perf_counter()
+        parts = []
+        attempt.stream = self._send(messages, lambda: self._api_client().chat.completions.create(
+            model=attempt.model,
+            temperature=self.temperature,
+            messages=messages,
+            stream=True,
+            stream_options={"include_usage": True},
+            **params,
+            **self._timeout_params()
+        ), retries=attempt.retries, model=attempt.model)
+        try:
+            for chunk in attempt.stream:
+                if attempt.cancelled:
+                    break
+                if getattr(chunk, "usage", None) is not None:
+                    attempt.usage = chunk.usage
+                if not chunk.choices:
+                    continue
+                if getattr(chunk.choices[0], "finish_reason", None) == TRUNCATED_FINISH_REASON:
+                    attempt.truncated = True
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    if attempt.ttft is None:
+                        attempt.ttft = time.perf_counter() - started
+                        attempt.responded.set()
+                    parts.append(delta)
+        finally:
+            if attempt.cancelled:
+                attempt.cancel()
+        return "".join(parts)
+    
+    def _complete_structured(self, stage: str, messages: List[Dict]) -> Dict:
+        """JSON 스키마 응답을 받아 검증하고, 검증에 실패하면 한 번만 수정을 요청합니다.
+        
+        응답은 검증을 통과한 경우에만 캐시에 저장하므로, 잘못된 응답이 캐시에서 반복되지 않습니다.
         
         Args:
-            analysis: 입력 분석 결과
+            stage: 호출한 단계 이름 ("analysis" 또는 "format_requirements")
+            messages: 전송할 메시지 목록
             
         Returns:
-            str: 생성된 출력 형식
+            Dict: 검증된 결과
+            
+        Raises:
+            SchemaValidationError: 수정 요청 후에도 응답이 스키마를 만족하지 않는 경우
         """
-        # 원하는 출력 형식이 있으면 포함
-        format_guidance = ""
-        if analysis.get('output_format'):
-            format_guidance = f"\n원하는 출력 형식: {analysis.get('output_format')}"
+        validate = partial(self._parse_structured, stage)
+        content = self._complete(stage, messages, validate=validate)
+        try:
+            return self._parse_structured(stage, content)
+        except SchemaValidationError as e:
+            content = self._complete(stage, build_repair_messages(messages, content, e), validate=validate)
+            return self._parse_structured(stage, content)
+    
+    def _stream_complete(self, stage: str, messages: List[Dict], fresh: bool = False) -> Iterator[str]:
+        """채팅 완성 API를 스트리밍 방식으로 호출하고 텍스트 조각을 차례로 반환합니다.
+        
+        캐시에 같은 요청의 응답이 있으면 전체 응답을 한 번에 반환하고,
+        스트림이 끝까지 완료되고 출력 토큰 한도에 도달하지 않은 경우에만 응답을 캐시에 저장합니다.
+        
+        Args:
+            stage: 호출한 단계 이름
+            messages: 전송할 메시지 목록
+            fresh: True이면 캐시를 조회하지 않음
             
-        # 특정 검색어나 범위가 있으면 포함
-        if analysis.get('scope') and analysis.get('scope') != "광범위":
-            format_guidance += f"\n분석 범위: {analysis.get('scope')}"
+        Yields:
+            str: 모델이 생성한 텍스트 조각
+        """
+        params = self._request_params(stage)
+        cache_key = self._cache_key(messages, **params)
+        started = time.perf_counter()
+        cached = None if fresh else self._cache_lookup(cache_key)
+        if cached is not None:
+            self._record_call(stage, started, ttft=time.perf_counter() - started, cache_hit=True, streamed=True)
+            yield cached
+            return
+        
+        retries: List = []
+        ttft = usage = None
+        truncated = False
+        parts = []
+        try:
+            stream = self._send(messages, lambda: self._api_client().chat.completions.create(
+                model=self.model,
+                temperature=self.temperature,
+                messages=messages,
+                stream=True,
+                stream_options={"include_usage": True},
+                **params,
+                **self._timeout_params()
+            ), retries=retries)
+            for chunk in stream:
+                # 마지막 청크에는 choices 없이 usage만 포함됨
+                if getattr(chunk, "usage", None) is not None:
+                    usage = chunk.usage
+                if not chunk.choices:
+                    continue
+                if getattr(chunk.choices[0], "finish_reason", None) == TRUNCATED_FINISH_REASON:
+                    truncated = True
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    if ttft is None:
+                        ttft = time.perf_counter() - started
+                    parts.append(delta)
+                    yield delta
+        except Exception as e:
+            self._record_call(stage, started, ttft=ttft, retries=len(retries), streamed=True, error=e)
+            raise
+        if not truncated:
+            self._cache_store(cache_key, "".join(parts))
+        self._record_call(stage, started, ttft=ttft, usage=usage, retries=len(retries), streamed=True,
+                          truncated=truncated)
+    
+    def _guard_stage(self, stage: Stage, deadline: Deadline, needed: Optional[float],
+                     reasons: Dict[str, str]) -> Stage:
+        """단계 하나를 시간 예산 안에서 실행하도록 감쌉니다."""
+        def run(results: Dict[str, Any]) -> Any:
+            reason = self._skip_reason(stage, results, deadline, needed, reasons)
+            if reason is None:
+                try:
+                    return stage.func(results)
+                except Exception as e:
+                    if not is_timeout_error(e):
+                        raise
+                    reason = "timeout"
+            reasons[stage.name] = reason
+            return None
+        
+        return Stage(stage.name, run, stage.depends_on)
+    
+    def condense_input(self, user_input: str) -> str:
+        """긴 입력을 부분별 요구사항 추출(map)과 통합(reduce)을 거쳐 요약 브리프로 줄입니다.
+        
+        입력을 `long_input.chunk_tokens` 이하의 부분으로 나누는 대로 요구사항 추출 호출을 시작하고,
+        추출 결과는 호출 하나의 입력이 같은 한도를 넘지 않도록 묶어서 단계적으로 통합합니다.
+        입력 끝의 커스텀 옵션 줄은 요약하지 않고 브리프 뒤에 그대로 붙입니다.
+        정책이 없거나 입력이 `long_input.threshold_tokens` 이하이면 입력을 그대로 반환합니다.
+        
+        Args:
+            user_input: 사용자가 입력한 프롬프트
             
-        if analysis.get('search_terms') and len(analysis.get('search_terms', [])) > 0:
-            format_guidance += f"\n중점적으로 다룰 검색어: {', '.join(analysis.get('search_terms'))}"
+        Returns:
+            str: 변환에 사용할 입력 (요약 브리프 또는 원문)
+        """
+        if self.long_input is None or not self.long_input.applies(user_input, self.model):
+            return user_input
+        body, options = split_option_lines(user_input)
+        notes = self._map_long_input(CHUNK_STAGE, iter_chunks(body, self.long_input.chunk_tokens, self.model))
+        rounds = 0
+        while len(notes) > 1:
+            rounds += 1
+            groups = self._reduce_groups(notes, rounds)
+            notes = self._map_long_input(REDUCE_STAGE, (join_notes(group) for group in groups))
+        return build_brief_input(notes[0] if notes else "", options)
+    
+    def _map_long_input(self, stage: str, contents: Iterable[str]) -> List[str]:
+        """부분마다 같은 단계의 호출을 동시에 실행하고 결과를 입력 순서대로 반환합니다."""
+        with ThreadPoolExecutor(max_workers=self._long_input_concurrency(),
+                                thread_name_prefix="prompt-chunk") as executor:
+            # 부분이 만들어지는 대로 제출하고, 호출 스레드의 컨텍스트(캐시 우회, 시간 예산 등)를 전달
+            futures = [
+                executor.submit(contextvars.copy_context().run, self._complete, stage,
+                                self._long_input_messages(stage, content))
+                for content in contents
+            ]
+            return [future.result() for future in futures]
+    
+    def analyze_input(self, user_input: str) -> Dict:
+        """사용자 입력을 분석하여 핵심 요소와 특정 요구사항을 추출
         
-        # OpenAI API를 사용하여 출력 형식 생성
-        format_prompt = f"""
-        다음 주제에 관한 체계적인 출력 형식을 작성해주세요:
+        Args:
+            user_input: 사용자가 입력한 간단한 프롬프트
+            
+        Returns:
+            Dict: 입력에서 추출한 핵심 요소들과 특정 요구사항
+        """
+        messages = self._build_analysis_messages(user_input)
+        if self.structured_output:
+            return self._complete_structured("analysis", messages)
         
-        주제: {analysis.get('topic', '일반 주제')}
-        분야: {analysis.get('domain', '다양한 분야')}
-        목적: {analysis.get('purpose', '정보 제공')}{format_guidance}
+        # OpenAI API를 사용하여 입력 분석
+        content = self._complete("analysis", messages)
         
-        다음 두 부분으로 나누어 작성해주세요:
+        # JSON 응답 파싱
+        return self._parse_analysis(content)
+
+    def generate_expert_role(self, user_input: str, analysis: Dict) -> str:
+        """분석 결과를 바탕으로 전문가 역할 생성
         
-        1. <thinking_process> - 사고 과정과 접근 방식에 대한 구체적인 설명 형식
-        2. <final_response> - 최종 결과물의 구체적인 형식과 구조 (목차 형태로 제시)
+        Args:
+            user_input: 사용자가 입력한 간단한 프롬프트
+            analysis: 입력 분석 결과
+            
+        Returns:
+            str: 생성된 전문가 역할 설명
+        """
+        return self._complete("expert_role", self._build_expert_role_messages(analysis))
+    
+    def generate_instructions(self, user_input: str, analysis: Dict) -> str:
+        """분석 결과를 바탕으로 상세 지시사항 생성
         
-        특히 <final_response> 부분은 주제에 가장 적합한 구조화된 목차 형태로 제시해주세요.
-        사용자가 요청한 특정 출력 형식이 있다면 이를 정확히 반영하세요.
-        섹션 제목과 간략한 각 섹션의 내용 설명을 포함해야 합니다.
+        Args:
+            user_input: 사용자가 입력한 간단한 프롬프트
+            analysis: 입력 분석 결과
+            
+        Returns:
+            str: 생성된 지시사항
         """
+        return self._complete("instructions", self._build_instructions_messages(analysis))
+    
+    def generate_response_style(self, user_input: str, analysis: Dict) -> str:
+        """분석 결과를 바탕으로 응답 스타일 가이드라인 생성
         
-        response = self.client.chat.completions.create(
-            model=self.model,
-            temperature=self.temperature,
-            messages=[
-                {"role": "system", "content": "당신은 체계적인 문서 구조와 출력 형식을 설계하는 전문가입니다."},
-                {"role": "user", "content": format_prompt}
-            ]
-        )
+        Args:
+            user_input: 사용자가 입력한 간단한 프롬프트
+            analysis: 입력 분석 결과
+            
+        Returns:
+            str: 생성된 응답 스타일 가이드라인
+        """
+        return self._complete("response_style", self._build_response_style_messages(analysis))
+    
+    def generate_reminders(self, user_input: str, analysis: Dict) -> str:
+        """분석 결과를 바탕으로 주요 고려사항 생성
+        
+        Args:
+            user_input: 사용자가 입력한 간단한 프롬프트
+            analysis: 입력 분석 결과
+            
+        Returns:
+            str: 생성된 주요 고려사항
+        """
+        return self._complete("reminders", self._build_reminders_messages(analysis))
+    
+    def generate_output_format(self, analysis: Dict) -> str:
+        """분석 결과를 바탕으로 출력 형식 생성
         
-        return response.choices[0].message.content
+        Args:
+            analysis: 입력 분석 결과
+            
+        Returns:
+            str: 생성된 출력 형식
+        """
+        return self._complete("output_format", self._build_output_format_messages(analysis))
     
     def extract_format_requirements(self, user_input: str) -> Dict:
         """사용자 입력에서 명시적인 형식 요구사항을 추출
@@ -321,34 +1259,26 @@ class PromptEngine:
         Returns:
             Dict: 추출된 형식 요구사항
         """
-        response = self.client.chat.completions.create(
-            model=self.model,
-            temperature=self.temperature,
-            messages=[
-                {"role": "system", "content": """당신은 텍스트에서 형식 요구사항을 추출하는 전문가입니다.
-                사용자의 입력을 분석하여 다음을 JSON 형식으로 추출해주세요:
-                
-                1. format_type: 요청된 형식 유형 (예: 목록, 에세이, 단계별 가이드, 비교표 등)
-                2. sections: 명시적으로 요청된 섹션이나 구성 요소 (배열)
-                3. style: 언급된 스타일 (예: 학술적, 대화형, 설명적 등)
-                4. special_requirements: 기타 형식 관련 특별 요청사항
-                
-                JSON 형식으로만 응답하세요. 추가 설명이나 텍스트는 포함하지 마세요."""},
-                {"role": "user", "content": user_input}
-            ]
-        )
+        messages = self._build_format_requirements_messages(user_input)
+        if self.structured_output:
+            return self._complete_structured("format_requirements", messages)
+        content = self._complete("format_requirements", messages)
+        return self._parse_format_requirements(content)
+    
+    def analyze_input_with_format(self, user_input: str) -> Tuple[Dict, Dict]:
+        """한 번의 API 호출로 입력 분석과 형식 요구사항 추출을 함께 수행
         
-        try:
-            content = response.choices[0].message.content
-            json_match = re.search(r'{.*}', content, re.DOTALL)
-            if json_match:
-                import json
-                return json.loads(json_match.group(0))
-            else:
-                return {}
-        except Exception as e:
-            print(f"형식 요구사항 추출 오류: {e}")
-            return {}
+        Args:
+            user_input: 사용자가 입력한 간단한 프롬프트
+            
+        Returns:
+            Tuple[Dict, Dict]: (`analyze_input` 결과, `extract_format_requirements` 결과)
+        """
+        messages = self._build_combined_analysis_messages(user_input)
+        if self.structured_output:
+            return self.split_combined_analysis(self._complete_structured("combined_analysis", messages))
+        content = self._complete("combined_analysis", messages)
+        return self.split_combined_analysis(self._parse_analysis(content))
     
     def transform_prompt_single_call(self, user_input: str) -> str:
         """사용자 입력을 상세한 프롬프트로 변환합니다 (단일 API 호출 방식).
@@ -363,88 +1293,98 @@ class PromptEngine:
         Returns:
             str: 변환된 상세 프롬프트
         """
-        # 시스템 프롬프트 정의
-        system_prompt = """사용자 입력을 분석하고 여러 섹션으로 이루어진 상세한 프롬프트를 생성하세요.
-각 섹션은 명확한 헤더로 시작해야 합니다. 아래 섹션을 생성하세요:
-
-1. 분석: 사용자 입력의 의도와 목적을 분석하고, 주요 측면과 요구사항을 식별하세요.
-제목은 "### 분석:"으로 시작하세요.
-
-2. 전문가 역할: 사용자 요청을 처리하기 위한 가장 적합한 전문가 역할을 정의하세요.
-제목은 "### 전문가 역할:"로 시작하세요.
-
-3. 지시사항: 전문가를 위한 명확하고 구체적인 지시사항을 제공하세요. 이는 전문가가 응답을 생성할 때 따라야 할 단계, 고려해야 할 요소, 필요한 정보 등을 포함해야 합니다.
-제목은 "### 지시사항:"으로 시작하세요.
-
-4. 응답 스타일: 응답의 스타일, 형식, 톤을 정의하세요.
-제목은 "### 응답 스타일:"로 시작하세요.
-
-5. 주요 고려사항: 모델이 응답을 생성할 때 반드시 고려해야 할 중요한 사항들을 강조하세요.
-제목은 "### 주요 고려사항:"으로 시작하세요.
-
-6. 출력 형식(선택적): 사용자 입력에 특정 출력 형식이 필요한 경우, 출력 형식에 대한 상세한 지침을 제공하세요.
-제목은 "### 출력 형식:"으로 시작하세요.
-
-각 섹션을 명확하게 분릿하고, 내용은 구체적이고 상세해야 합니다."""
-
         # API 호출로 프롬프트 생성
-        response = self.client.chat.completions.create(
-            model=self.model,
-            temperature=self.temperature,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_input}
-            ]
-        )
-        
-        # 각 섹션을 추출하기 위한 정규식 패턴
-        patterns = {
-            "analysis": r"### 분석:(.*?)(?=### |$)",
-            "expert_role": r"### 전문가 역할:(.*?)(?=### |$)",
-            "instructions": r"### 지시사항:(.*?)(?=### |$)",
-            "response_style": r"### 응답 스타일:(.*?)(?=### |$)",
-            "reminders": r"### 주요 고려사항:(.*?)(?=### |$)",
-            "output_format": r"### 출력 형식:(.*?)(?=### |$)"
-        }
-        
-        # 각 섹션 추출
-        sections = {}
-        for key, pattern in patterns.items():
-            match = re.search(pattern, response.choices[0].message.content, re.DOTALL)
-            if match:
-                # 추출된 내용 앞뒤 공백 제거
-                sections[key] = match.group(1).strip()
-            else:
-                sections[key] = None
+        content = self._complete("single_call", self._build_single_call_messages(self.condense_input(user_input)))
         
-        # 최종 프롬프트 구성
-        final_prompt = "<prompt>\n"
+        # 각 섹션 추출 후 최종 프롬프트 구성
+        sections = parse_sections(content)
+        return self.assemble_single_call_prompt(sections)
+    
+    def transform_prompt_auto(self, user_input: str) -> str:
+        """입력 복잡도에 따라 단일 호출과 다중 호출 중 비용이 적은 방식을 골라 변환합니다.
         
-        # 필수 섹션 추가
-        if sections["analysis"]:
-            final_prompt += f"<analysis>\n{sections['analysis']}\n</analysis>\n\n"
+        `route_input()`이 API를 호출하지 않고 입력 길이와 범위/형식/요구사항 단서로 복잡하다고 판단한
+        입력만 다중 호출 방식으로 변환합니다. 단일 호출 응답에 필수 섹션이 빠져 있으면
+        (`auto_escalation`이 True일 때) 다중 호출 방식으로 다시 변환합니다.
         
-        if sections["expert_role"]:
-            final_prompt += f"<role>\n당신은 {sections['expert_role']}\n</role>\n\n"
-            
-        if sections["instructions"]:
-            final_prompt += f"<instructions>\n{sections['instructions']}\n</instructions>\n\n"
-            
-        if sections["response_style"]:
-            final_prompt += f"<response_style>\n{sections['response_style']}\n</response_style>\n\n"
+        Args:
+            user_input: 사용자가 입력한 간단한 프롬프트
             
-        if sections["reminders"]:
-            final_prompt += f"<reminder>\n{sections['reminders']}\n</reminder>\n\n"
-        
-        # 선택적 섹션 추가
-        if sections["output_format"]:
-            final_prompt += f"<output_format>\n{sections['output_format']}\n</output_format>\n\n"
-        
-        final_prompt += "</prompt>"
+        Returns:
+            str: 변환된 상세 프롬프트
+        """
+        user_input = self.condense_input(user_input)
+        if route_input(user_input).use_multi_call:
+            return self._transform_multi_call(user_input, current_deadline())
+        content = self._complete("single_call", self._build_single_call_messages(user_input))
+        sections = parse_sections(content)
+        if self.auto_escalation and missing_sections(sections):
+            return self._transform_multi_call(user_input, current_deadline())
+        return self.assemble_single_call_prompt(sections)
+    
+    def transform_prompt_single_call_stream(self, user_input: str, fresh: bool = False) -> Iterator[Tuple[str, str]]:
+        """단일 API 호출 방식의 변환 결과를 섹션별로 스트리밍합니다.
         
-        return final_prompt.strip()
+        `### 분석:` 같은 섹션 헤더가 도착하는 대로 해당 섹션의 텍스트 조각을 반환하므로,
+        전체 응답을 기다리지 않고 첫 토큰부터 결과를 표시할 수 있습니다.
         
-    def transform_prompt(self, user_input: str, use_multi_call: bool = False) -> str:
+        Args:
+            user_input: 사용자가 입력한 간단한 프롬프트
+            fresh: True이면 캐시된 응답을 사용하지 않고 새로 생성
+            
+        Yields:
+            Tuple[str, str]: (섹션 키, 텍스트 조각). 섹션 키는 "analysis", "expert_role",
+                             "instructions", "response_style", "reminders", "output_format" 중 하나이며,
+                             마지막 이벤트는 (PROMPT_EVENT, 최종 프롬프트)입니다.
+        """
+        with cache_bypass(fresh):
+            cached_prompt = self._semantic_lookup(user_input, use_multi_call=False)
+            flight_key = self._transform_flight_key(user_input, use_multi_call=False)
+        if cached_prompt is not None:
+            yield PROMPT_EVENT, cached_prompt
+            return
+        if flight_key is None:
+            yield from self._stream_single_call(user_input, fresh)
+            return
+        
+        # 같은 입력을 변환 중인 요청이 있으면 섹션 조각 없이 최종 프롬프트만 함께 받음
+        future, leader = self.flights.claim(flight_key)
+        if not leader:
+            started = time.perf_counter()
+            try:
+                prompt = future.result()
+            except FlightAbortedError:
+                yield from self._stream_single_call(user_input, fresh)
+                return
+            self._record_call("single_call", started, coalesced=True, streamed=True)
+            yield PROMPT_EVENT, prompt
+            return
+        prompt = None
+        try:
+            for event in self._stream_single_call(user_input, fresh):
+                if event[0] == PROMPT_EVENT:
+                    prompt = event[1]
+                yield event
+        except BaseException as e:
+            # 최종 프롬프트를 보낸 뒤 소비가 중단된 경우에는 결과를 그대로 공유
+            self.flights.resolve(flight_key, future, result=prompt, error=e if prompt is None else None)
+            raise
+        self.flights.resolve(flight_key, future, result=prompt)
+    
+    def _stream_single_call(self, user_input: str, fresh: bool) -> Iterator[Tuple[str, str]]:
+        """단일 API 호출 방식의 변환 결과를 실제로 스트리밍하고 의미 캐시에 저장합니다."""
+        parser = SectionStreamParser()
+        with cache_bypass(fresh):
+            messages = self._build_single_call_messages(self.condense_input(user_input))
+        for delta in self._stream_complete("single_call", messages, fresh=fresh or is_cache_bypassed()):
+            yield from parser.feed(delta)
+        yield from parser.close()
+        prompt = self.assemble_single_call_prompt(parser.sections())
+        self._semantic_store(user_input, False, prompt)
+        yield PROMPT_EVENT, prompt
+        
+    def transform_prompt(self, user_input: str, use_multi_call: Union[bool, str] = False, fresh: bool = False,
+                         deadline: Optional[float] = None) -> str:
         """사용자 입력을 상세한 프롬프트로 변환합니다.
         
         이 메서드는 사용자의 간단한 입력을 상세하고 구조화된 프롬프트로 변환합니다.
@@ -454,81 +1394,180 @@ class PromptEngine:
             use_multi_call: 여러 API 호출을 사용할지 여부. 
                             True인 경우 여러 API 호출을 통해 고품질 결과를 생성합니다(비용 증가).
                             False인 경우 단일 API 호출을 사용하여 비용을 절감합니다(품질 저하 가능성).
+                            "auto"인 경우 입력 복잡도에 따라 방식을 고릅니다(`transform_prompt_auto` 참고).
+            fresh: True이면 캐시된 응답을 사용하지 않고 새로 생성합니다.
+                   (temperature가 0보다 클 때 새로운 샘플이 필요한 경우 사용)
+            deadline: 변환에 사용할 시간 예산(초). 다중 호출 방식에서 예산이 부족하면
+                      선택 섹션을 생략하거나 단일 호출 결과로 대체합니다(`transform_prompt_multi_call` 참고).
             
         Returns:
             str: 변환된 상세 프롬프트
+            
+        Raises:
+            DeadlineExceededError: 시간 예산 안에 필수 섹션을 하나도 생성하지 못한 경우
+                                   (그 밖에 마감 시간에 끝나지 않은 호출은 SDK의 시간 초과 예외 발생)
         """
-        if use_multi_call:
-            return self.transform_prompt_multi_call(user_input)
+        with cache_bypass(fresh), deadline_scope(deadline):
+            prompt = self._semantic_lookup(user_input, use_multi_call)
+            if prompt is not None:
+                return prompt
+            flight_key = self._transform_flight_key(user_input, use_multi_call)
+            if flight_key is None:
+                return self._transform(user_input, use_multi_call)
+            started = time.perf_counter()
+            prompt, leader = self.flights.do(flight_key, lambda: self._transform(user_input, use_multi_call))
+        if not leader:
+            self._record_call(self._transform_stage(use_multi_call), started, coalesced=True)
+        return prompt
+    
+    def _transform(self, user_input: str, use_multi_call: Union[bool, str]) -> str:
+        """선택한 방식으로 변환하고 결과를 의미 캐시에 저장합니다."""
+        if use_multi_call == AUTO_ROUTE:
+            prompt = self.transform_prompt_auto(user_input)
+        elif use_multi_call:
+            prompt = self.transform_prompt_multi_call(user_input)
         else:
-            return self.transform_prompt_single_call(user_input)
+            prompt = self.transform_prompt_single_call(user_input)
+        self._semantic_store(user_input, use_multi_call, prompt)
+        return prompt
 
-    def transform_prompt_multi_call(self, user_input: str) -> str:
+    def transform_prompt_detailed(self, user_input: str, use_multi_call: Union[bool, str] = False,
+                                  fresh: bool = False, deadline: Optional[float] = None) -> TransformResult:
+        """사용자 입력을 변환하고 요청 단위 계측 결과를 함께 반환합니다.
+        
+        Args:
+            user_input: 사용자가 입력한 간단한 프롬프트
+            use_multi_call: 여러 API 호출을 사용할지 여부 ("auto"이면 입력 복잡도에 따라 선택)
+            fresh: True이면 캐시된 응답을 사용하지 않고 새로 생성
+            deadline: 변환에 사용할 시간 예산(초)
+            
+        Returns:
+            TransformResult: 변환된 프롬프트, 전체 소요 시간, 호출별 계측 기록, 생략하거나 대체한 섹션,
+                             적용된 토큰 예산
+        """
+        started = time.perf_counter()
+        with request_trace() as calls, deadline_scope(deadline) as budget:
+            prompt = self.transform_prompt(user_input, use_multi_call=use_multi_call, fresh=fresh)
+        return TransformResult(prompt=prompt, elapsed=time.perf_counter() - started, calls=calls,
+                               degraded=list(budget.degraded) if budget is not None else [],
+                               budgets=self._effective_budgets(user_input, calls))
+    
+    def transform_prompt_multi_call(self, user_input: str, deadline: Optional[float] = None) -> str:
         """사용자 입력을 여러 API 호출을 통해 상세한 프롬프트로 변환합니다.
         
         이 메서드는 각 섹션을 별도의 API 호출로 생성하여 높은 품질의 결과를 제공합니다.
         (비용이 더 많이 발생합니다)
         
+        서로 의존하지 않는 호출은 최대 `max_concurrency`개까지 동시에 실행되므로,
+        전체 지연 시간은 대략 두 번의 API 왕복 시간으로 줄어듭니다.
+        일부 단계가 실패하면 완료된 단계의 결과를 보관하므로, 같은 입력으로 다시
+        실행하면 실패한 단계부터 이어서 진행합니다.
+        
+        시간 예산이 있으면 모든 호출에 남은 시간을 제한 시간으로 전달하고, `deadline_policy`에 따라
+        예산이 부족한 선택 섹션은 생략하며, 마감 시간까지 생성하지 못한 필수 섹션은
+        단일 호출 응답으로 대체합니다. 처리 내역은 `transform_prompt_detailed()`의 `degraded`로 확인합니다.
+        
         Args:
             user_input: 사용자가 입력한 간단한 프롬프트
+            deadline: 변환에 사용할 시간 예산(초, 없으면 제한 없음)
             
         Returns:
             str: 변환된 상세 프롬프트
+            
+        Raises:
+            DeadlineExceededError: 시간 예산 안에 필수 섹션을 하나도 생성하지 못한 경우
         """
-        # 입력 분석
-        analysis = self.analyze_input(user_input)
-        
-        # 출력 형식 요구사항 추출
-        format_requirements = self.extract_format_requirements(user_input)
-        
-        # 전문가 역할 생성
-        expert_role = self.generate_expert_role(user_input, analysis)
-        
-        # 지시사항 생성
-        instructions = self.generate_instructions(user_input, analysis)
+        # 긴 입력의 요약(여러 번의 API 호출)도 시간 예산 안에서 실행
+        with deadline_scope(deadline) as budget:
+            return self._transform_multi_call(self.condense_input(user_input), budget)
+    
+    def _transform_multi_call(self, user_input: str, budget: Optional[Deadline]) -> str:
+        """요약 브리프로 줄인(또는 줄일 필요가 없는) 입력을 다중 호출 방식으로 변환합니다.
         
-        # 응답 스타일 생성
-        response_style = self.generate_response_style(user_input, analysis)
+        `condense_input()`을 이미 거친 입력을 받으므로 브리프를 다시 요약하지 않습니다.
+        """
+        stages = self._build_multi_call_stages(user_input)
+        checkpoint_key = self._checkpoint_key(user_input)
+        results = self.checkpoints.take(checkpoint_key)
+        if is_cache_bypassed():
+            # 캐시 없이 새로 생성하는 요청은 이전 실패에서 보관한 단계 결과도 사용하지 않음
+            results = {}
+        if budget is not None:
+            return self._multi_call_within_deadline(user_input, stages, checkpoint_key, results, budget)
+        try:
+            sections = run_stage_graph(stages, max_concurrency=self.max_concurrency, results=results)
+        except Exception:
+            self.checkpoints.save(checkpoint_key, results)
+            raise
         
-        # 주요 고려사항 생성
-        key_considerations = self.generate_reminders(user_input, analysis)
+        # 최종 프롬프트 구성
+        return self.assemble_multi_call_prompt(sections)
+    
+    def transform_prompt_incremental(self, user_input: str, options: Optional[Dict[str, Optional[str]]] = None,
+                                     previous: Optional[IncrementalResult] = None) -> IncrementalResult:
+        """커스텀 옵션을 적용해 다중 호출 방식으로 변환하고, 이전 결과에서 바뀐 섹션만 다시 생성합니다.
         
-        # 출력 형식 생성 (있는 경우)
-        output_format = ""
-        if format_requirements:
-            output_format = self.generate_output_format(format_requirements)
+        섹션 생성 단계는 입력 분석 결과의 일부 필드만 읽습니다(`section_dependencies()`).
+        입력 본문이 같고 옵션만 추가되거나 바뀐 경우는 입력 분석을 다시 실행하지 않고 이전 분석 결과의
+        해당 필드를 옵션 값으로 덮어쓰며, 읽는 필드의 값이 바뀐 섹션만 새로 생성합니다.
+        입력 본문이 바뀌었거나 옵션을 지운 경우는 입력 분석부터 다시 실행하되,
+        분석 결과에서 읽는 필드가 그대로인 섹션은 이전 결과를 재사용합니다.
         
-        # 최종 프롬프트 구성
-        final_prompt = f"""<prompt>
-
-<analysis>
-{analysis}
-</analysis>
-
-<role>
-{expert_role}
-</role>
-
-<instructions>
-{instructions}
-</instructions>
-
-<response_style>
-{response_style}
-</response_style>
-
-<reminder>
-{key_considerations}
-</reminder>"""
-
-        # 출력 형식이 있는 경우 추가
-        if output_format:
-            final_prompt += f"""
-
-<output_format>
-{output_format}
-</output_format>"""
+        Args:
+            user_input: 사용자가 입력한 간단한 프롬프트 (커스텀 옵션을 덧붙이기 전)
+            options: 커스텀 옵션 (`scope`, `output_format`, `special_requirements`, 값이 없으면 미지정)
+            previous: 이전 변환 결과 (없거나 엔진 설정이 다르면 처음부터 변환)
             
-        final_prompt += "\n</prompt>"
-        
-        return final_prompt 
\ No newline at end of file
+        Returns:
+            IncrementalResult: 변환 결과 (`regenerated`에 새로 실행한 단계 기록)
+            
+        Raises:
+            ValueError: 알 수 없는 옵션 키가 있는 경우
+        """
+        options = normalize_options(options)
+        sources = self._regeneration_sources(user_input, options, previous)
+        stages = self._build_multi_call_stages(apply_options(
+            user_input if sources is not None else self.condense_input(user_input), options))
+        if sources is None:
+            analysis_stages = [stage for stage in stages if stage.name not in SECTION_STAGES]
+            results = run_stage_graph(analysis_stages, max_concurrency=self.max_concurrency)
+            prefilled = []
+        else:
+            results = self._analysis_results(sources)
+            prefilled = list(results)
+        self._reuse_sections(previous, results)
+        prefilled += [name for name in results if name in SECTION_STAGES]
+        run_stage_graph(stages, max_concurrency=self.max_concurrency, results=results)
+        return self._incremental_result(user_input, options, results, prefilled)
+    
+    def _multi_call_within_deadline(self, user_input: str, stages: List[Stage], checkpoint_key: str,
+                                    results: Dict[str, Any], deadline: Deadline) -> str:
+        """시간 예산 안에서 다중 호출 변환을 실행하고, 생성하지 못한 섹션을 생략하거나 대체합니다."""
+        # 예산이 빠듯하면 필수 섹션을 대체할 단일 호출 요청을 함께 보냄
+        fallback = None
+        if self._needs_fallback([stage for stage in stages if stage.name not in results], deadline):
+            messages = self._build_single_call_messages(user_input)
+            fallback = self._start_background(lambda: self._complete("single_call", messages))
+        
+        reasons: Dict[str, str] = {}
+        guarded = self._guard_stages(stages, deadline, reasons)
+        try:
+            run_stage_graph(guarded, max_concurrency=self.max_concurrency, results=results)
+        except Exception:
+            self.checkpoints.save(checkpoint_key, self._completed_results(results))
+            raise
+        completed = self._completed_results(results)
+        if len(completed) == len(results):
+            return self.assemble_multi_call_prompt(results)
+        # 같은 입력을 다시 변환하면 생략한 단계만 새로 실행
+        self.checkpoints.save(checkpoint_key, completed)
+        
+        fallback_content = None
+        if fallback is not None and missing_sections(results):
+            try:
+                fallback_content = fallback.result(timeout=deadline.remaining())
+            except Exception:
+                # 대체용 요청이 실패하거나 끝나지 않으면 해당 섹션을 제외
+                pass
+        sections = self._degrade_sections(user_input, results, reasons, deadline, fallback_content)
+        return self.assemble_multi_call_prompt(sections)
@@ -0,0 +1,249 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# 현재 컨텍스트에서 캐시 조회를 건너뛸지 여부 (스레드/태스크별로 독립적)
+_bypass_lookup: ContextVar[bool] = ContextVar("prompt_engine_cache_bypass", default=False)
+
+
+def make_cache_key(model: str, temperature: float, messages: List[Dict], **params: Any) -> str:
+    """요청 내용으로부터 캐시 키를 생성합니다.
+
+    모델, temperature, 시스템 프롬프트를 포함한 전체 메시지, 기타 요청 파라미터를
+    정규화된 JSON으로 직렬화한 뒤 SHA-256 해시를 계산합니다.
+
+    Args:
+        model: 사용할 모델 이름
+        temperature: temperature 값
+        messages: 전송할 메시지 목록
+        **params: 응답에 영향을 주는 기타 요청 파라미터
+
+    Returns:
+        str: 16진수 해시 문자열
+    """
+    payload = {
+        "model": model,
+        "temperature": temperature,
+        "messages": messages,
+        "params": params,
+    }
+    serialized = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+def is_cache_bypassed() -> bool:
+    """현재 컨텍스트에서 캐시 조회를 건너뛰어야 하는지 반환합니다."""
+    return _bypass_lookup.get()
+
+
+@contextmanager
+def cache_bypass(enabled: bool = True) -> Iterator[None]:
+    """블록 안의 API 호출이 캐시를 조회하지 않도록 합니다.
+
+    temperature가 0보다 커서 매번 새로운 샘플이 필요한 경우에 사용합니다.
+    새로 받은 응답은 여전히 캐시에 저장됩니다.
+
+    Args:
+        enabled: False이면 아무 효과 없이 블록을 실행
+    """
+    token = _bypass_lookup.set(enabled or _bypass_lookup.get())
+    try:
+        yield
+    finally:
+        _bypass_lookup.reset(token)
+
+
+class MemoryCache:
+    """TTL을 지원하는 스레드 안전한 인메모리 LRU 캐시"""
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = None):
+        """초기화 함수
+
+        Args:
+            max_entries: 보관할 최대 항목 수 (초과 시 가장 오래 사용하지 않은 항목부터 제거)
+            ttl: 항목 유효 시간(초). None이면 만료되지 않음
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            created_at, value = entry
+            if self.ttl is not None and time.time() - created_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, created_at: Optional[float] = None) -> None:
+        """값을 저장합니다. `created_at`을 지정하면 그 시각부터 TTL을 계산합니다."""
+        with self._lock:
+            self._entries[key] = (time.time() if created_at is None else created_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache:
+    """프로세스 재시작 후에도 유지되는 SQLite 기반 캐시 계층"""
+
+    def __init__(self, path: str, max_entries: int = 10000, ttl: Optional[float] = None):
+        """초기화 함수
+
+        Args:
+            path: SQLite 데이터베이스 파일 경로
+            max_entries: 보관할 최대 항목 수 (초과 시 가장 오래 사용하지 않은 항목부터 제거)
+            ttl: 항목 유효 시간(초). None이면 만료되지 않음
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key: str) -> Optional[Tuple[str, float]]:
+        """값과 저장 시각을 함께 조회합니다. 없거나 만료되었으면 None을 반환합니다."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            with self._conn:
+                if self.ttl is not None and now - created_at > self.ttl:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    return None
+                self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            return value, created_at
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            # 최대 항목 수를 넘으면 가장 오래 사용하지 않은 항목부터 제거
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+class ResponseCache:
+    """채팅 완성 응답을 저장하는 2단계(메모리 + 디스크) 캐시
+
+    조회 시 메모리 계층을 먼저 확인하고, 없으면 디스크 계층을 확인한 뒤
+    찾은 값을 메모리 계층으로 올립니다. `get`/`set` 메서드를 가진 객체라면
+    어떤 것이든 `PromptEngine(cache=...)`에 전달할 수 있습니다.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = 24 * 60 * 60,
+                 disk_path: Optional[str] = None, disk_max_entries: int = 10000):
+        """초기화 함수
+
+        Args:
+            max_entries: 메모리 계층의 최대 항목 수
+            ttl: 항목 유효 시간(초). None이면 만료되지 않음
+            disk_path: SQLite 디스크 계층 파일 경로 (없으면 메모리 계층만 사용)
+            disk_max_entries: 디스크 계층의 최대 항목 수
+        """
+        self.memory = MemoryCache(max_entries=max_entries, ttl=ttl)
+        self.disk = SQLiteCache(disk_path, max_entries=disk_max_entries, ttl=ttl) if disk_path else None
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "memory_hits": 0, "disk_hits": 0, "writes": 0}
+
+    @property
+    def persistent(self) -> bool:
+        """디스크 계층이 있어 조회와 저장이 파일 I/O를 하는지 여부 (비동기 엔진은 스레드에서 호출)"""
+        return self.disk is not None
+
+    def _count(self, *names: str) -> None:
+        with self._lock:
+            for name in names:
+                self._stats[name] += 1
+
+    def get(self, key: str) -> Optional[str]:
+        """캐시에서 값을 조회합니다. 없거나 만료되었으면 None을 반환합니다."""
+        value = self.memory.get(key)
+        if value is not None:
+            self._count("hits", "memory_hits")
+            return value
+
+        if self.disk is not None:
+            entry = self.disk.get_entry(key)
+            if entry is not None:
+                # 디스크에 저장된 시각을 유지하여 메모리 계층으로 올릴 때마다 TTL이 연장되지 않도록 함
+                value, created_at = entry
+                self.memory.set(key, value, created_at=created_at)
+                self._count("hits", "disk_hits")
+                return value
+
+        self._count("misses")
+        return None
+
+    def set(self, key: str, value: str) -> None:
+        """모든 계층에 값을 저장합니다."""
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+        self._count("writes")
+
+    def clear(self) -> None:
+        """모든 계층의 항목을 삭제합니다. (통계는 유지)"""
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """적중/실패 횟수와 계층별 항목 수를 반환합니다."""
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        stats["memory_entries"] = len(self.memory)
+        if self.disk is not None:
+            stats["disk_entries"] = len(self.disk)
+        return stats
@@ -0,0 +1,92 @@
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.core.tokens import estimate_tokens
+
+# `transform_prompt(use_multi_call=...)`에 전달하면 입력 복잡도에 따라 호출 방식을 고르는 값
+AUTO_ROUTE = "auto"
+
+# 이 점수 이상이면 다중 호출 방식을 사용
+ROUTE_THRESHOLD = 2.0
+
+# 단일 호출 응답에 이 섹션 중 하나라도 없으면 다중 호출 방식으로 다시 변환 (출력 형식, 분석은 선택 섹션)
+REQUIRED_SECTIONS = ("expert_role", "instructions", "response_style", "reminders")
+
+# 입력 길이(추정 토큰 수) 기준과 점수
+LENGTH_STEPS = ((80, 1.0), (200, 1.0))
+
+# 웹 인터페이스가 입력 뒤에 덧붙이는 커스텀 옵션 줄 (형식 요구사항 추출 단계가 따로 처리하는 정보)
+OPTION_LINE_RE = re.compile(r"^\s*(범위|출력 형식|특별 요구사항)\s*:", re.MULTILINE)
+
+# (이유, 점수, 패턴): 입력에 나타나면 각 항목의 점수를 한 번씩 더함
+CUE_PATTERNS: Tuple[Tuple[str, float, "re.Pattern"], ...] = (
+    ("형식 요구", 0.5, re.compile(r"단계별|표로|표 형식|목록|비교|장단점|체크리스트|로드맵|다이어그램|"
+                               r"step[- ]by[- ]step|compare|table|checklist", re.IGNORECASE)),
+    ("심층 요구", 0.5, re.compile(r"분석|전략|설계|계획|사례|근거|평가|심층|자세히|상세|"
+                               r"analy[sz]|strateg|case stud|in[- ]depth", re.IGNORECASE)),
+    ("범위 단서", 0.5, re.compile(r"\d{4}년|최근 ?\d+|이후|이전|국내|해외|시장|since \d{4}|market", re.IGNORECASE)),
+    ("요구사항", 0.5, re.compile(r"중점|반드시|포함|제외|고려|제약|조건|must|include|exclude", re.IGNORECASE)),
+)
+
+# 문장 경계 (여러 요청이 한 입력에 들어 있는지 판단)
+SENTENCE_RE = re.compile(r"[^.?!\n]+[.?!\n]?")
+
+
+@dataclass
+class RouteDecision:
+    """입력 복잡도에 따른 호출 방식 결정
+
+    Attributes:
+        use_multi_call: 다중 호출 방식을 사용할지 여부
+        score: 복잡도 점수 (`ROUTE_THRESHOLD` 이상이면 다중 호출)
+        reasons: 점수에 반영된 단서 목록
+    """
+    use_multi_call: bool
+    score: float
+    reasons: List[str] = field(default_factory=list)
+
+
+def route_input(user_input: str, threshold: float = ROUTE_THRESHOLD) -> RouteDecision:
+    """API를 호출하지 않고 입력의 길이와 단서로 호출 방식을 고릅니다.
+
+    짧고 단순한 요청은 단일 호출로도 충분한 품질을 얻을 수 있으므로, 범위/형식/요구사항 단서가
+    여러 개 있거나 입력이 길어 입력 분석과 형식 요구사항 추출이 도움이 되는 경우에만
+    다중 호출 방식을 선택합니다.
+
+    Args:
+        user_input: 사용자 입력 (웹 인터페이스가 덧붙인 커스텀 옵션 포함)
+        threshold: 다중 호출 방식을 선택할 최소 점수
+
+    Returns:
+        RouteDecision: 선택한 호출 방식과 점수, 근거
+    """
+    score = 0.0
+    reasons: List[str] = []
+
+    tokens = estimate_tokens(user_input)
+    for limit, points in LENGTH_STEPS:
+        if tokens > limit:
+            score += points
+            reasons.append(f"긴 입력(>{limit}토큰)")
+
+    for match in OPTION_LINE_RE.finditer(user_input):
+        score += 1.0
+        reasons.append(f"{match.group(1)} 지정")
+
+    for reason, points, pattern in CUE_PATTERNS:
+        if pattern.search(user_input):
+            score += points
+            reasons.append(reason)
+
+    sentences = [s for s in SENTENCE_RE.findall(OPTION_LINE_RE.split(user_input)[0]) if s.strip()]
+    if len(sentences) >= 3:
+        score += 1.0
+        reasons.append(f"여러 요청({len(sentences)}문장)")
+
+    return RouteDecision(use_multi_call=score >= threshold, score=score, reasons=reasons)
+
+
+def missing_sections(sections: Dict[str, Optional[str]], required: Sequence[str] = REQUIRED_SECTIONS) -> List[str]:
+    """단일 호출 응답에서 비어 있는 필수 섹션 키를 반환합니다."""
+    return [key for key in required if not sections.get(key)]
@@ -0,0 +1,290 @@
+import random
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+from src.core.deadline import DeadlineExceededError, current_deadline
+
+T = TypeVar("T")
+
+# 재시도할 HTTP 상태 코드 (요청 시간 초과, 충돌, 속도 제한, 서버 오류)
+RETRYABLE_STATUS_CODES = (408, 409, 429, 500, 502, 503, 504)
+
+# 상태 코드 없이 발생하는 재시도 가능한 OpenAI SDK 예외 (네트워크 오류, 시간 초과)
+RETRYABLE_ERROR_NAMES = ("APIConnectionError", "APITimeoutError")
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """모델별 요청 속도 제한
+
+    Attributes:
+        rpm: 분당 최대 요청 수 (None이면 제한 없음)
+        tpm: 분당 최대 토큰 수 (None이면 제한 없음)
+    """
+    rpm: Optional[int] = None
+    tpm: Optional[int] = None
+
+
+class TokenBucket:
+    """분당 예산을 일정한 속도로 다시 채우는 토큰 버킷 (스레드 안전)"""
+
+    def __init__(self, per_minute: float, clock: Callable[[], float] = time.monotonic):
+        """초기화 함수
+
+        Args:
+            per_minute: 분당 허용량 (버킷 용량)
+            clock: 현재 시각(초)을 반환하는 함수
+        """
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """허용량을 예약하고, 사용 가능해질 때까지 기다려야 할 시간(초)을 반환합니다.
+
+        잔량이 부족하면 음수로 빌려 쓰므로 동시에 예약한 호출들은 차례로 더 오래 기다리게 됩니다.
+        용량보다 큰 요청은 용량만큼만 예약합니다.
+        """
+        with self._lock:
+            self._refill()
+            self._tokens -= min(float(amount), self.capacity)
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def pause(self, seconds: float) -> None:
+        """다음 예약들이 최소 `seconds`초를 기다리도록 잔량을 줄입니다. (Retry-After 반영)"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, -seconds * self.rate)
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """일시적인 오류라서 다시 시도할 만한 예외인지 확인합니다."""
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+    return any(cls.__name__ in RETRYABLE_ERROR_NAMES for cls in type(error).__mro__)
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """오류 응답의 `retry-after-ms` 또는 `Retry-After` 헤더에서 대기 시간(초)을 읽습니다."""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms") is not None:
+            return max(0.0, float(headers["retry-after-ms"]) / 1000)
+        value = headers.get("retry-after")
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            # HTTP 날짜 형식
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RequestScheduler:
+    """모든 OpenAI 호출에 공통으로 적용하는 요청 스케줄러
+
+    모델별 분당 요청 수(RPM)와 분당 토큰 수(TPM) 예산을 토큰 버킷으로 지키고,
+    속도 제한(429), 일시적인 서버 오류(5xx), 네트워크 오류는 지터가 적용된
+    지수 백오프로 다시 시도합니다. 서버가 `Retry-After`를 보내면 그 시간을 우선하며,
+    429 응답을 받으면 같은 모델의 다른 요청들도 함께 기다리게 합니다.
+
+    동기 엔진(스레드)과 비동기 엔진에서 하나의 스케줄러를 함께 사용할 수 있습니다.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, RateLimit]] = None, default_limit: Optional[RateLimit] = None,
+                 max_retries: int = 4, base_delay: float = 0.5, max_delay: float = 30.0,
+                 expected_completion_tokens: int = 1000, sleep: Callable[[float], None] = time.sleep,
+                 clock: Callable[[], float] = time.monotonic, rng: Optional[random.Random] = None):
+        """초기화 함수
+
+        Args:
+            limits: 모델 이름별 속도 제한
+            default_limit: `limits`에 없는 모델에 적용할 속도 제한 (없으면 제한 없음)
+            max_retries: 요청 하나당 최대 재시도 횟수
+            base_delay: 첫 재시도의 최대 대기 시간(초). 재시도마다 두 배씩 증가
+            max_delay: 백오프 대기 시간의 상한(초)
+            expected_completion_tokens: TPM 예산 계산 시 요청마다 더할 예상 출력 토큰 수
+            sleep: 동기 호출에서 대기할 때 사용할 함수
+            clock: 현재 시각(초)을 반환하는 함수
+            rng: 지터 계산에 사용할 난수 생성기
+        """
+        self.limits = dict(limits or {})
+        self.default_limit = default_limit or RateLimit()
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.expected_completion_tokens = expected_completion_tokens
+        self._sleep = sleep
+        self._clock = clock
+        self._rng = rng or random.Random()
+        self._buckets: Dict[str, Tuple[Optional[TokenBucket], Optional[TokenBucket]]] = {}
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "retries": 0, "throttled": 0, "throttle_wait": 0.0}
+
+    def _model_buckets(self, model: str) -> Tuple[Optional[TokenBucket], Optional[TokenBucket]]:
+        """모델의 (요청 수 버킷, 토큰 수 버킷)을 반환합니다. (없으면 생성)"""
+        with self._lock:
+            buckets = self._buckets.get(model)
+            if buckets is None:
+                limit = self.limits.get(model, self.default_limit)
+                buckets = (
+                    TokenBucket(limit.rpm, self._clock) if limit.rpm else None,
+                    TokenBucket(limit.tpm, self._clock) if limit.tpm else None,
+                )
+                self._buckets[model] = buckets
+            return buckets
+
+    def _record(self, **counts) -> None:
+        with self._lock:
+            for name, value in counts.items():
+                self._stats[name] += value
+
+    def reserve(self, model: str, prompt_tokens: int) -> float:
+        """요청 하나에 대한 예산을 예약하고 기다려야 할 시간(초)을 반환합니다.
+
+        Args:
+            model: 요청할 모델
+            prompt_tokens: 추정 입력 토큰 수
+
+        Returns:
+            float: 요청을 보내기 전에 기다려야 할 시간(초)
+        """
+        requests_bucket, tokens_bucket = self._model_buckets(model)
+        delay = 0.0
+        if requests_bucket is not None:
+            delay = max(delay, requests_bucket.reserve(1))
+        if tokens_bucket is not None:
+            delay = max(delay, tokens_bucket.reserve(prompt_tokens + self.expected_completion_tokens))
+        self._record(requests=1, throttled=1 if delay > 0 else 0, throttle_wait=delay)
+        return delay
+
+    def retry_delay(self, model: str, attempt: int, error: BaseException) -> Optional[float]:
+        """실패한 요청을 다시 시도하기 전에 기다릴 시간(초)을 반환합니다.
+
+        Args:
+            model: 요청한 모델
+            attempt: 지금까지의 재시도 횟수 (첫 실패이면 0)
+            error: 발생한 예외
+
+        Returns:
+            Optional[float]: 대기 시간(초). 다시 시도하지 않아야 하면 None
+        """
+        if attempt >= self.max_retries or not is_retryable_error(error):
+            return None
+        delay = retry_after_seconds(error)
+        if delay is None:
+            # 전체 지터(full jitter) 지수 백오프
+            delay = self._rng.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if getattr(error, "status_code", None) == 429:
+            # 속도 제한에 걸리면 같은 모델의 다른 요청도 함께 기다리도록 함
+            requests_bucket, _ = self._model_buckets(model)
+            if requests_bucket is not None:
+                requests_bucket.pause(delay)
+        self._record(retries=1)
+        return delay
+
+    @staticmethod
+    def _deadline_wait(seconds: float, error: Optional[BaseException] = None) -> float:
+        """기다린 뒤에도 현재 요청의 마감 시간 전에 요청을 보낼 수 있는지 확인합니다.
+
+        Args:
+            seconds: 기다려야 할 시간(초)
+            error: 재시도를 기다리는 경우 마지막으로 발생한 예외
+
+        Returns:
+            float: 기다릴 시간(초, 시간 예산이 있으면 항상 남은 시간보다 짧음)
+
+        Raises:
+            DeadlineExceededError: 기다리는 동안 마감 시간이 지나는 경우 (기다리지 않고 바로 발생)
+        """
+        deadline = current_deadline()
+        if deadline is None or seconds < deadline.remaining():
+            return seconds
+        raise DeadlineExceededError(
+            f"시간 예산({deadline.budget:g}초) 안에 요청을 보낼 수 없습니다. (대기 시간 {seconds:.2f}초)"
+        ) from error
+
+    def call(self, model: str, prompt_tokens: int, request: Callable[[], T],
+             on_retry: Optional[Callable[[BaseException, float], None]] = None) -> T:
+        """속도 제한과 재시도 정책을 적용하여 동기 요청을 실행합니다.
+
+        Args:
+            model: 요청할 모델
+            prompt_tokens: 추정 입력 토큰 수
+            request: 실제 API 호출을 수행하는 함수
+            on_retry: 다시 시도하기 전에 (예외, 대기 시간)으로 호출할 함수
+
+        Returns:
+            요청 함수의 반환값
+        """
+        attempt = 0
+        while True:
+            wait_seconds = self.reserve(model, prompt_tokens)
+            if wait_seconds > 0:
+                self._sleep(self._deadline_wait(wait_seconds))
+            try:
+                return request()
+            except Exception as e:
+                delay = self.retry_delay(model, attempt, e)
+                if delay is None:
+                    raise
+                delay = self._deadline_wait(delay, e)
+                attempt += 1
+                if on_retry is not None:
+                    on_retry(e, delay)
+                self._sleep(delay)
+
+    async def acall(self, model: str, prompt_tokens: int, request: Callable[[], Awaitable[T]],
+                    on_retry: Optional[Callable[[BaseException, float], None]] = None) -> T:
+        """속도 제한과 재시도 정책을 적용하여 비동기 요청을 실행합니다.
+
+        Args:
+            model: 요청할 모델
+            prompt_tokens: 추정 입력 토큰 수
+            request: 실제 API 호출 코루틴을 반환하는 함수
+            on_retry: 다시 시도하기 전에 (예외, 대기 시간)으로 호출할 함수
+
+        Returns:
+            요청 코루틴의 결과
+        """
+        import asyncio
+
+        attempt = 0
+        while True:
+            wait_seconds = self.reserve(model, prompt_tokens)
+            if wait_seconds > 0:
+                await asyncio.sleep(self._deadline_wait(wait_seconds))
+            try:
+                return await request()
+            except Exception as e:
+                delay = self.retry_delay(model, attempt, e)
+                if delay is None:
+                    raise
+                delay = self._deadline_wait(delay, e)
+                attempt += 1
+                if on_retry is not None:
+                    on_retry(e, delay)
+                await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, float]:
+        """요청 수, 재시도 횟수, 속도 제한으로 대기한 횟수와 총 대기 시간(초)을 반환합니다."""
+        with self._lock:
+            return dict(self._stats)
@@ -0,0 +1,155 @@
+import json
+from dataclasses import asdict, dataclass, field, fields
+from typing import Any, Dict, List
+
+
+class SchemaValidationError(ValueError):
+    """모델 응답이 요청한 JSON 스키마를 만족하지 않는 경우 발생하는 예외"""
+
+
+def _json_type(annotation) -> Dict[str, Any]:
+    """데이터클래스 필드 타입을 JSON 스키마 타입으로 변환합니다."""
+    if annotation in (List[str], list):
+        return {"type": "array", "items": {"type": "string"}}
+    if isinstance(annotation, type) and issubclass(annotation, StructuredOutput):
+        return annotation.json_schema()
+    return {"type": "string"}
+
+
+class StructuredOutput:
+    """JSON 스키마 기반 구조화 출력 데이터클래스의 공통 기능
+
+    하위 데이터클래스의 필드 정의로부터 엄격한(strict) JSON 스키마를 만들고,
+    모델 응답을 검증하여 인스턴스로 변환합니다.
+    """
+
+    # OpenAI response_format에 사용할 스키마 이름
+    schema_name = "structured_output"
+
+    @classmethod
+    def json_schema(cls) -> Dict[str, Any]:
+        """필드 정의로부터 JSON 스키마를 생성합니다."""
+        properties = {}
+        for f in fields(cls):
+            prop = _json_type(f.type)
+            if f.metadata.get("description"):
+                prop["description"] = f.metadata["description"]
+            properties[f.name] = prop
+        return {
+            "type": "object",
+            "properties": properties,
+            "required": [f.name for f in fields(cls)],
+            "additionalProperties": False,
+        }
+
+    @classmethod
+    def response_format(cls) -> Dict[str, Any]:
+        """chat.completions API의 `response_format` 인자를 반환합니다."""
+        return {
+            "type": "json_schema",
+            "json_schema": {"name": cls.schema_name, "strict": True, "schema": cls.json_schema()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Any):
+        """딕셔너리를 검증하여 인스턴스로 변환합니다.
+
+        Raises:
+            SchemaValidationError: 필수 필드가 없거나 타입이 맞지 않는 경우
+        """
+        if not isinstance(data, dict):
+            raise SchemaValidationError(f"JSON 객체가 아닙니다: {type(data).__name__}")
+        values = {}
+        problems = []
+        for f in fields(cls):
+            if f.name not in data:
+                problems.append(f"'{f.name}' 필드가 없습니다")
+                continue
+            value = data[f.name]
+            if isinstance(f.type, type) and issubclass(f.type, StructuredOutput):
+                try:
+                    values[f.name] = f.type.from_dict(value)
+                except SchemaValidationError as e:
+                    problems.append(f"'{f.name}' 필드: {e}")
+                continue
+            if _json_type(f.type)["type"] == "array":
+                if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+                    problems.append(f"'{f.name}' 필드는 문자열 배열이어야 합니다")
+                    continue
+            elif not isinstance(value, str):
+                problems.append(f"'{f.name}' 필드는 문자열이어야 합니다")
+                continue
+            values[f.name] = value
+        if problems:
+            raise SchemaValidationError(", ".join(problems))
+        return cls(**values)
+
+    @classmethod
+    def parse(cls, content: str):
+        """모델 응답 텍스트를 JSON으로 파싱하고 검증합니다.
+
+        Raises:
+            SchemaValidationError: JSON이 아니거나 스키마를 만족하지 않는 경우
+        """
+        try:
+            data = json.loads(content)
+        except (TypeError, json.JSONDecodeError) as e:
+            raise SchemaValidationError(f"올바른 JSON이 아닙니다: {e}") from e
+        return cls.from_dict(data)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """기존 `analyze_input` 반환 형식과 같은 딕셔너리로 변환합니다."""
+        return asdict(self)
+
+
+@dataclass
+class InputAnalysis(StructuredOutput):
+    """`analyze_input`의 구조화된 분석 결과"""
+    schema_name = "input_analysis"
+
+    topic: str = field(metadata={"description": "입력의 주요 주제"})
+    domain: str = field(metadata={"description": "관련된 전문 분야"})
+    purpose: str = field(metadata={"description": "사용자가 원하는 정보 또는 도움의 종류"})
+    keywords: List[str] = field(metadata={"description": "입력에서 중요한 핵심 단어들 (최대 5개)"})
+    expertise_level: str = field(metadata={"description": "필요한 전문성 수준 (초급, 중급, 고급)"})
+    scope: str = field(metadata={"description": "특정 범위, 시간적/공간적 제약 (없으면 \"광범위\")"})
+    search_terms: List[str] = field(metadata={"description": "사용자가 명시적으로 검색하거나 강조한 용어들"})
+    output_format: str = field(metadata={"description": "사용자가 요청한 출력 형식이나 구조 (없으면 빈 문자열)"})
+    special_requirements: str = field(metadata={"description": "기타 특별 요구사항 (없으면 빈 문자열)"})
+
+
+@dataclass
+class FormatRequirements(StructuredOutput):
+    """`extract_format_requirements`의 구조화된 추출 결과"""
+    schema_name = "format_requirements"
+
+    format_type: str = field(metadata={"description": "요청된 형식 유형 (예: 목록, 에세이, 단계별 가이드, 비교표)"})
+    sections: List[str] = field(metadata={"description": "명시적으로 요청된 섹션이나 구성 요소"})
+    style: str = field(metadata={"description": "언급된 스타일 (예: 학술적, 대화형, 설명적)"})
+    special_requirements: str = field(metadata={"description": "기타 형식 관련 특별 요청사항"})
+
+
+@dataclass
+class AnalysisWithFormat(InputAnalysis):
+    """입력 분석과 형식 요구사항을 한 번에 추출한 결과"""
+    schema_name = "input_analysis_with_format"
+
+    format_requirements: FormatRequirements = field(metadata={"description": "사용자 입력의 형식 요구사항"})
+
+
+def build_repair_messages(messages: List[Dict], content: str, error: Exception) -> List[Dict]:
+    """스키마를 만족하지 않은 응답을 한 번 고쳐 받기 위한 메시지를 구성합니다.
+
+    Args:
+        messages: 처음 보낸 메시지 목록
+        content: 스키마를 만족하지 않은 모델 응답
+        error: 검증 오류
+
+    Returns:
+        List[Dict]: 수정 요청을 덧붙인 메시지 목록
+    """
+    return list(messages) + [
+        {"role": "assistant", "content": content or ""},
+        {"role": "user", "content": f"이전 응답이 요구된 JSON 스키마를 만족하지 않습니다 ({error}). "
+                                    "설명 없이 스키마에 맞는 JSON 객체만 다시 출력하세요."},
+    ]
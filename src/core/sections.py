@@ -0,0 +1,187 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+# 섹션 키별 헤더 이름 (단일 호출 시스템 메시지가 `### 분석:` 형식으로 요청하는 이름)
+SECTION_LABELS = {
+    "analysis": "분석",
+    "expert_role": "전문가 역할",
+    "instructions": "지시사항",
+    "response_style": "응답 스타일",
+    "reminders": "주요 고려사항",
+    "output_format": "출력 형식",
+}
+
+SECTION_KEYS = tuple(SECTION_LABELS)
+
+_LABEL_LOOKUP = {label: key for key, label in SECTION_LABELS.items()}
+
+# 헤더 후보 줄: 시스템 메시지가 요청하는 수준의 마크다운 제목(`###`)으로 시작하는 줄
+# (`####` 이하의 하위 제목과 `#`, `##` 제목은 본문으로 유지)
+HEADER_LINE_RE = re.compile(r"^[ \t]*###[ \t]+(?P<text>[^\n]*)$", re.MULTILINE)
+
+# 헤더 이름 뒤에 오는 콜론과 닫는 굵은 글씨 표시
+_HEADING_COLON_RE = re.compile(r"[:：](?:\*\*)?[ \t]*")
+
+# 헤더 이름 정규화: 번호("1.", "2)")와 괄호 설명("(선택적)") 제거
+_NUMBERING_RE = re.compile(r"^\d+[.)][ \t]*")
+_PARENTHETICAL_RE = re.compile(r"[(（][^)）]*[)）]")
+
+# 줄이 끝나기 전에도 헤더가 될 수 있는지 판단하는 접두어
+_CANDIDATE_PREFIX_RE = re.compile(r"^[ \t]*(?:#|$)")
+
+
+def _lookup_section(name: str) -> Optional[str]:
+    """헤더 이름을 정규화하여 섹션 키를 찾습니다. (알 수 없는 이름은 None)"""
+    name = _NUMBERING_RE.sub("", name.strip().strip("*").strip())
+    name = _PARENTHETICAL_RE.sub("", name)
+    return _LABEL_LOOKUP.get(" ".join(name.split()))
+
+
+def _classify_header(text: str) -> Tuple[Optional[str], int]:
+    """`###` 제목 줄을 분류합니다.
+
+    Args:
+        text: 제목 표시 뒤의 줄 내용
+
+    Returns:
+        Tuple[Optional[str], int]: (섹션 키 또는 None, 본문 시작 위치)
+    """
+    colon = _HEADING_COLON_RE.search(text)
+    if colon:
+        return _lookup_section(text[:colon.start()]), colon.end()
+    return _lookup_section(text), len(text)
+
+
+class _SectionState:
+    """섹션 경계 판단 규칙 (일괄 파서와 스트리밍 파서가 공유)"""
+
+    def __init__(self):
+        self.key: Optional[str] = None
+
+    def transition(self, header: Tuple[Optional[str], int]) -> bool:
+        """헤더를 만났을 때 현재 섹션을 갱신합니다.
+
+        같은 섹션의 헤더가 다시 나오면 이후 내용을 처음 섹션 뒤에 이어 붙입니다.
+
+        Returns:
+            bool: 헤더가 섹션 경계이면 True (False이면 헤더 줄도 본문으로 취급)
+        """
+        key = header[0]
+        if key is None and self.key is None:
+            return False
+        # 알 수 없는 `###` 제목은 현재 섹션을 끝냄
+        self.key = key
+        return True
+
+
+def parse_sections(content: str) -> Dict[str, Optional[str]]:
+    """모델 응답을 섹션 헤더 경계로 한 번에 나눕니다.
+
+    시스템 메시지가 요청한 `### 분석:` 형식의 헤더를 기준으로 나누며, 헤더 이름의 번호(`### 1. 분석:`),
+    괄호 설명(`### 출력 형식(선택적):`), 굵은 글씨(`### **분석:**`), 빠진 콜론은 허용합니다.
+    컴파일된 정규식으로 헤더 후보 줄만 한 번 훑고, 섹션 내용은 문자열 슬라이스로 만듭니다.
+
+    Args:
+        content: 모델 응답 전체 텍스트
+
+    Returns:
+        Dict[str, Optional[str]]: 섹션 키별 내용 (앞뒤 공백 제거, 없는 섹션은 None)
+    """
+    parts: Dict[str, List[str]] = {}
+    state = _SectionState()
+    start = 0
+    for match in HEADER_LINE_RE.finditer(content):
+        header = _classify_header(match.group("text"))
+        current = state.key
+        if not state.transition(header):
+            continue
+        if current is not None:
+            parts.setdefault(current, []).append(content[start:match.start()])
+        start = match.start("text") + header[1]
+    if state.key is not None:
+        parts.setdefault(state.key, []).append(content[start:])
+    return {key: "".join(parts.get(key, [])).strip() or None for key in SECTION_KEYS}
+
+
+class SectionStreamParser:
+    """스트리밍 응답을 섹션 헤더 경계로 나누는 점진적 파서
+
+    토큰 조각을 `feed`로 전달하면 섹션별로 새로 확정된 텍스트를 돌려줍니다.
+    헤더일 수 있는 줄은 줄이 끝날 때까지 보류하고 나머지 텍스트는 즉시 내보내며,
+    `parse_sections`와 같은 헤더 규칙을 사용하므로 결과도 같습니다.
+    """
+
+    def __init__(self):
+        self._state = _SectionState()
+        self._line = ""
+        self._line_is_content = False
+        self._texts: Dict[str, List[str]] = {}
+
+    def _emit(self, text: str, events: List[Tuple[str, str]]) -> None:
+        """현재 섹션에 텍스트를 추가하고 이벤트를 기록합니다."""
+        key = self._state.key
+        if text and key is not None:
+            self._texts.setdefault(key, []).append(text)
+            events.append((key, text))
+
+    def _finish_line(self, line: str, events: List[Tuple[str, str]]) -> None:
+        """완성된 한 줄(줄바꿈 포함 가능)을 처리합니다."""
+        body = line[:-1] if line.endswith("\n") else line
+        match = HEADER_LINE_RE.match(body)
+        if match is None:
+            self._emit(line, events)
+            return
+        header = _classify_header(match.group("text"))
+        if not self._state.transition(header):
+            self._emit(line, events)
+            return
+        self._emit(line[match.start("text") + header[1]:], events)
+
+    def feed(self, delta: str) -> List[Tuple[str, str]]:
+        """새 텍스트 조각을 처리합니다.
+
+        Args:
+            delta: 스트림에서 새로 받은 텍스트
+
+        Returns:
+            List[Tuple[str, str]]: (섹션 키, 새로 확정된 텍스트) 목록
+        """
+        events: List[Tuple[str, str]] = []
+        while delta:
+            newline = delta.find("\n")
+            piece, delta = (delta, "") if newline == -1 else (delta[:newline + 1], delta[newline + 1:])
+
+            if self._line_is_content:
+                # 이미 본문으로 판정된 줄의 나머지는 바로 내보냄
+                self._emit(piece, events)
+            else:
+                self._line += piece
+                if not self._line.endswith("\n") and _CANDIDATE_PREFIX_RE.match(self._line):
+                    # 헤더일 수 있는 줄은 끝날 때까지 보류
+                    continue
+                if self._line.endswith("\n"):
+                    self._finish_line(self._line, events)
+                else:
+                    self._emit(self._line, events)
+                    self._line_is_content = True
+                self._line = ""
+
+            if piece.endswith("\n"):
+                self._line_is_content = False
+        return events
+
+    def close(self) -> List[Tuple[str, str]]:
+        """보류 중인 마지막 줄을 처리합니다.
+
+        Returns:
+            List[Tuple[str, str]]: (섹션 키, 새로 확정된 텍스트) 목록
+        """
+        events: List[Tuple[str, str]] = []
+        if self._line:
+            self._finish_line(self._line, events)
+            self._line = ""
+        return events
+
+    def sections(self) -> Dict[str, Optional[str]]:
+        """지금까지 받은 섹션별 텍스트를 반환합니다. (앞뒤 공백 제거, 없는 섹션은 None)"""
+        return {key: "".join(self._texts.get(key, [])).strip() or None for key in SECTION_KEYS}
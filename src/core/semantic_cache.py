@@ -0,0 +1,349 @@
+import math
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+# 요청 의미에 영향을 주지 않는 요청 어구 (단어 전체 또는 단어 끝에서 제거)
+FILLER_PHRASES = (
+    "부탁드립니다", "설명해주세요", "정리해주세요", "알려주세요", "설명해줘요", "알려줘요",
+    "설명해줘", "정리해줘", "알려줘", "해주세요", "부탁해요", "부탁해", "해줘요", "해줘", "주세요",
+    "대해서", "관해서", "대해", "관해", "대한", "관한", "좀", "please",
+)
+
+# 단어 끝에서 제거할 조사 (긴 것부터 비교)
+PARTICLES = tuple(sorted(
+    ("을", "를", "이", "가", "은", "는", "의", "에", "에서", "으로", "로", "와", "과", "도", "만",
+     "에게", "께서", "이랑", "랑", "하고"),
+    key=len, reverse=True,
+))
+
+# 단어 자체와 단어 안의 문자 n-gram 가중치
+WORD_WEIGHT = 3.0
+NGRAM_WEIGHT = 1.0
+NGRAM_SIZES = (2, 3)
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_NUMBER = re.compile(r"\d+")
+
+_numpy_module: Any = None
+
+
+def _load_numpy():
+    """NumPy를 처음 사용할 때 불러옵니다. 설치되어 있지 않으면 None을 반환합니다."""
+    global _numpy_module
+    if _numpy_module is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy_module = numpy
+    return _numpy_module or None
+
+
+def normalize_words(text: str) -> List[str]:
+    """입력을 비교용 단어 목록으로 정규화합니다.
+
+    유니코드 정규화(NFKC), 소문자 변환, 문장 부호 제거 후 "알려줘", "에 대해" 같은
+    요청 어구와 단어 끝의 조사를 제거합니다.
+
+    Args:
+        text: 사용자 입력
+
+    Returns:
+        List[str]: 정규화된 단어 목록
+    """
+    text = _PUNCTUATION.sub(" ", unicodedata.normalize("NFKC", text).lower())
+    words = []
+    for word in text.split():
+        if word in FILLER_PHRASES:
+            continue
+        for phrase in FILLER_PHRASES:
+            if word.endswith(phrase) and len(word) > len(phrase) + 1:
+                word = word[:-len(phrase)]
+                break
+        for particle in PARTICLES:
+            if word.endswith(particle) and len(word) - len(particle) >= 2:
+                word = word[:-len(particle)]
+                break
+        words.append(word)
+    return words
+
+
+def embed(words: List[str], dim: int = 1024) -> Dict[int, float]:
+    """단어 목록을 해시 기반 희소 벡터(L2 정규화)로 변환합니다.
+
+    단어 자체와 단어 안의 문자 2/3-gram을 부호 있는 해시(feature hashing)로
+    `dim`차원에 누적하므로, 네트워크나 학습된 모델 없이 프로세스가 달라도 같은 벡터를 얻습니다.
+
+    Args:
+        words: `normalize_words()`로 정규화한 단어 목록
+        dim: 벡터 차원 수
+
+    Returns:
+        Dict[int, float]: {차원 인덱스: 값}
+    """
+    vector: Dict[int, float] = {}
+
+    def add(feature: str, weight: float) -> None:
+        h = zlib.crc32(feature.encode("utf-8"))
+        index = h % dim
+        vector[index] = vector.get(index, 0.0) + (weight if h & 0x80000000 else -weight)
+
+    for word in words:
+        add("w:" + word, WORD_WEIGHT)
+        padded = f"<{word}>"
+        for n in NGRAM_SIZES:
+            for i in range(len(padded) - n + 1):
+                add(padded[i:i + n], NGRAM_WEIGHT)
+
+    norm = math.sqrt(sum(value * value for value in vector.values()))
+    if norm == 0:
+        return {}
+    return {index: value / norm for index, value in vector.items()}
+
+
+class _Entry:
+    """의미 캐시 항목"""
+    __slots__ = ("scope", "key", "numbers", "text", "prompt", "accessed_at", "vector")
+
+    def __init__(self, scope: str, key: str, numbers: Tuple[str, ...], text: str, prompt: str,
+                 accessed_at: float, vector: Dict[int, float]):
+        self.scope = scope
+        self.key = key
+        self.numbers = numbers
+        self.text = text
+        self.prompt = prompt
+        self.accessed_at = accessed_at
+        self.vector = vector
+
+
+class SemanticCache:
+    """표현만 조금 다른 입력에 변환 결과를 재사용하는 의미 기반 캐시 (스레드 안전)
+
+    입력을 정규화해 해시 기반 벡터로 바꾸고, 같은 범위(`scope`, 모델/변환 방식 등)에 저장된
+    입력 중 코사인 유사도가 `threshold` 이상인 가장 비슷한 입력의 변환 결과를 반환합니다.
+    입력에 포함된 숫자(연도, 개수 등)가 다르면 유사도와 관계없이 다른 요청으로 봅니다.
+
+    NumPy가 설치되어 있으면 항목 벡터를 행렬로 보관해 한 번의 행렬 곱으로 검색하고,
+    없으면 순수 파이썬으로 검색합니다. `path`를 지정하면 SQLite 파일에 항목을 저장하여
+    프로세스를 다시 시작해도 유지됩니다.
+    """
+
+    def __init__(self, threshold: float = 0.9, max_entries: int = 1024, dim: int = 1024,
+                 path: Optional[str] = None, use_numpy: Optional[bool] = None):
+        """초기화 함수
+
+        Args:
+            threshold: 캐시 적중으로 볼 최소 코사인 유사도 (0~1)
+            max_entries: 보관할 최대 항목 수 (초과 시 가장 오래 사용하지 않은 항목부터 제거)
+            dim: 입력 벡터의 차원 수
+            path: 항목을 저장할 SQLite 파일 경로 (없으면 메모리에만 보관)
+            use_numpy: NumPy 사용 여부 (None이면 설치되어 있을 때 사용)
+        """
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.dim = dim
+        self.path = path
+        self._np = _load_numpy() if use_numpy in (None, True) else None
+        if use_numpy and self._np is None:
+            raise ImportError("use_numpy=True에는 NumPy가 필요합니다. (pip install numpy)")
+        self._entries: List[Optional[_Entry]] = []
+        self._slots: Dict[Tuple[str, str], int] = {}
+        self._matrix = self._np.zeros((0, dim), dtype=self._np.float32) if self._np is not None else None
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "exact_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        self._conn = None
+        if path:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            with self._conn:
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS semantic_cache ("
+                    "scope TEXT NOT NULL, key TEXT NOT NULL, text TEXT NOT NULL, prompt TEXT NOT NULL, "
+                    "accessed_at REAL NOT NULL, PRIMARY KEY (scope, key))"
+                )
+            self._load()
+
+    def _load(self) -> None:
+        """저장 파일에서 최근에 사용한 항목부터 `max_entries`개를 불러옵니다."""
+        rows = self._conn.execute(
+            "SELECT scope, text, prompt, accessed_at FROM semantic_cache ORDER BY accessed_at DESC LIMIT ?",
+            (self.max_entries,),
+        ).fetchall()
+        for scope, text, prompt, accessed_at in reversed(rows):
+            self._insert(scope, text, prompt, accessed_at)
+        # 불러오지 못한 오래된 항목은 파일에서도 제거
+        with self._conn:
+            self._conn.execute(
+                "DELETE FROM semantic_cache WHERE rowid IN ("
+                "SELECT rowid FROM semantic_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def _similarity(self, vector: Dict[int, float]) -> List[Tuple[float, int]]:
+        """저장된 항목과의 유사도가 `threshold` 이상인 (유사도, 슬롯) 목록을 높은 순으로 반환합니다."""
+        if self._np is not None:
+            np = self._np
+            if not len(self._entries):
+                return []
+            query = np.zeros(self.dim, dtype=np.float32)
+            for index, value in vector.items():
+                query[index] = value
+            scores = self._matrix[:len(self._entries)] @ query
+            slots = np.flatnonzero(scores >= self.threshold)
+            candidates = [(float(scores[slot]), int(slot)) for slot in slots]
+        else:
+            candidates = []
+            for slot, entry in enumerate(self._entries):
+                if entry is None:
+                    continue
+                score = sum(value * entry.vector.get(index, 0.0) for index, value in vector.items())
+                if score >= self.threshold:
+                    candidates.append((score, slot))
+        candidates.sort(reverse=True)
+        return candidates
+
+    def _touch(self, entry: _Entry) -> None:
+        entry.accessed_at = time.time()
+        if self._conn is not None:
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE semantic_cache SET accessed_at = ? WHERE scope = ? AND key = ?",
+                    (entry.accessed_at, entry.scope, entry.key),
+                )
+
+    @property
+    def persistent(self) -> bool:
+        """SQLite 파일에 항목을 저장하여 조회와 저장이 파일 I/O를 하는지 여부 (비동기 엔진은 스레드에서 호출)"""
+        return self._conn is not None
+
+    def lookup(self, text: str, scope: str = "") -> Optional[str]:
+        """가장 비슷한 입력의 변환 결과를 반환합니다. 비슷한 입력이 없으면 None을 반환합니다.
+
+        Args:
+            text: 사용자 입력
+            scope: 검색 범위 (모델, temperature, 변환 방식 등 결과에 영향을 주는 설정)
+
+        Returns:
+            Optional[str]: 캐시된 변환 결과
+        """
+        words = normalize_words(text)
+        key = " ".join(words)
+        with self._lock:
+            slot = self._slots.get((scope, key))
+            if slot is not None:
+                entry = self._entries[slot]
+                self._touch(entry)
+                self._stats["hits"] += 1
+                self._stats["exact_hits"] += 1
+                return entry.prompt
+
+            numbers = tuple(_NUMBER.findall(key))
+            for _, slot in self._similarity(embed(words, self.dim)):
+                entry = self._entries[slot]
+                if entry is not None and entry.scope == scope and entry.numbers == numbers:
+                    self._touch(entry)
+                    self._stats["hits"] += 1
+                    return entry.prompt
+            self._stats["misses"] += 1
+            return None
+
+    def store(self, text: str, prompt: str, scope: str = "") -> None:
+        """변환 결과를 저장합니다.
+
+        Args:
+            text: 사용자 입력
+            prompt: 변환된 프롬프트
+            scope: 저장 범위 (`lookup()`과 같은 값)
+        """
+        now = time.time()
+        with self._lock:
+            key = self._insert(scope, text, prompt, now)
+            self._stats["writes"] += 1
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO semantic_cache (scope, key, text, prompt, accessed_at) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (scope, key, text, prompt, now),
+                    )
+
+    def _insert(self, scope: str, text: str, prompt: str, accessed_at: float) -> str:
+        """항목을 메모리 색인에 추가하고 정규화된 키를 반환합니다. (잠금을 잡은 상태에서 호출)"""
+        words = normalize_words(text)
+        key = " ".join(words)
+        vector = embed(words, self.dim)
+        entry = _Entry(scope, key, tuple(_NUMBER.findall(key)), text, prompt, accessed_at, vector)
+
+        slot = self._slots.get((scope, key))
+        if slot is None:
+            if len(self._entries) < self.max_entries:
+                slot = len(self._entries)
+                self._entries.append(None)
+                if self._np is not None and slot >= len(self._matrix):
+                    # 행렬 용량을 두 배씩 늘려 항목을 추가할 때마다 복사하지 않도록 함
+                    grown = self._np.zeros((min(self.max_entries, max(16, 2 * len(self._matrix))), self.dim),
+                                           dtype=self._np.float32)
+                    grown[:len(self._matrix)] = self._matrix
+                    self._matrix = grown
+            else:
+                slot = self._evict()
+            self._slots[(scope, key)] = slot
+        self._entries[slot] = entry
+        if self._np is not None:
+            row = self._matrix[slot]
+            row[:] = 0
+            for index, value in vector.items():
+                row[index] = value
+        return key
+
+    def _evict(self) -> int:
+        """가장 오래 사용하지 않은 항목을 제거하고 빈 슬롯을 반환합니다."""
+        slot = min(
+            (i for i, entry in enumerate(self._entries) if entry is not None),
+            key=lambda i: self._entries[i].accessed_at,
+        )
+        entry = self._entries[slot]
+        del self._slots[(entry.scope, entry.key)]
+        self._entries[slot] = None
+        self._stats["evictions"] += 1
+        if self._conn is not None:
+            with self._conn:
+                self._conn.execute(
+                    "DELETE FROM semantic_cache WHERE scope = ? AND key = ?", (entry.scope, entry.key)
+                )
+        return slot
+
+    def clear(self) -> None:
+        """모든 항목을 삭제합니다. (통계는 유지)"""
+        with self._lock:
+            self._entries.clear()
+            self._slots.clear()
+            if self._np is not None:
+                self._matrix = self._np.zeros((0, self.dim), dtype=self._np.float32)
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute("DELETE FROM semantic_cache")
+
+    def close(self) -> None:
+        """저장 파일 연결을 닫습니다."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> Dict[str, Any]:
+        """적중(정규화 후 완전 일치 포함)/실패 횟수, 저장/제거 횟수와 항목 수를 반환합니다."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._slots)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        stats["backend"] = "numpy" if self._np is not None else "python"
+        return stats
+
+    def __len__(self) -> int:
+        return len(self._slots)
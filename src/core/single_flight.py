@@ -0,0 +1,173 @@
+import threading
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+if TYPE_CHECKING:
+    import asyncio
+
+T = TypeVar("T")
+
+
+class FlightAbortedError(RuntimeError):
+    """같은 요청을 처리하던 호출이 결과 없이 중단된 경우 (작업 취소, 스트림 소비 중단 등)
+
+    기다리던 호출은 이 예외를 받으면 직접 요청을 처리합니다.
+    """
+
+
+def _shared_error(error: BaseException) -> BaseException:
+    """기다리던 호출에 전달할 예외를 고릅니다.
+
+    일반 예외(API 오류 등)는 그대로 전달하고, 취소나 인터럽트처럼 요청 자체의 실패가 아닌
+    중단은 `FlightAbortedError`로 바꿔 기다리던 호출이 직접 처리하도록 합니다.
+    """
+    if isinstance(error, Exception):
+        return error
+    return FlightAbortedError(f"같은 요청을 처리하던 호출이 중단되었습니다: {type(error).__name__}")
+
+
+class SingleFlight:
+    """같은 키의 동시 요청을 하나의 실행으로 합치는 단일 비행(single-flight) 그룹 (스레드 안전)
+
+    먼저 도착한 호출(리더)만 실제로 실행하고, 실행 중에 같은 키로 들어온 호출은
+    리더의 결과(또는 예외)를 함께 받습니다. 실행이 끝나면 키를 해제하므로
+    결과를 보관하는 캐시와 달리 동시에 진행 중인 요청만 합칩니다.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {"leaders": 0, "coalesced": 0}
+
+    def claim(self, key: Hashable) -> Tuple[Future, bool]:
+        """키에 대한 실행 권한을 얻습니다.
+
+        Args:
+            key: 요청 키
+
+        Returns:
+            Tuple[Future, bool]: (결과를 받을 Future, 리더 여부). 리더이면 실행을 마친 뒤
+                                 반드시 `resolve()`를 호출해야 합니다.
+        """
+        with self._lock:
+            future = self._flights.get(key)
+            if future is not None:
+                self._stats["coalesced"] += 1
+                return future, False
+            future = self._flights[key] = Future()
+            self._stats["leaders"] += 1
+            return future, True
+
+    def resolve(self, key: Hashable, future: Future, result: Any = None,
+                error: Optional[BaseException] = None) -> None:
+        """리더의 실행 결과를 기다리던 호출에 전달하고 키를 해제합니다."""
+        with self._lock:
+            if self._flights.get(key) is future:
+                del self._flights[key]
+        if error is not None:
+            future.set_exception(_shared_error(error))
+        else:
+            future.set_result(result)
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> Tuple[T, bool]:
+        """같은 키로 진행 중인 실행이 있으면 그 결과를 기다리고, 없으면 직접 실행합니다.
+
+        Args:
+            key: 요청 키
+            fn: 실제 작업을 수행하는 함수
+
+        Returns:
+            Tuple[T, bool]: (결과, 직접 실행했는지 여부)
+        """
+        future, leader = self.claim(key)
+        if not leader:
+            try:
+                return future.result(), False
+            except FlightAbortedError:
+                return fn(), True
+        try:
+            result = fn()
+        except BaseException as e:
+            self.resolve(key, future, error=e)
+            raise
+        self.resolve(key, future, result=result)
+        return result, True
+
+    def stats(self) -> Dict[str, int]:
+        """직접 실행한 횟수(`leaders`), 다른 호출의 결과를 함께 받은 횟수(`coalesced`), 진행 중인 키 수를 반환합니다."""
+        with self._lock:
+            return {**self._stats, "in_flight": len(self._flights)}
+
+
+class AsyncSingleFlight:
+    """`SingleFlight`의 asyncio 버전
+
+    같은 이벤트 루프에서 같은 키로 동시에 들어온 코루틴이 하나의 실행 결과를 함께 받습니다.
+    기다리던 코루틴이 취소되어도 리더의 실행은 계속되며, 리더가 취소되면
+    기다리던 코루틴이 직접 요청을 처리합니다.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Tuple["asyncio.AbstractEventLoop", Hashable], "asyncio.Future"] = {}
+        self._stats = {"leaders": 0, "coalesced": 0}
+
+    def claim(self, key: Hashable) -> Tuple["asyncio.Future", bool]:
+        """현재 이벤트 루프에서 키에 대한 실행 권한을 얻습니다.
+
+        Returns:
+            Tuple[asyncio.Future, bool]: (결과를 받을 Future, 리더 여부). 리더이면 실행을 마친 뒤
+                                         반드시 `resolve()`를 호출해야 합니다.
+        """
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        future = self._flights.get((loop, key))
+        if future is not None:
+            self._stats["coalesced"] += 1
+            return future, False
+        future = self._flights[(loop, key)] = loop.create_future()
+        self._stats["leaders"] += 1
+        return future, True
+
+    def resolve(self, key: Hashable, future: "asyncio.Future", result: Any = None,
+                error: Optional[BaseException] = None) -> None:
+        """리더의 실행 결과를 기다리던 코루틴에 전달하고 키를 해제합니다."""
+        flight_key = (future.get_loop(), key)
+        if self._flights.get(flight_key) is future:
+            del self._flights[flight_key]
+        if error is not None:
+            future.set_exception(_shared_error(error))
+            # 기다리는 코루틴이 없어도 "exception was never retrieved" 경고가 나지 않도록 함
+            future.exception()
+        else:
+            future.set_result(result)
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """같은 키로 진행 중인 실행이 있으면 그 결과를 기다리고, 없으면 직접 실행합니다.
+
+        Args:
+            key: 요청 키
+            factory: 실제 작업 코루틴을 반환하는 함수
+
+        Returns:
+            Tuple[T, bool]: (결과, 직접 실행했는지 여부)
+        """
+        import asyncio
+
+        future, leader = self.claim(key)
+        if not leader:
+            try:
+                return await asyncio.shield(future), False
+            except FlightAbortedError:
+                return await factory(), True
+        try:
+            result = await factory()
+        except BaseException as e:
+            self.resolve(key, future, error=e)
+            raise
+        self.resolve(key, future, result=result)
+        return result, True
+
+    def stats(self) -> Dict[str, int]:
+        """직접 실행한 횟수(`leaders`), 다른 호출의 결과를 함께 받은 횟수(`coalesced`), 진행 중인 키 수를 반환합니다."""
+        return {**self._stats, "in_flight": len(self._flights)}
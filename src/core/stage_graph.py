@@ -0,0 +1,215 @@
+import contextvars
+import inspect
+import threading
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class Stage:
+    """변환 파이프라인의 단일 단계
+
+    Attributes:
+        name: 단계 이름 (결과 딕셔너리의 키로 사용)
+        func: 선행 단계 결과 딕셔너리를 받아 이 단계의 결과를 반환하는 함수
+        depends_on: 이 단계가 시작되기 전에 완료되어야 하는 단계 이름들
+    """
+    name: str
+    func: Callable[[Dict[str, Any]], Any]
+    depends_on: Tuple[str, ...] = ()
+
+
+def _validate_stages(stages: Sequence[Stage]) -> None:
+    """단계 이름 중복과 존재하지 않는 의존성을 검사합니다."""
+    names = [stage.name for stage in stages]
+    if len(names) != len(set(names)):
+        raise ValueError(f"중복된 단계 이름이 있습니다: {names}")
+    for stage in stages:
+        missing = [dep for dep in stage.depends_on if dep not in names]
+        if missing:
+            raise ValueError(f"'{stage.name}' 단계의 의존 단계가 존재하지 않습니다: {missing}")
+
+
+def topological_order(stages: Sequence[Stage]) -> List[Stage]:
+    """의존성을 만족하는 실행 순서로 단계를 정렬합니다.
+
+    같은 조건이면 입력 순서를 유지하므로 순차 실행 시 기존 호출 순서가 보존됩니다.
+
+    Args:
+        stages: 정렬할 단계 목록
+
+    Returns:
+        List[Stage]: 실행 가능한 순서로 정렬된 단계 목록
+    """
+    _validate_stages(stages)
+    ordered: List[Stage] = []
+    done = set()
+    remaining = list(stages)
+    while remaining:
+        ready = [stage for stage in remaining if all(dep in done for dep in stage.depends_on)]
+        if not ready:
+            raise ValueError(f"단계 사이에 순환 의존성이 있습니다: {[s.name for s in remaining]}")
+        stage = ready[0]
+        ordered.append(stage)
+        done.add(stage.name)
+        remaining.remove(stage)
+    return ordered
+
+
+def _collect_finished(finished, running: Dict[Any, Stage], results: Dict[str, Any]) -> None:
+    """완료된 작업(Future 또는 Task)들의 결과를 기록합니다.
+
+    같은 시점에 완료된 작업 중 일부가 실패해도 성공한 결과를 먼저 모두 기록한 뒤
+    첫 번째 예외를 다시 발생시킵니다.
+    """
+    error = None
+    for job in finished:
+        stage = running.pop(job)
+        try:
+            results[stage.name] = job.result()
+        except BaseException as e:
+            error = error or e
+    if error is not None:
+        raise error
+
+
+def run_stage_graph(stages: Sequence[Stage], max_concurrency: int = 1,
+                    results: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """의존성을 고려하여 단계들을 실행합니다.
+
+    선행 단계가 모두 끝난 단계는 즉시 스레드 풀에 제출되므로, 서로 독립적인
+    API 호출들이 동시에 진행됩니다. 대기는 호출 스레드에서만 이루어지므로
+    풀 크기가 작아도 교착 상태가 발생하지 않습니다.
+
+    Args:
+        stages: 실행할 단계 목록
+        max_concurrency: 동시에 실행할 최대 단계 수 (1 이하이면 순차 실행)
+        results: 이미 완료된 단계의 결과 (해당 단계는 다시 실행하지 않음).
+                 실행 중 완료된 결과도 이 딕셔너리에 기록되므로, 실패한 경우에도
+                 완료된 단계까지의 결과가 남습니다.
+
+    Returns:
+        Dict[str, Any]: 단계 이름별 실행 결과
+    """
+    results = {} if results is None else results
+    ordered = [stage for stage in topological_order(stages) if stage.name not in results]
+
+    # 동시성 제한이 1 이하이면 기존처럼 순서대로 실행
+    if max_concurrency <= 1:
+        for stage in ordered:
+            results[stage.name] = stage.func(results)
+        return results
+
+    pending = list(ordered)
+    running = {}
+    with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="prompt-stage") as executor:
+        try:
+            while pending or running:
+                # 의존성이 충족된 단계를 동시성 제한 안에서 제출
+                for stage in list(pending):
+                    if len(running) >= max_concurrency:
+                        break
+                    if all(dep in results for dep in stage.depends_on):
+                        pending.remove(stage)
+                        # 호출 스레드의 컨텍스트(캐시 우회 여부 등)를 작업 스레드로 전달
+                        context = contextvars.copy_context()
+                        running[executor.submit(context.run, stage.func, dict(results))] = stage
+
+                finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                _collect_finished(finished, running, results)
+        except BaseException:
+            # 하나라도 실패하면 아직 시작하지 않은 단계는 취소하고,
+            # 이미 진행 중이던 단계는 끝날 때까지 기다려 성공한 결과를 남김
+            for future in running:
+                future.cancel()
+            for future, stage in running.items():
+                if not future.cancelled() and future.exception() is None:
+                    results[stage.name] = future.result()
+            raise
+    return results
+
+
+async def arun_stage_graph(stages: Sequence[Stage], max_concurrency: int = 1,
+                           results: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """의존성을 고려하여 단계들을 하나의 이벤트 루프에서 실행합니다.
+
+    단계 함수가 코루틴(awaitable)을 반환하면 대기하고, 일반 값을 반환하면 그대로 사용합니다.
+
+    Args:
+        stages: 실행할 단계 목록
+        max_concurrency: 동시에 실행할 최대 단계 수 (1 이하이면 순차 실행)
+        results: 이미 완료된 단계의 결과 (`run_stage_graph`와 같은 의미)
+
+    Returns:
+        Dict[str, Any]: 단계 이름별 실행 결과
+    """
+    import asyncio
+
+    results = {} if results is None else results
+    ordered = [stage for stage in topological_order(stages) if stage.name not in results]
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def run(stage: Stage) -> Any:
+        async with semaphore:
+            value = stage.func(dict(results))
+            if inspect.isawaitable(value):
+                value = await value
+            return value
+
+    pending = list(ordered)
+    running: Dict[asyncio.Task, Stage] = {}
+    try:
+        while pending or running:
+            # 의존성이 충족된 단계를 모두 태스크로 시작 (동시성은 세마포어로 제한)
+            for stage in list(pending):
+                if all(dep in results for dep in stage.depends_on):
+                    pending.remove(stage)
+                    running[asyncio.ensure_future(run(stage))] = stage
+
+            finished, _ = await asyncio.wait(list(running), return_when=asyncio.FIRST_COMPLETED)
+            _collect_finished(finished, running, results)
+    except BaseException:
+        # 하나라도 실패하거나 취소되면 진행 중인 단계도 함께 취소
+        for task in running:
+            task.cancel()
+        raise
+    return results
+
+
+class StageCheckpoints:
+    """실패한 다중 단계 실행의 완료된 결과를 보관하는 저장소 (스레드 안전)
+
+    같은 요청을 다시 실행할 때 완료된 단계부터 이어서 실행할 수 있도록,
+    실패 시점까지의 결과를 요청 키별로 보관합니다. 가장 오래된 항목부터 제거됩니다.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        """초기화 함수
+
+        Args:
+            max_entries: 보관할 최대 요청 수
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str) -> Dict[str, Any]:
+        """보관된 결과를 꺼냅니다. (없으면 빈 딕셔너리)"""
+        with self._lock:
+            return self._entries.pop(key, {})
+
+    def save(self, key: str, results: Dict[str, Any]) -> None:
+        """완료된 단계의 결과를 보관합니다. (완료된 단계가 없으면 보관하지 않음)"""
+        if not results or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = dict(results)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
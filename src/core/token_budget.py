@@ -0,0 +1,134 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from src.core.tokens import count_tokens, truncate_middle
+
+# 입력이 `max_input_tokens`를 넘을 때의 처리 방식
+TRUNCATE = "truncate"  # 앞뒤를 남기고 가운데를 생략
+REJECT = "reject"      # `InputTooLargeError` 발생
+INPUT_POLICIES = (TRUNCATE, REJECT)
+
+# 단계별 기본 출력 토큰 예산 (템플릿이 요구하는 분량에 여유를 둔 값)
+DEFAULT_MAX_TOKENS = {
+    "analysis": 500,
+    "format_requirements": 400,
+    "combined_analysis": 800,
+    "expert_role": 350,
+    "instructions": 1000,
+    "response_style": 500,
+    "reminders": 500,
+    "output_format": 800,
+    "chunk_requirements": 300,
+    "reduce_requirements": 600,
+}
+
+# 단일 호출 응답에 함께 생성되는 섹션의 단계 (분석과 각 섹션)
+SINGLE_CALL_STAGES = ("analysis", "expert_role", "instructions", "response_style", "reminders", "output_format")
+
+# 단일 호출은 모든 섹션을 한 응답으로 생성하므로, 섹션별 예산의 합보다 작으면 뒤쪽 섹션이 잘림
+DEFAULT_MAX_TOKENS["single_call"] = sum(DEFAULT_MAX_TOKENS[stage] for stage in SINGLE_CALL_STAGES)
+
+# 응답이 출력 토큰 한도(`max_tokens`)에 도달해 잘린 경우의 `finish_reason`
+TRUNCATED_FINISH_REASON = "length"
+
+# 기본 입력 토큰 한도
+DEFAULT_MAX_INPUT_TOKENS = 4000
+
+
+class InputTooLargeError(ValueError):
+    """입력이 토큰 한도를 넘고 처리 방식이 `REJECT`인 경우 발생하는 예외"""
+
+
+@dataclass
+class TokenBudget:
+    """단계별 출력 토큰 예산과 입력 크기 제한
+
+    `max_tokens`의 값은 해당 단계 API 요청의 `max_tokens` 인자로 전달되므로 장황한 섹션이
+    지연 시간을 좌우하지 않도록 출력 길이를 제한합니다. 입력 분석, 형식 요구사항 추출,
+    단일 호출처럼 사용자 입력을 그대로 보내는 단계는 입력이 `max_input_tokens`를 넘으면
+    `input_policy`에 따라 줄이거나 거절합니다.
+
+    Attributes:
+        max_tokens: 단계 이름별 최대 출력 토큰 수 (없는 단계는 제한 없음)
+        max_input_tokens: 사용자 입력의 최대 토큰 수 (None이면 제한 없음)
+        input_policy: 입력이 한도를 넘을 때의 처리 방식 (`TRUNCATE` 또는 `REJECT`)
+    """
+    max_tokens: Dict[str, int] = field(default_factory=lambda: dict(DEFAULT_MAX_TOKENS))
+    max_input_tokens: Optional[int] = DEFAULT_MAX_INPUT_TOKENS
+    input_policy: str = TRUNCATE
+
+    def __post_init__(self):
+        if self.input_policy not in INPUT_POLICIES:
+            raise ValueError(f"input_policy는 {INPUT_POLICIES} 중 하나여야 합니다: {self.input_policy}")
+        invalid = [stage for stage, limit in self.max_tokens.items() if limit <= 0]
+        if invalid:
+            raise ValueError(f"출력 토큰 예산은 0보다 커야 합니다: {invalid}")
+
+    @classmethod
+    def from_overrides(cls, overrides: Iterable[str] = (), **kwargs: Any) -> "TokenBudget":
+        """기본 예산에 `단계=토큰 수` 형식의 설정(CLI, 환경 변수)을 덮어쓴 예산을 만듭니다.
+
+        Raises:
+            ValueError: 형식이 잘못되었거나 알 수 없는 단계인 경우
+        """
+        max_tokens = dict(DEFAULT_MAX_TOKENS)
+        for item in overrides:
+            stage, sep, value = item.partition("=")
+            stage = stage.strip()
+            if not sep or stage not in DEFAULT_MAX_TOKENS or not value.strip().isdigit():
+                raise ValueError(f"출력 토큰 예산은 '단계=토큰 수' 형식이어야 합니다 "
+                                 f"(단계: {', '.join(DEFAULT_MAX_TOKENS)}): {item}")
+            max_tokens[stage] = int(value)
+        return cls(max_tokens=max_tokens, **kwargs)
+
+    def completion_limit(self, stage: str) -> Optional[int]:
+        """단계의 최대 출력 토큰 수를 반환합니다. (제한이 없으면 None)"""
+        return self.max_tokens.get(stage)
+
+    def fit_input(self, user_input: str, model: Optional[str] = None) -> Tuple[str, int, bool]:
+        """사용자 입력을 입력 토큰 한도에 맞춥니다.
+
+        Args:
+            user_input: 사용자 입력
+            model: 토큰 수를 셀 모델 이름
+
+        Returns:
+            Tuple[str, int, bool]: (API에 보낼 입력, 원래 입력의 토큰 수, 줄였는지 여부)
+
+        Raises:
+            InputTooLargeError: 입력이 한도를 넘고 처리 방식이 `REJECT`인 경우
+        """
+        tokens = count_tokens(user_input, model)
+        if self.max_input_tokens is None or tokens <= self.max_input_tokens:
+            return user_input, tokens, False
+        if self.input_policy == REJECT:
+            raise InputTooLargeError(
+                f"입력이 너무 깁니다: 약 {tokens}토큰 (최대 {self.max_input_tokens}토큰)"
+            )
+        return truncate_middle(user_input, self.max_input_tokens, model), tokens, True
+
+    def describe(self, user_input: str, stages: Iterable[str], model: Optional[str] = None,
+                 truncated: Iterable[str] = ()) -> Dict[str, Any]:
+        """변환 결과에 함께 보고할 실제 적용된 예산을 계산합니다.
+
+        Args:
+            user_input: 사용자 입력
+            stages: 변환 중 호출한 단계 이름
+            model: 토큰 수를 셀 모델 이름
+            truncated: 응답이 출력 토큰 예산에 도달해 잘린 단계 이름
+
+        Returns:
+            Dict[str, Any]: `max_tokens`(호출한 단계별 출력 토큰 예산), `input_tokens`(원래 입력의
+                            토큰 수), `max_input_tokens`, `input_policy`, `input_truncated`,
+                            `output_truncated`(응답이 잘린 단계 목록)
+        """
+        tokens = count_tokens(user_input, model)
+        over = self.max_input_tokens is not None and tokens > self.max_input_tokens
+        return {
+            "max_tokens": {stage: self.max_tokens[stage] for stage in dict.fromkeys(stages) if stage in self.max_tokens},
+            "input_tokens": tokens,
+            "max_input_tokens": self.max_input_tokens,
+            "input_policy": self.input_policy,
+            "input_truncated": over and self.input_policy == TRUNCATE,
+            "output_truncated": list(dict.fromkeys(truncated)),
+        }
@@ -0,0 +1,170 @@
+from typing import Any, Dict, List, Optional
+
+# 메시지 하나에 붙는 역할/구분자 토큰 수 (chat 형식의 대략적인 오버헤드)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# 응답 전체에 붙는 시작 토큰 수
+REPLY_OVERHEAD_TOKENS = 3
+
+
+def estimate_tokens(text: str) -> int:
+    """텍스트의 토큰 수를 추정합니다.
+
+    토크나이저 없이 빠르게 계산하기 위한 근사치로, 영문/숫자 등 ASCII 문자는
+    약 4자당 1토큰, 한글 등 그 밖의 문자는 1자당 1토큰으로 계산합니다.
+    요청 속도 제한(TPM) 예산처럼 약간 크게 잡아도 되는 용도에 사용합니다.
+
+    Args:
+        text: 토큰 수를 추정할 텍스트
+
+    Returns:
+        int: 추정 토큰 수
+    """
+    if not text:
+        return 0
+    ascii_chars = sum(1 for ch in text if ch.isascii())
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+def estimate_tokens_floor(text: str) -> int:
+    """텍스트의 최소 토큰 수를 추정합니다.
+
+    `estimate_tokens()`와 반대로 실제보다 적게 계산하는 근사치로, ASCII 문자는 약 6자당 1토큰,
+    한글 등 그 밖의 문자는 5자당 2토큰으로 계산합니다. 프롬프트 캐시 최소 길이처럼
+    실제로는 넘지 않는데 넘는다고 판단하면 안 되는 기준을 확인할 때 사용합니다.
+
+    Args:
+        text: 토큰 수를 추정할 텍스트
+
+    Returns:
+        int: 추정 최소 토큰 수
+    """
+    if not text:
+        return 0
+    ascii_chars = sum(1 for ch in text if ch.isascii())
+    return ascii_chars // 6 + (len(text) - ascii_chars) * 2 // 5
+
+
+def estimate_message_tokens(messages: List[Dict]) -> int:
+    """채팅 메시지 목록의 입력 토큰 수를 추정합니다.
+
+    Args:
+        messages: 전송할 메시지 목록
+
+    Returns:
+        int: 추정 입력 토큰 수
+    """
+    total = REPLY_OVERHEAD_TOKENS
+    for message in messages:
+        total += MESSAGE_OVERHEAD_TOKENS + estimate_tokens(message.get("content") or "")
+    return total
+
+
+# 모델 이름으로 인코딩을 찾지 못한 경우 사용할 tiktoken 인코딩 (gpt-4o, gpt-4.1 계열)
+DEFAULT_ENCODING = "o200k_base"
+
+_tiktoken_module: Any = None
+_encodings: Dict[str, Any] = {}
+
+
+def _load_tiktoken():
+    """tiktoken을 처음 사용할 때 불러옵니다. 설치되어 있지 않으면 None을 반환합니다."""
+    global _tiktoken_module
+    if _tiktoken_module is None:
+        try:
+            import tiktoken
+        except ImportError:
+            tiktoken = False
+        _tiktoken_module = tiktoken
+    return _tiktoken_module or None
+
+
+def get_encoding(model: Optional[str] = None):
+    """모델의 tiktoken 인코딩을 반환합니다. (tiktoken이 없으면 None)"""
+    tiktoken = _load_tiktoken()
+    if tiktoken is None:
+        return None
+    key = model or DEFAULT_ENCODING
+    encoding = _encodings.get(key)
+    if encoding is None:
+        try:
+            encoding = tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding(DEFAULT_ENCODING)
+        except KeyError:
+            encoding = tiktoken.get_encoding(DEFAULT_ENCODING)
+        _encodings[key] = encoding
+    return encoding
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """텍스트의 토큰 수를 셉니다.
+
+    tiktoken이 설치되어 있으면 모델의 토크나이저로 정확히 세고,
+    없으면 `estimate_tokens()`의 근사치를 사용합니다.
+
+    Args:
+        text: 토큰 수를 셀 텍스트
+        model: 토크나이저를 고를 모델 이름 (예: "gpt-4.1-nano")
+
+    Returns:
+        int: 토큰 수
+    """
+    if not text:
+        return 0
+    encoding = get_encoding(model)
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def count_tokens_floor(text: str, model: Optional[str] = None) -> int:
+    """텍스트의 토큰 수를 셉니다. (tiktoken이 없으면 `estimate_tokens_floor()`의 최소 추정치)"""
+    if not text:
+        return 0
+    encoding = get_encoding(model)
+    if encoding is None:
+        return estimate_tokens_floor(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def _estimated_prefix(text: str, limit: int) -> int:
+    """추정 토큰 수가 `limit`을 넘지 않는 가장 긴 접두어의 길이(문자 수)를 반환합니다."""
+    tokens = 0.0
+    for index, ch in enumerate(text):
+        tokens += 0.25 if ch.isascii() else 1.0
+        if tokens > limit:
+            return index
+    return len(text)
+
+
+def truncate_middle(text: str, limit: int, model: Optional[str] = None, marker: str = "\n...(중략)...\n",
+                    head_ratio: float = 2 / 3) -> str:
+    """텍스트가 `limit` 토큰을 넘으면 앞부분과 뒷부분만 남기고 가운데를 생략합니다.
+
+    요청 내용은 주로 앞쪽에, 웹 인터페이스가 덧붙이는 커스텀 옵션 줄(`범위:`, `출력 형식:` 등)은
+    뒤쪽에 있으므로 양 끝을 모두 보존합니다.
+
+    Args:
+        text: 줄일 텍스트
+        limit: 최대 토큰 수 (생략 표시 포함)
+        model: 토크나이저를 고를 모델 이름
+        marker: 생략한 위치에 넣을 표시
+        head_ratio: 남길 토큰 중 앞부분의 비율
+
+    Returns:
+        str: `limit` 토큰 이하로 줄인 텍스트 (넘지 않으면 원문)
+    """
+    if count_tokens(text, model) <= limit:
+        return text
+    keep = max(0, limit - count_tokens(marker, model))
+    head_tokens = int(keep * head_ratio)
+    tail_tokens = keep - head_tokens
+    encoding = get_encoding(model)
+    if encoding is not None:
+        ids = encoding.encode(text, disallowed_special=())
+        head = encoding.decode(ids[:head_tokens])
+        tail = encoding.decode(ids[len(ids) - tail_tokens:]) if tail_tokens else ""
+    else:
+        head = text[:_estimated_prefix(text, head_tokens)]
+        tail_length = _estimated_prefix(text[::-1], tail_tokens)
+        tail = text[len(text) - tail_length:] if tail_length else ""
+    return f"{head.rstrip()}{marker}{tail.lstrip()}"
@@ -1,35 +1,157 @@
 import os
+import sys
 import argparse
-import streamlit.web.bootstrap as bootstrap
 from pathlib import Path
 from dotenv import load_dotenv
 
 # 환경 변수 로드
 load_dotenv(Path(__file__).parent.parent / ".env", override=True)
 
+# 프로젝트 루트를 경로에 추가하여 src 패키지 임포트 가능하게 설정
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
 def parse_args():
     """명령줄 인자를 파싱합니다."""
     parser = argparse.ArgumentParser(description="프롬프트 변환 엔진 실행")
+    parser.add_argument(
+        "--mode",
+        choices=["ui", "api"],
+        default="ui",
+        help="명령을 생략했을 때 실행할 서비스 (ui: Streamlit 웹 인터페이스, api: HTTP API 서버)"
+    )
     parser.add_argument(
         "--port", 
         type=int, 
-        default=8501,
-        help="Streamlit 앱 실행 포트"
+        help="웹 인터페이스(기본값 8501) 또는 API 서버(기본값 8000) 실행 포트"
     )
+    parser.add_argument("--host", default="127.0.0.1", help="API 서버가 바인딩할 주소")
+    parser.add_argument("--max-concurrency", type=int, default=32, help="API 서버가 동시에 처리할 최대 변환 수")
+    parser.add_argument(
+        "--max-queue",
+        type=int,
+        default=256,
+        help="API 서버에서 처리를 기다릴 수 있는 최대 요청 수 (넘으면 503으로 거절)"
+    )
+    parser.add_argument("--request-timeout", type=float, default=120.0, help="API 서버의 변환 하나당 제한 시간(초)")
     parser.add_argument(
         "--openai-api-key", 
         type=str, 
         help="OpenAI API 키 (미설정 시 환경 변수에서 가져옴)"
     )
-    return parser.parse_args()
-
-def main():
-    """프롬프트 변환 엔진 메인 실행 함수"""
-    args = parse_args()
+    subparsers = parser.add_subparsers(dest="command")
     
-    # API 키가 제공된 경우 환경 변수에 설정
-    if args.openai_api_key:
-        os.environ["OPENAI_API_KEY"] = args.openai_api_key
+    # 웹 인터페이스 실행 (명령을 생략한 경우의 기본 동작)
+    subparsers.add_parser("ui", help="Streamlit 웹 인터페이스 실행")
+    
+    # HTTP API 서버 실행 (--mode api와 같음)
+    subparsers.add_parser("api", help="HTTP API 서버 실행 (POST /transform, /transform/batch, /transform/stream)")
+    
+    # JSONL 일괄 변환
+    batch_parser = subparsers.add_parser("batch", help="JSONL 파일의 요청을 일괄 변환")
+    batch_parser.add_argument("--input", required=True, help="입력 JSONL 파일 경로")
+    batch_parser.add_argument("--output", required=True, help="결과 JSONL 파일 경로 (이미 처리된 ID는 건너뜀)")
+    batch_parser.add_argument("--concurrency", type=int, default=4, help="동시에 처리할 최대 요청 수")
+    batch_parser.add_argument("--multi-call", action="store_true", help="다중 호출 방식 사용")
+    batch_parser.add_argument(
+        "--auto",
+        action="store_true",
+        help="입력 복잡도에 따라 요청별로 단일/다중 호출 방식을 선택 (--multi-call보다 우선)"
+    )
+    batch_parser.add_argument("--model", default="gpt-4.1-nano", help="사용할 OpenAI 모델")
+    batch_parser.add_argument("--temperature", type=float, default=0.7, help="생성 시 사용할 temperature 값")
+    batch_parser.add_argument(
+        "--structured-output",
+        action="store_true",
+        help="입력 분석과 형식 요구사항 추출을 JSON 스키마로 요청하고 응답을 검증"
+    )
+    batch_parser.add_argument(
+        "--merge-analysis",
+        action="store_true",
+        help="다중 호출 방식에서 입력 분석과 형식 요구사항 추출을 한 번의 호출로 처리"
+    )
+    batch_parser.add_argument(
+        "--prefix-cache-layout",
+        action="store_true",
+        help="고정 지시문을 메시지 앞쪽에 모아 OpenAI 프롬프트 캐시가 적용되도록 요청을 구성"
+    )
+    batch_parser.add_argument(
+        "--semantic-cache-threshold",
+        type=float,
+        help="지정하면 이 유사도(0~1) 이상인 비슷한 입력에 이전 변환 결과를 재사용 (예: 0.9)"
+    )
+    batch_parser.add_argument("--semantic-cache-path", help="의미 캐시를 저장할 SQLite 파일 경로")
+    batch_parser.add_argument(
+        "--no-coalesce",
+        action="store_true",
+        help="동시에 처리 중인 같은 입력의 요청을 합치지 않고 각각 API를 호출"
+    )
+    batch_parser.add_argument(
+        "--hedge-percentile",
+        type=float,
+        help="지정하면 첫 토큰이 최근 첫 토큰 시간의 이 분위수(예: 0.95)보다 늦은 호출에 중복 요청을 보내고 먼저 끝난 응답을 사용"
+    )
+    batch_parser.add_argument("--hedge-model", help="중복 요청에 사용할 모델 (예: gpt-4.1-nano, 기본값: 같은 모델)")
+    batch_parser.add_argument(
+        "--deadline",
+        type=float,
+        help="요청 하나의 시간 예산(초). 다중 호출 방식에서 예산이 부족하면 출력 형식을 생략하거나 단일 호출 결과로 대체"
+    )
+    batch_parser.add_argument(
+        "--token-budgets",
+        action="store_true",
+        help="단계별 기본 출력 토큰 예산(max_tokens)과 입력 토큰 한도를 적용"
+    )
+    batch_parser.add_argument(
+        "--max-tokens",
+        action="append",
+        metavar="STAGE=N",
+        help="단계별 출력 토큰 예산 (예: instructions=600, 여러 번 지정 가능, --token-budgets 포함)"
+    )
+    batch_parser.add_argument(
+        "--max-input-tokens",
+        type=int,
+        help="입력 토큰 한도 (기본값: 4000, --token-budgets 포함)"
+    )
+    batch_parser.add_argument(
+        "--input-overflow",
+        choices=["truncate", "reject"],
+        default="truncate",
+        help="입력이 토큰 한도를 넘을 때 앞뒤만 남기고 줄일지(truncate) 실패로 처리할지(reject)"
+    )
+    batch_parser.add_argument(
+        "--long-input-threshold",
+        type=int,
+        help="지정하면 이 토큰 수를 넘는 입력을 부분별 요구사항 추출과 통합으로 요약 브리프로 줄여 변환 (예: 3000)"
+    )
+    batch_parser.add_argument(
+        "--chunk-tokens",
+        type=int,
+        default=1500,
+        help="긴 입력을 나눌 부분 하나의 최대 토큰 수"
+    )
+    batch_parser.add_argument("--rpm", type=int, help="분당 최대 요청 수 (기본값: 제한 없음)")
+    batch_parser.add_argument("--tpm", type=int, help="분당 최대 토큰 수 (기본값: 제한 없음)")
+    batch_parser.add_argument("--max-retries", type=int, default=4, help="요청 하나당 최대 재시도 횟수")
+    batch_parser.add_argument("--metrics-file", help="단계별 지연 시간/토큰 집계를 Prometheus 텍스트 형식으로 저장할 경로")
+    batch_parser.add_argument("--id-field", help="ID로 사용할 입력 필드 (기본값: id 또는 request_id)")
+    batch_parser.add_argument("--text-field", help="변환할 본문 필드 (기본값: input, prompt 또는 title+body)")
+    batch_parser.add_argument(
+        "--backend",
+        choices=["realtime", "openai-batch"],
+        default="realtime",
+        help="realtime: 요청별 실시간 호출, openai-batch: OpenAI Batch API로 오프라인 처리 (저렴하지만 느림)"
+    )
+    batch_parser.add_argument("--poll-interval", type=float, default=30.0, help="Batch API 작업 상태 확인 간격(초)")
+    args = parser.parse_args()
+    # 긴 입력 요약은 실시간 호출로만 처리하므로 Batch API 백엔드와 함께 쓸 수 없음
+    if args.command == "batch" and args.backend == "openai-batch" and args.long_input_threshold is not None:
+        parser.error("--long-input-threshold는 --backend openai-batch와 함께 사용할 수 없습니다.")
+    return args
+
+def run_ui(args):
+    """Streamlit 웹 인터페이스를 실행합니다."""
+    # Streamlit은 웹 인터페이스를 실행할 때만 불러옴 (일괄 변환과 API 서버의 시작 시간 단축)
+    import streamlit.web.bootstrap as bootstrap
     
     # 현재 경로 기준으로 앱 파일 경로 설정
     app_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "api", "app.py")
@@ -39,11 +161,111 @@ def main():
         app_path,
         '',
         args=[
-            "--server.port", str(args.port),
+            "--server.port", str(args.port or 8501),
             "--server.headless", "true",
         ],
         flag_options={},
     )
 
+def run_api(args):
+    """HTTP API 서버를 실행합니다."""
+    from src.api.http_server import run_server
+    
+    run_server(
+        host=args.host,
+        port=args.port or 8000,
+        max_concurrency=args.max_concurrency,
+        max_queue=args.max_queue,
+        request_timeout=args.request_timeout,
+    )
+
+def run_batch_command(args):
+    """JSONL 입력을 일괄 변환합니다."""
+    from src.core.batch_runner import run_batch, run_batch_api
+    from src.core.hedging import HedgePolicy
+    from src.core.long_input import LongInputPolicy
+    from src.core.metrics import MetricsAggregator
+    from src.core.prompt_engine import PromptEngine
+    from src.core.router import AUTO_ROUTE
+    from src.core.scheduler import RateLimit, RequestScheduler
+    from src.core.semantic_cache import SemanticCache
+    from src.core.token_budget import DEFAULT_MAX_INPUT_TOKENS, TokenBudget
+    
+    scheduler = RequestScheduler(
+        default_limit=RateLimit(rpm=args.rpm, tpm=args.tpm),
+        max_retries=args.max_retries,
+    )
+    engine = PromptEngine(
+        model=args.model,
+        temperature=args.temperature,
+        structured_output=args.structured_output,
+        merge_analysis_calls=args.merge_analysis,
+        prefix_cache_layout=args.prefix_cache_layout,
+        semantic_cache=SemanticCache(
+            threshold=args.semantic_cache_threshold,
+            path=args.semantic_cache_path,
+        ) if args.semantic_cache_threshold is not None else None,
+        coalesce_requests=not args.no_coalesce,
+        hedging=HedgePolicy(
+            percentile=args.hedge_percentile,
+            model=args.hedge_model,
+        ) if args.hedge_percentile is not None else None,
+        token_budget=TokenBudget.from_overrides(
+            args.max_tokens or (),
+            max_input_tokens=args.max_input_tokens or DEFAULT_MAX_INPUT_TOKENS,
+            input_policy=args.input_overflow,
+        ) if args.token_budgets or args.max_tokens or args.max_input_tokens else None,
+        long_input=LongInputPolicy(
+            threshold_tokens=args.long_input_threshold,
+            chunk_tokens=args.chunk_tokens,
+        ) if args.long_input_threshold is not None else None,
+        scheduler=scheduler,
+        instrumentation=MetricsAggregator() if args.metrics_file else None,
+    )
+    use_multi_call = AUTO_ROUTE if args.auto else args.multi_call
+    if args.backend == "openai-batch":
+        from src.core.openai_batch import OpenAIBatchBackend
+        
+        backend = OpenAIBatchBackend(engine, poll_interval=args.poll_interval)
+        stats = run_batch_api(
+            backend,
+            args.input,
+            args.output,
+            use_multi_call=use_multi_call,
+            id_field=args.id_field,
+            text_field=args.text_field,
+        )
+    else:
+        stats = run_batch(
+            engine,
+            args.input,
+            args.output,
+            concurrency=args.concurrency,
+            use_multi_call=use_multi_call,
+            id_field=args.id_field,
+            text_field=args.text_field,
+            deadline=args.deadline,
+        )
+    print(f"일괄 변환 완료: 성공 {stats['succeeded']}건, 실패 {stats['failed']}건, 건너뜀 {stats['skipped']}건")
+    if engine.instrumentation is not None:
+        with open(args.metrics_file, "w", encoding="utf-8") as f:
+            f.write(engine.instrumentation.to_prometheus())
+
+def main():
+    """프롬프트 변환 엔진 메인 실행 함수"""
+    args = parse_args()
+    
+    # API 키가 제공된 경우 환경 변수에 설정
+    if args.openai_api_key:
+        os.environ["OPENAI_API_KEY"] = args.openai_api_key
+    
+    command = args.command or args.mode
+    if command == "batch":
+        run_batch_command(args)
+    elif command == "api":
+        run_api(args)
+    else:
+        run_ui(args)
+
 if __name__ == "__main__":
     main() 
\ No newline at end of file